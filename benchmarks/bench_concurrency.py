@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Measure OfflineAdapter throughput versus max_workers with a fixed-latency LLM."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+for candidate in (SRC, ROOT):
+    if str(candidate) not in sys.path:
+        sys.path.insert(0, str(candidate))
+
+from opence.methods.ace import (  # noqa: E402
+    Curator,
+    EnvironmentResult,
+    Generator,
+    LLMClient,
+    OfflineAdapter,
+    Playbook,
+    Reflector,
+    Sample,
+    TaskEnvironment,
+)
+from opence.models.clients import LLMResponse  # noqa: E402
+
+
+class LatencyClient(LLMClient):
+    """Answers each ACE role from its prompt after sleeping ``latency`` seconds."""
+
+    def __init__(self, latency: float) -> None:
+        super().__init__(model="latency-stub")
+        self.latency = latency
+
+    def complete(self, prompt: str, **kwargs: Any) -> LLMResponse:
+        time.sleep(self.latency)
+        if prompt.startswith("You are the curator"):
+            question = re.search(r"question: (.*)", prompt).group(1)
+            payload = {
+                "reasoning": "",
+                "operations": [{"type": "ADD", "section": "lessons", "content": question}],
+            }
+        elif prompt.startswith("You are a senior reviewer"):
+            payload = {"reasoning": "", "key_insight": "k", "bullet_tags": []}
+        else:
+            payload = {"reasoning": "", "bullet_ids": [], "final_answer": "a"}
+        return LLMResponse(text=json.dumps(payload))
+
+
+class NullEnvironment(TaskEnvironment):
+    def evaluate(self, sample: Sample, generator_output) -> EnvironmentResult:
+        return EnvironmentResult(feedback="ok", ground_truth=sample.ground_truth)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", default="1,2,4,8", help="Comma-separated worker counts.")
+    parser.add_argument("--samples", type=int, default=32, help="Samples per run.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per LLM call.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    samples = [Sample(question=f"question {idx}") for idx in range(args.samples)]
+    print(f"{'workers':>8} {'seconds':>10} {'samples/s':>10}")
+    for workers in (int(value) for value in args.workers.split(",") if value):
+        client = LatencyClient(args.latency)
+        adapter = OfflineAdapter(
+            playbook=Playbook(),
+            generator=Generator(client),
+            reflector=Reflector(client),
+            curator=Curator(client),
+            max_workers=workers,
+        )
+        start = time.perf_counter()
+        adapter.run(samples, NullEnvironment())
+        elapsed = time.perf_counter() - start
+        print(f"{workers:>8} {elapsed:>10.2f} {args.samples / elapsed:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
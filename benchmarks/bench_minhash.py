@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Benchmark the MinHash/LSH deduplication backend against the substring fallback."""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+for candidate in (SRC, ROOT):
+    if str(candidate) not in sys.path:
+        sys.path.insert(0, str(candidate))
+
+from opence.methods.ace.deduplication import Deduplicator  # noqa: E402
+
+# Common CJK characters plus ASCII so bullets resemble the mixed-language playbooks.
+ALPHABET = "火灾调查现场电气线路短路熔痕起火时间烟雾颜色记录目击者保险损失核实" "abcdefghij"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--existing", type=int, default=100_000, help="Existing bullet count.")
+    parser.add_argument("--new", type=int, default=1000, help="New bullets checked per run.")
+    parser.add_argument(
+        "--substring-limit",
+        type=int,
+        default=10_000,
+        help="Largest existing size for which the quadratic substring check is timed.",
+    )
+    parser.add_argument("--threshold", type=float, default=0.8, help="Jaccard threshold.")
+    return parser.parse_args()
+
+
+def synth_bullets(count: int, rng: random.Random, prefix: str) -> Dict[str, str]:
+    return {
+        f"{prefix}-{idx}": "".join(rng.choice(ALPHABET) for _ in range(rng.randint(30, 60)))
+        for idx in range(count)
+    }
+
+
+def mutate(text: str, rng: random.Random) -> str:
+    chars = list(text)
+    chars[rng.randrange(len(chars))] = rng.choice(ALPHABET)
+    return "".join(chars)
+
+
+def main() -> None:
+    args = parse_args()
+    rng = random.Random(0)
+    existing = synth_bullets(args.existing, rng, "e")
+    originals = list(existing.values())
+    new = synth_bullets(args.new // 2, rng, "n")
+    # Half of the new bullets are one-character edits of existing ones.
+    for idx in range(args.new - len(new)):
+        new[f"d-{idx}"] = mutate(rng.choice(originals), rng)
+
+    deduplicator = Deduplicator(backend="minhash", jaccard_threshold=args.threshold)
+    start = time.perf_counter()
+    deduplicator.find_duplicates({"warmup": originals[0]}, existing)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    found = deduplicator.find_duplicates(new, existing)
+    query = time.perf_counter() - start
+    recall = sum(1 for key in found if key.startswith("d-")) / max(1, args.new - args.new // 2)
+    false_pos = sum(1 for key in found if key.startswith("n-"))
+    print(f"existing={args.existing} new={args.new}")
+    print(f"minhash index build: {build:.2f}s ({args.existing / build:,.0f} bullets/s)")
+    print(
+        f"minhash query:       {query * 1000 / args.new:.3f} ms/bullet "
+        f"(recall={recall:.2%}, false positives={false_pos})"
+    )
+
+    if args.existing <= args.substring_limit:
+        substring = Deduplicator(backend="substring")
+        start = time.perf_counter()
+        substring.find_duplicates(new, existing)
+        elapsed = time.perf_counter() - start
+        print(f"substring query:     {elapsed * 1000 / args.new:.3f} ms/bullet")
+
+
+if __name__ == "__main__":
+    main()
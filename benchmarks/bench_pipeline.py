@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Measure pipelined OfflineAdapter throughput and stage occupancy versus staleness."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+for candidate in (SRC, ROOT):
+    if str(candidate) not in sys.path:
+        sys.path.insert(0, str(candidate))
+
+from benchmarks.bench_concurrency import LatencyClient, NullEnvironment  # noqa: E402
+from opence.methods.ace import (  # noqa: E402
+    Curator,
+    Generator,
+    OfflineAdapter,
+    Playbook,
+    Reflector,
+    Sample,
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--staleness",
+        default="off,0,1,2",
+        help="Comma-separated staleness bounds; 'off' runs the sequential loop.",
+    )
+    parser.add_argument("--samples", type=int, default=32, help="Samples per run.")
+    parser.add_argument("--latency", type=float, default=0.05, help="Seconds per LLM call.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    samples = [Sample(question=f"question {idx}") for idx in range(args.samples)]
+    print(f"{'staleness':>9} {'seconds':>9} {'samples/s':>10}  occupancy")
+    for value in (value for value in args.staleness.split(",") if value):
+        staleness = None if value == "off" else int(value)
+        client = LatencyClient(args.latency)
+        adapter = OfflineAdapter(
+            playbook=Playbook(),
+            generator=Generator(client),
+            reflector=Reflector(client),
+            curator=Curator(client),
+            pipeline_staleness=staleness,
+        )
+        start = time.perf_counter()
+        adapter.run(samples, NullEnvironment())
+        elapsed = time.perf_counter() - start
+        occupancy = ""
+        if adapter.pipeline_stats is not None:
+            occupancy = " ".join(
+                f"{stage}={share:.0%}"
+                for stage, share in sorted(adapter.pipeline_stats.occupancy().items())
+            )
+        print(f"{value:>9} {elapsed:>9.2f} {args.samples / elapsed:>10.1f}  {occupancy}")
+
+
+if __name__ == "__main__":
+    main()
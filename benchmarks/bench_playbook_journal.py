@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Compare per-step checkpoint cost: full Playbook.dumps versus the delta journal."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+for candidate in (SRC, ROOT):
+    if str(candidate) not in sys.path:
+        sys.path.insert(0, str(candidate))
+
+from opence.methods.ace import (  # noqa: E402
+    DeltaBatch,
+    DeltaOperation,
+    Playbook,
+    PlaybookJournal,
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes",
+        default="1000,10000,50000",
+        help="Comma-separated playbook sizes (bullet counts) to benchmark.",
+    )
+    parser.add_argument(
+        "--steps", type=int, default=100, help="Checkpointed adaptation steps per size."
+    )
+    return parser.parse_args()
+
+
+def step_delta(step: int) -> DeltaBatch:
+    return DeltaBatch(
+        reasoning=f"step {step}",
+        operations=[
+            DeltaOperation(
+                type="ADD",
+                section=f"section_{step % 20:02d}",
+                content=f"Lesson from step {step}: cross-check the timeline.",
+            )
+        ],
+    )
+
+
+def seed(playbook: Playbook, size: int) -> None:
+    for idx in range(size):
+        playbook.add_bullet(
+            section=f"section_{idx % 20:02d}",
+            content=f"Strategy {idx}: verify the evidence chain before concluding.",
+        )
+
+
+def bench_dumps(size: int, steps: int, directory: Path) -> float:
+    playbook = Playbook()
+    seed(playbook, size)
+    target = directory / "playbook.json"
+    start = time.perf_counter()
+    for step in range(steps):
+        playbook.apply_delta(step_delta(step))
+        target.write_text(playbook.dumps(), encoding="utf-8")
+    return (time.perf_counter() - start) / steps
+
+
+def bench_journal(size: int, steps: int, directory: Path) -> float:
+    journal = PlaybookJournal(directory / "journal", compact_threshold=steps + 1)
+    playbook = journal.load()
+    seed(playbook, size)
+    journal.compact(playbook, wait=True)
+    playbook.attach_journal(journal)
+    start = time.perf_counter()
+    for step in range(steps):
+        playbook.apply_delta(step_delta(step))
+    journal.flush()
+    elapsed = (time.perf_counter() - start) / steps
+    journal.close()
+    return elapsed
+
+
+def main() -> None:
+    args = parse_args()
+    sizes = [int(value) for value in args.sizes.split(",") if value]
+    print(f"{'bullets':>10} {'dumps ms':>12} {'journal ms':>12}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            dumps_seconds = bench_dumps(size, args.steps, Path(tmp))
+            journal_seconds = bench_journal(size, args.steps, Path(tmp))
+        print(f"{size:>10} {dumps_seconds * 1000:>12.3f} {journal_seconds * 1000:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Measure Playbook.as_prompt cost as the playbook grows."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+for candidate in (SRC, ROOT):
+    if str(candidate) not in sys.path:
+        sys.path.insert(0, str(candidate))
+
+from opence.methods.ace import Playbook  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes",
+        default="1000,5000,10000,50000",
+        help="Comma-separated playbook sizes (bullet counts) to benchmark.",
+    )
+    parser.add_argument(
+        "--section-size", type=int, default=100, help="Bullets per section."
+    )
+    parser.add_argument(
+        "--steps", type=int, default=200, help="Mutate/render cycles per size."
+    )
+    return parser.parse_args()
+
+
+def build_playbook(size: int, section_size: int) -> Playbook:
+    playbook = Playbook()
+    for idx in range(size):
+        playbook.add_bullet(
+            section=f"section_{idx // section_size:05d}",
+            content=f"Strategy {idx}: verify the evidence chain before concluding.",
+        )
+    return playbook
+
+
+def bench_size(size: int, section_size: int, steps: int) -> Tuple[float, float]:
+    """Return mean seconds per (tag one bullet + render) cycle, cached and cold."""
+    playbook = build_playbook(size, section_size)
+    bullet_ids: List[str] = [bullet.id for bullet in playbook.bullets()]
+    playbook.as_prompt()
+    start = time.perf_counter()
+    for step in range(steps):
+        playbook.tag_bullet(bullet_ids[step % len(bullet_ids)], "helpful")
+        playbook.as_prompt()
+    cached = (time.perf_counter() - start) / steps
+
+    cold_steps = max(1, steps // 10)
+    start = time.perf_counter()
+    for step in range(cold_steps):
+        # Drop the cache to measure a from-scratch render of every section.
+        for section in {bullet.section for bullet in playbook.bullets()}:
+            playbook._mark_dirty(section)
+        playbook.as_prompt()
+    cold = (time.perf_counter() - start) / cold_steps
+    return cached, cold
+
+
+def main() -> None:
+    args = parse_args()
+    sizes = [int(value) for value in args.sizes.split(",") if value]
+    print(f"{'bullets':>10} {'cached ms':>12} {'full ms':>12}")
+    for size in sizes:
+        cached, cold = bench_size(size, args.section_size, args.steps)
+        print(f"{size:>10} {cached * 1000:>12.3f} {cold * 1000:>12.3f}")
+
+
+if __name__ == "__main__":
+    main()
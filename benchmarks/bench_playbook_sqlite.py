@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""Measure open latency and per-delta cost of the SQLite playbook storage."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+for candidate in (SRC, ROOT):
+    if str(candidate) not in sys.path:
+        sys.path.insert(0, str(candidate))
+
+from opence.methods.ace import (  # noqa: E402
+    Bullet,
+    DeltaBatch,
+    DeltaOperation,
+    Playbook,
+    SQLiteStorage,
+)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes",
+        default="10000,100000,1000000",
+        help="Comma-separated playbook sizes (bullet counts) to benchmark.",
+    )
+    parser.add_argument(
+        "--deltas", type=int, default=200, help="Deltas applied after reopening."
+    )
+    return parser.parse_args()
+
+
+def populate(path: Path, size: int) -> None:
+    storage = SQLiteStorage(path)
+    with storage.transaction():
+        for idx in range(size):
+            storage.put(
+                Bullet(
+                    id=f"section-{idx:08d}",
+                    section=f"section_{idx % 1000:04d}",
+                    content=f"Strategy {idx}: verify the evidence chain before concluding.",
+                )
+            )
+        storage.set_meta("next_id", str(size))
+    storage.close()
+
+
+def main() -> None:
+    args = parse_args()
+    sizes = [int(value) for value in args.sizes.split(",") if value]
+    print(f"{'bullets':>10} {'open ms':>10} {'delta ms':>10} {'get ms':>10}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "playbook.sqlite"
+            populate(path, size)
+
+            start = time.perf_counter()
+            playbook = Playbook(SQLiteStorage(path))
+            open_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            for step in range(args.deltas):
+                playbook.apply_delta(
+                    DeltaBatch(
+                        reasoning="bench",
+                        operations=[
+                            DeltaOperation(
+                                type="ADD",
+                                section=f"section_{step % 1000:04d}",
+                                content=f"Lesson {step}",
+                            ),
+                            DeltaOperation(
+                                type="TAG",
+                                section=f"section_{step % 1000:04d}",
+                                bullet_id=f"section-{step:08d}",
+                                metadata={"helpful": 1},
+                            ),
+                        ],
+                    )
+                )
+            delta_seconds = (time.perf_counter() - start) / args.deltas
+
+            start = time.perf_counter()
+            for step in range(args.deltas):
+                playbook.get_bullet(f"section-{(step * 7919) % size:08d}")
+            get_seconds = (time.perf_counter() - start) / args.deltas
+            playbook.storage.close()
+        print(
+            f"{size:>10} {open_seconds * 1000:>10.3f} "
+            f"{delta_seconds * 1000:>10.3f} {get_seconds * 1000:>10.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
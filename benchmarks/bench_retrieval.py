@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""Compare full-playbook prompting with question-conditioned retrieval."""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, List, Optional
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+for candidate in (SRC, ROOT):
+    if str(candidate) not in sys.path:
+        sys.path.insert(0, str(candidate))
+
+from opence.methods.ace import (  # noqa: E402
+    Curator,
+    DummyLLMClient,
+    EnvironmentResult,
+    Generator,
+    OfflineAdapter,
+    Playbook,
+    PlaybookRetriever,
+    Reflector,
+    Sample,
+    TaskEnvironment,
+)
+from opence.models.rate_limit import estimate_tokens  # noqa: E402
+from opence.models.clients import LLMResponse  # noqa: E402
+
+TOPICS = [
+    "electrical arcing", "fuel load", "ventilation", "witness statements",
+    "burn patterns", "ignition sources", "smoke detectors", "accelerants",
+    "structural collapse", "timeline reconstruction", "insurance records",
+    "thermal imaging", "sprinkler systems", "gas leaks", "battery fires",
+]
+
+
+class PromptSizeClient(DummyLLMClient):
+    """Replays canned role outputs while recording generator prompt sizes."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.generator_prompt_tokens: List[int] = []
+
+    def complete(self, prompt: str, **kwargs: Any) -> LLMResponse:
+        if '"final_answer"' in prompt and "Playbook:" in prompt:
+            self.generator_prompt_tokens.append(estimate_tokens(prompt))
+        return super().complete(prompt, **kwargs)
+
+
+class NullEnvironment(TaskEnvironment):
+    def evaluate(self, sample: Sample, generator_output) -> EnvironmentResult:
+        return EnvironmentResult(feedback="ok", ground_truth=sample.ground_truth)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", default="1000,10000", help="Comma-separated playbook sizes to benchmark."
+    )
+    parser.add_argument("--steps", type=int, default=20, help="Adapter steps per mode.")
+    parser.add_argument("--top-k", type=int, default=20, help="Bullets retrieved per question.")
+    parser.add_argument(
+        "--token-budget", type=int, default=1500, help="Token budget for retrieved bullets."
+    )
+    return parser.parse_args()
+
+
+def build_playbook(size: int, rng: random.Random) -> Playbook:
+    playbook = Playbook()
+    for idx in range(size):
+        topic = TOPICS[idx % len(TOPICS)]
+        other = rng.choice(TOPICS)
+        playbook.add_bullet(
+            section=topic.replace(" ", "_"),
+            content=f"When assessing {topic}, cross-check against {other} (rule {idx}).",
+        )
+    return playbook
+
+
+def queue_step(client: DummyLLMClient) -> None:
+    client.queue(json.dumps({"reasoning": "r", "bullet_ids": [], "final_answer": "a"}))
+    client.queue(
+        json.dumps(
+            {
+                "reasoning": "r",
+                "error_identification": "",
+                "root_cause_analysis": "",
+                "correct_approach": "",
+                "key_insight": "k",
+                "bullet_tags": [],
+            }
+        )
+    )
+    client.queue(json.dumps({"reasoning": "none", "operations": []}))
+
+
+def run_mode(size: int, steps: int, retriever: Optional[PlaybookRetriever]) -> tuple:
+    rng = random.Random(0)
+    playbook = build_playbook(size, rng)
+    client = PromptSizeClient()
+    for _ in range(steps):
+        queue_step(client)
+    adapter = OfflineAdapter(
+        playbook=playbook,
+        generator=Generator(client, retriever=retriever),
+        reflector=Reflector(client),
+        curator=Curator(client),
+    )
+    samples = [
+        Sample(question=f"How should {rng.choice(TOPICS)} be evaluated?", ground_truth="a")
+        for _ in range(steps)
+    ]
+    if retriever is not None:
+        retriever.attach(playbook)  # one-off index build, excluded from step latency
+    start = time.perf_counter()
+    adapter.run(samples, NullEnvironment())
+    elapsed = (time.perf_counter() - start) / steps
+    tokens = sum(client.generator_prompt_tokens) / len(client.generator_prompt_tokens)
+    return tokens, elapsed
+
+
+def main() -> None:
+    args = parse_args()
+    sizes = [int(value) for value in args.sizes.split(",") if value]
+    print(f"{'bullets':>8} {'mode':>10} {'gen prompt tok':>15} {'ms/step':>10}")
+    for size in sizes:
+        for mode in ("full", "retrieval"):
+            retriever = (
+                PlaybookRetriever(top_k=args.top_k, token_budget=args.token_budget)
+                if mode == "retrieval"
+                else None
+            )
+            tokens, elapsed = run_mode(size, args.steps, retriever)
+            print(f"{size:>8} {mode:>10} {tokens:>15.0f} {elapsed * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
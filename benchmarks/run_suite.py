@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""Benchmark ACE hot paths on synthetic workloads and compare against a baseline.
+
+Each case times one hot path (setup excluded) at every requested size and
+reports the best of ``--repeat`` runs as seconds per operation. Results are
+written as JSON with ``--output``; with ``--baseline`` each case is compared
+to a previous results file and the script exits non-zero when any case is
+more than ``--tolerance`` slower. ``benchmarks/baseline.json`` holds the
+reference run at 1k and 10k bullets; refresh it with
+``--sizes 1000,10000 --output benchmarks/baseline.json`` after intended
+performance changes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import json
+import platform
+import random
+import sys
+import time
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+for candidate in (SRC, ROOT):
+    if str(candidate) not in sys.path:
+        sys.path.insert(0, str(candidate))
+
+from benchmarks.bench_concurrency import LatencyClient, NullEnvironment  # noqa: E402
+from benchmarks.workloads import (  # noqa: E402
+    build_playbook,
+    bullet_contents,
+    delta_payload,
+    near_duplicates,
+    samples,
+)
+from opence.methods.ace import (  # noqa: E402
+    Curator,
+    DeltaBatch,
+    Generator,
+    OfflineAdapter,
+    Playbook,
+    Reflector,
+)
+from opence.methods.ace.deduplication import Deduplicator, np  # noqa: E402
+
+# A case returns (measured seconds, operations performed).
+CaseFn = Callable[[int, random.Random], Tuple[float, int]]
+
+
+@dataclass
+class BenchCase:
+    name: str
+    unit: str
+    run: CaseFn
+    max_size: Optional[int] = None
+
+
+def _timed(fn: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def _mutation_count(size: int) -> int:
+    return min(size, 10_000)
+
+
+def bench_playbook_add(size: int, rng: random.Random) -> Tuple[float, int]:
+    contents = bullet_contents(size)
+    playbook = Playbook()
+
+    def run() -> None:
+        for index, content in enumerate(contents):
+            playbook.add_bullet(section=f"section_{index // 100:05d}", content=content)
+
+    return _timed(run), size
+
+
+def bench_playbook_update(size: int, rng: random.Random) -> Tuple[float, int]:
+    playbook = build_playbook(size)
+    ids = rng.sample([bullet.id for bullet in playbook.iter_bullets()], _mutation_count(size))
+    return _timed(lambda: [playbook.update_bullet(i, content="Revised strategy.") for i in ids]), len(ids)
+
+
+def bench_playbook_tag(size: int, rng: random.Random) -> Tuple[float, int]:
+    playbook = build_playbook(size)
+    ids = rng.sample([bullet.id for bullet in playbook.iter_bullets()], _mutation_count(size))
+    return _timed(lambda: [playbook.tag_bullet(i, "helpful") for i in ids]), len(ids)
+
+
+def bench_playbook_remove(size: int, rng: random.Random) -> Tuple[float, int]:
+    playbook = build_playbook(size)
+    ids = rng.sample([bullet.id for bullet in playbook.iter_bullets()], _mutation_count(size))
+    return _timed(lambda: [playbook.remove_bullet(i) for i in ids]), len(ids)
+
+
+def bench_playbook_render_cold(size: int, rng: random.Random) -> Tuple[float, int]:
+    playbook = build_playbook(size)
+    return _timed(playbook.as_prompt), 1
+
+
+def bench_playbook_render_after_tag(size: int, rng: random.Random) -> Tuple[float, int]:
+    playbook = build_playbook(size)
+    ids = [bullet.id for bullet in playbook.iter_bullets()]
+    playbook.as_prompt()
+    steps = 50
+
+    def run() -> None:
+        for _ in range(steps):
+            playbook.tag_bullet(rng.choice(ids), "helpful")
+            playbook.as_prompt()
+
+    return _timed(run), steps
+
+
+def bench_playbook_dumps(size: int, rng: random.Random) -> Tuple[float, int]:
+    playbook = build_playbook(size)
+    return _timed(playbook.dumps), 1
+
+
+def bench_playbook_loads(size: int, rng: random.Random) -> Tuple[float, int]:
+    data = build_playbook(size).dumps()
+    return _timed(lambda: Playbook.loads(data)), 1
+
+
+def bench_delta_from_json(size: int, rng: random.Random) -> Tuple[float, int]:
+    payload = delta_payload(size, [f"section-{index:05d}" for index in range(100)])
+    return _timed(lambda: DeltaBatch.from_json(payload)), size
+
+
+def _dedup_inputs(size: int) -> Tuple[Dict[str, str], Dict[str, str]]:
+    contents = bullet_contents(size)
+    existing = {f"b-{index}": content for index, content in enumerate(contents)}
+    return near_duplicates(contents, 100), existing
+
+
+def bench_dedup_minhash(size: int, rng: random.Random) -> Tuple[float, int]:
+    new, existing = _dedup_inputs(size)
+    deduplicator = Deduplicator(backend="minhash")
+    # The first call indexes the existing bullets; time the steady state.
+    deduplicator.find_duplicates(new, existing)
+    return _timed(lambda: deduplicator.find_duplicates(new, existing)), len(new)
+
+
+def bench_dedup_minhash_index(size: int, rng: random.Random) -> Tuple[float, int]:
+    new, existing = _dedup_inputs(size)
+    deduplicator = Deduplicator(backend="minhash")
+    return _timed(lambda: deduplicator.find_duplicates(new, existing)), size
+
+
+def bench_dedup_substring(size: int, rng: random.Random) -> Tuple[float, int]:
+    new, existing = _dedup_inputs(size)
+    deduplicator = Deduplicator(backend="substring")
+    return _timed(lambda: deduplicator.find_duplicates(new, existing)), len(new)
+
+
+def _hashing_encoder(dimensions: int = 256) -> Callable[[List[str]], Any]:
+    """Cheap bag-of-words encoder standing in for a sentence-transformers model."""
+
+    def encode(texts: List[str]) -> Any:
+        vectors = np.zeros((len(texts), dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in text.lower().split():
+                vectors[row, zlib.crc32(word.encode("utf-8")) % dimensions] += 1.0
+        return vectors
+
+    return encode
+
+
+def bench_dedup_embedding(size: int, rng: random.Random) -> Tuple[float, int]:
+    new, existing = _dedup_inputs(size)
+    deduplicator = Deduplicator(backend="embedding", encoder=_hashing_encoder())
+    # Warm the embedding store so only the similarity search is timed.
+    deduplicator.find_duplicates(new, existing)
+    return _timed(lambda: deduplicator.find_duplicates(new, existing)), len(new)
+
+
+def bench_adapter_run(size: int, rng: random.Random) -> Tuple[float, int]:
+    count = max(1, size // 100)
+    client = LatencyClient(0.0)
+    adapter = OfflineAdapter(
+        playbook=Playbook(),
+        generator=Generator(client),
+        reflector=Reflector(client),
+        curator=Curator(client),
+    )
+    batch = samples(count)
+    return _timed(lambda: adapter.run(batch, NullEnvironment())), count
+
+
+CASES: List[BenchCase] = [
+    BenchCase("playbook.add", "bullet", bench_playbook_add),
+    BenchCase("playbook.update", "bullet", bench_playbook_update),
+    BenchCase("playbook.tag", "bullet", bench_playbook_tag),
+    BenchCase("playbook.remove", "bullet", bench_playbook_remove),
+    BenchCase("playbook.as_prompt.cold", "render", bench_playbook_render_cold),
+    BenchCase("playbook.as_prompt.after_tag", "tag+render", bench_playbook_render_after_tag),
+    BenchCase("playbook.dumps", "playbook", bench_playbook_dumps),
+    BenchCase("playbook.loads", "playbook", bench_playbook_loads),
+    BenchCase("delta.from_json", "operation", bench_delta_from_json, max_size=100_000),
+    BenchCase("dedup.minhash.index", "existing bullet", bench_dedup_minhash_index, max_size=100_000),
+    BenchCase("dedup.minhash.query", "new bullet", bench_dedup_minhash, max_size=100_000),
+    # The auto fallback without embeddings; a linear scan per new bullet.
+    BenchCase("dedup.substring.query", "new bullet", bench_dedup_substring, max_size=10_000),
+    BenchCase("dedup.embedding.query", "new bullet", bench_dedup_embedding, max_size=100_000),
+    BenchCase("adapter.run", "sample", bench_adapter_run, max_size=100_000),
+]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes",
+        default="1000,10000,100000",
+        help="Comma-separated playbook sizes; add 1000000 for the full scale run.",
+    )
+    parser.add_argument("--cases", default="*", help="Glob selecting case names, e.g. 'playbook.*'.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per case; the best is kept.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic workloads.")
+    parser.add_argument("--output", default=None, help="Write results as JSON to this path.")
+    parser.add_argument("--baseline", default=None, help="Results JSON to compare against.")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.25,
+        help="Allowed slowdown versus the baseline before a case counts as a regression.",
+    )
+    return parser.parse_args()
+
+
+def run_suite(
+    cases: List[BenchCase], sizes: List[int], repeat: int, seed: int
+) -> List[Dict[str, Any]]:
+    results = []
+    for case in cases:
+        for size in sizes:
+            if case.max_size is not None and size > case.max_size:
+                continue
+            if case.name.startswith("dedup.embedding") and np is None:
+                continue
+            best: Optional[Tuple[float, int]] = None
+            for _ in range(repeat):
+                seconds, ops = case.run(size, random.Random(seed))
+                if best is None or seconds < best[0]:
+                    best = (seconds, ops)
+            seconds, ops = best
+            results.append(
+                {
+                    "name": case.name,
+                    "size": size,
+                    "unit": case.unit,
+                    "ops": ops,
+                    "seconds": seconds,
+                    "us_per_op": seconds / ops * 1e6,
+                }
+            )
+            print(f"{case.name:<32} {size:>9} {seconds / ops * 1e6:>14.2f} us/{case.unit}")
+    return results
+
+
+def compare(
+    results: List[Dict[str, Any]], baseline: Dict[str, Any], tolerance: float
+) -> List[str]:
+    """Print the per-case ratio to the baseline and return the regressed cases."""
+    previous = {(entry["name"], entry["size"]): entry for entry in baseline.get("results", [])}
+    regressions = []
+    print(f"\n{'case':<32} {'size':>9} {'baseline us':>12} {'now us':>12} {'ratio':>7}")
+    for entry in results:
+        before = previous.get((entry["name"], entry["size"]))
+        if before is None:
+            continue
+        ratio = entry["us_per_op"] / before["us_per_op"] if before["us_per_op"] else 1.0
+        flag = ""
+        if ratio > 1.0 + tolerance:
+            flag = "  REGRESSION"
+            regressions.append(f"{entry['name']}@{entry['size']}")
+        print(
+            f"{entry['name']:<32} {entry['size']:>9} {before['us_per_op']:>12.2f} "
+            f"{entry['us_per_op']:>12.2f} {ratio:>6.2f}x{flag}"
+        )
+    return regressions
+
+
+def main() -> None:
+    args = parse_args()
+    sizes = [int(value) for value in args.sizes.split(",") if value]
+    cases = [case for case in CASES if fnmatch.fnmatch(case.name, args.cases)]
+    print(f"{'case':<32} {'size':>9} {'time':>17}")
+    results = run_suite(cases, sizes, args.repeat, args.seed)
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sizes": sizes,
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    if args.output:
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\nResults written to {output}")
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
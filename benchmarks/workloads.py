@@ -0,0 +1,84 @@
+"""Synthetic, seeded workloads shared by the benchmark suite."""
+
+from __future__ import annotations
+
+import random
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+for candidate in (SRC, ROOT):
+    if str(candidate) not in sys.path:
+        sys.path.insert(0, str(candidate))
+
+from opence.methods.ace import Playbook, Sample  # noqa: E402
+
+_SUBJECTS = [
+    "the evidence chain", "unit conversions", "the final answer", "edge cases",
+    "the ignition source", "intermediate totals", "the reference table", "assumptions",
+    "the burn pattern", "timestamps", "the question wording", "error bounds",
+]
+_VERBS = [
+    "verify", "double-check", "state", "derive", "cross-reference", "summarise",
+    "avoid guessing", "re-read", "quantify", "justify",
+]
+_QUALIFIERS = [
+    "before concluding", "when figures disagree", "for multi-step problems",
+    "if the context is long", "using the playbook", "in one sentence",
+    "when the reflector flagged a mistake", "for every numeric claim",
+]
+
+
+def bullet_content(rng: random.Random, index: int) -> str:
+    """A plausible one-line strategy; ``index`` keeps contents unique."""
+    return (
+        f"{rng.choice(_VERBS).capitalize()} {rng.choice(_SUBJECTS)} "
+        f"{rng.choice(_QUALIFIERS)} (case {index})."
+    )
+
+
+def bullet_contents(count: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    return [bullet_content(rng, index) for index in range(count)]
+
+
+def build_playbook(size: int, *, section_size: int = 100, seed: int = 0) -> Playbook:
+    playbook = Playbook()
+    for index, content in enumerate(bullet_contents(size, seed)):
+        playbook.add_bullet(section=f"section_{index // section_size:05d}", content=content)
+    return playbook
+
+
+def delta_payload(operations: int, bullet_ids: List[str], seed: int = 0) -> Dict[str, object]:
+    """A curator-style delta mixing ADD, UPDATE, TAG and REMOVE operations."""
+    rng = random.Random(seed)
+    ops: List[Dict[str, object]] = []
+    for index in range(operations):
+        kind = rng.choice(("ADD", "UPDATE", "TAG", "REMOVE")) if bullet_ids else "ADD"
+        op: Dict[str, object] = {"type": kind, "section": f"section_{index % 50:05d}"}
+        if kind in ("ADD", "UPDATE"):
+            op["content"] = bullet_content(rng, index)
+        if kind != "ADD":
+            op["bullet_id"] = rng.choice(bullet_ids)
+        if kind == "TAG":
+            op["metadata"] = {rng.choice(("helpful", "harmful", "neutral")): 1}
+        ops.append(op)
+    return {"reasoning": "synthetic", "operations": ops}
+
+
+def near_duplicates(contents: List[str], count: int, seed: int = 0) -> Dict[str, str]:
+    """New bullets, about half of them light rewrites of existing ``contents``."""
+    rng = random.Random(seed)
+    fresh: Dict[str, str] = {}
+    for index in range(count):
+        if index % 2 == 0 and contents:
+            fresh[f"new-{index}"] = rng.choice(contents).replace("(case", "(variant")
+        else:
+            fresh[f"new-{index}"] = bullet_content(rng, 10_000_000 + index)
+    return fresh
+
+
+def samples(count: int) -> List[Sample]:
+    return [Sample(question=f"q{index}", ground_truth="a") for index in range(count)]
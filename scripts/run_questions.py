@@ -20,6 +20,7 @@ for candidate in (SRC, ROOT):
     if str(candidate) not in sys.path:
         sys.path.insert(0, str(candidate))
 
+from opence.core import NULL_TRACER, TracedLLMClient, Tracer  # noqa: E402
 from opence.methods.ace import (  # noqa: E402
     AdapterStepResult,
     Curator,
@@ -32,6 +33,12 @@ from opence.methods.ace import (  # noqa: E402
     TaskEnvironment,
     TransformersLLMClient,
 )
+from opence.models import (  # noqa: E402
+    CachingLLMClient,
+    LLMClient,
+    RecordingLLMClient,
+    ReplayLLMClient,
+)
 
 
 @dataclass
@@ -111,6 +118,42 @@ def parse_args() -> argparse.Namespace:
         default=0.7,
         help="Threshold used in the environment feedback.",
     )
+    parser.add_argument(
+        "--cache",
+        default=None,
+        help="SQLite file caching LLM responses; identical prompts are replayed from it.",
+    )
+    parser.add_argument(
+        "--record",
+        default=None,
+        help="Append every LLM call of this run to a gzip JSONL cassette.",
+    )
+    parser.add_argument(
+        "--replay",
+        default=None,
+        help="Serve LLM calls from a recorded cassette instead of loading the model.",
+    )
+    parser.add_argument(
+        "--simulate-latency",
+        action="store_true",
+        help="With --replay, sleep for each call's recorded latency.",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        default=None,
+        help="Checkpoint the adaptation run to this file after every sample.",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue from --checkpoint if it exists instead of starting over.",
+    )
+    parser.add_argument(
+        "--trace",
+        default=None,
+        help="Write a Chrome trace of every stage and LLM call to this JSON file "
+        "(plus a per-stage CSV summary next to it).",
+    )
     return parser.parse_args()
 
 
@@ -231,13 +274,35 @@ def main() -> None:
     print(
         f"Loading model from {args.model_path} on GPUs {args.cuda_visible_devices}..."
     )
-    client = TransformersLLMClient(
-        args.model_path,
-        max_new_tokens=args.max_new_tokens,
-        temperature=args.temperature,
-        torch_dtype="bfloat16",
-        device_map="auto",
-    )
+    def load_client() -> TransformersLLMClient:
+        return TransformersLLMClient(
+            args.model_path,
+            max_new_tokens=args.max_new_tokens,
+            temperature=args.temperature,
+            torch_dtype="bfloat16",
+            device_map="auto",
+        )
+
+    client: LLMClient
+    if args.replay:
+        client = ReplayLLMClient(args.replay, simulate_latency=args.simulate_latency)
+    elif args.cache:
+        # Weights are loaded lazily, on the first prompt missing from the cache.
+        client = CachingLLMClient(
+            load_client,
+            args.cache,
+            model=f"{args.model_path}|max_new_tokens={args.max_new_tokens}"
+            f"|temperature={args.temperature}",
+        )
+    else:
+        client = load_client()
+    cache_client = client if isinstance(client, CachingLLMClient) else None
+    if args.record:
+        client = RecordingLLMClient(client, args.record)
+    recorder = client if isinstance(client, RecordingLLMClient) else None
+    tracer = Tracer() if args.trace else NULL_TRACER
+    if args.trace:
+        client = TracedLLMClient(client, tracer)
 
     generator = Generator(client)
     reflector = Reflector(client)
@@ -248,6 +313,7 @@ def main() -> None:
         reflector=reflector,
         curator=curator,
         max_refinement_rounds=3,
+        tracer=tracer,
     )
 
     environment = FireInvestigationEnvironment(
@@ -255,7 +321,31 @@ def main() -> None:
     )
 
     print("Starting offline adaptation...")
-    results = adapter.run(samples, environment, epochs=args.epochs)
+    resume_from = None
+    if args.resume and args.checkpoint and Path(args.checkpoint).exists():
+        resume_from = args.checkpoint
+        print(f"Resuming from {resume_from}.")
+    results = adapter.run(
+        samples,
+        environment,
+        epochs=args.epochs,
+        checkpoint_path=args.checkpoint,
+        checkpoint_every=1,
+        resume_from=resume_from,
+    )
+    if cache_client is not None:
+        stats = cache_client.stats
+        print(
+            f"LLM cache: {stats.hits} hits, {stats.misses} misses "
+            f"({stats.hit_rate:.0%} hit rate)."
+        )
+    if recorder is not None:
+        recorder.close()
+        print(f"Recorded {recorder.recorded} LLM calls to {args.record}.")
+    if isinstance(tracer, Tracer):
+        trace_path = tracer.export_chrome_trace(args.trace)
+        summary_path = tracer.export_csv(trace_path.with_suffix(".csv"))
+        print(f"Trace written to {trace_path}; stage summary in {summary_path}.")
 
     report_markdown = build_report(args, results, adapter.playbook)
     output_path = Path(args.output)
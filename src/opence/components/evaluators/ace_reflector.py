@@ -47,6 +47,7 @@ class ACEReflectorEvaluator(IEvaluator):
                 "reflection_output": reflection,
                 "reflection_raw": reflection.raw,
                 "generator_output": generator_output,
+                "usage": reflection.usage,
             },
         )
 
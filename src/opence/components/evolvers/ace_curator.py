@@ -34,6 +34,7 @@ class ACECuratorEvolver(IEvolver):
             updates={
                 "operations": [op.to_json() for op in curator_output.delta.operations],
                 "curator_reasoning": curator_output.raw.get("reasoning"),
+                "usage": curator_output.usage,
             },
         )
 
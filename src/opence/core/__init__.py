@@ -1,8 +1,14 @@
 """Core utilities for OpenCE."""
 
 from .orchestrator import ClosedLoopOrchestrator, LoopResult
+from .tracing import NULL_TRACER, NullTracer, Span, TracedLLMClient, Tracer
 
 __all__ = [
     "ClosedLoopOrchestrator",
     "LoopResult",
+    "Tracer",
+    "NullTracer",
+    "NULL_TRACER",
+    "Span",
+    "TracedLLMClient",
 ]
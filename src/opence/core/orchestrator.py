@@ -2,8 +2,9 @@
 
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import List, Sequence
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence
 
 from ..interfaces import (
     ContextBundle,
@@ -19,11 +20,20 @@ from ..interfaces import (
     ModelResponse,
 )
 from ..models import BaseModelProvider, LLMClient
+from ..models.clients import LLMUsage
+from ..models.rate_limit import estimate_tokens
+from .tracing import NULL_TRACER, AnyTracer
 
 
 @dataclass
 class LoopResult:
-    """Outputs collected from a single orchestrator run."""
+    """Outputs collected from a single orchestrator run.
+
+    ``usage`` holds the LLM usage of each pillar that reported one: the
+    main completion under ``"llm"``, plus ``"evaluator"`` / ``"evolver"``
+    when they expose a ``usage`` entry in their metadata/updates (as the ACE
+    Reflector and Curator components do).
+    """
 
     request: LLMRequest
     prompt: str
@@ -33,10 +43,16 @@ class LoopResult:
     response: ModelResponse
     evaluation: EvaluationSignal
     evolution: EvolutionDecision
+    usage: Dict[str, LLMUsage] = field(default_factory=dict)
 
 
 class ClosedLoopOrchestrator:
-    """Coordinates the five pillars to form a closed CE loop."""
+    """Coordinates the five pillars to form a closed CE loop.
+
+    With a :class:`~opence.core.tracing.Tracer` every run records a ``loop``
+    span containing ``acquire``, a ``process.<ProcessorClass>`` span per
+    processor, ``construct``, ``llm``, ``evaluate`` and ``evolve``.
+    """
 
     def __init__(
         self,
@@ -47,6 +63,7 @@ class ClosedLoopOrchestrator:
         constructor: IConstructor,
         evaluator: IEvaluator,
         evolver: IEvolver,
+        tracer: Optional[AnyTracer] = None,
     ) -> None:
         if isinstance(llm, BaseModelProvider):
             self.llm = llm.client()
@@ -57,18 +74,71 @@ class ClosedLoopOrchestrator:
         self.constructor = constructor
         self.evaluator = evaluator
         self.evolver = evolver
+        self.tracer = tracer or NULL_TRACER
+
+    def run(
+        self,
+        request: LLMRequest,
+        *,
+        on_chunk: Optional[Callable[[str], None]] = None,
+    ) -> LoopResult:
+        """Run one loop iteration.
+
+        With ``on_chunk`` the completion is requested via
+        :meth:`LLMClient.stream` and each text chunk is passed to it as soon
+        as it arrives; evaluation and evolution still see the full response.
+        """
+        with self.tracer.span("loop", "orchestrator"):
+            return self._run(request, on_chunk)
 
-    def run(self, request: LLMRequest) -> LoopResult:
-        documents = self.acquirer.acquire(request)
+    def _run(self, request: LLMRequest, on_chunk: Optional[Callable[[str], None]]) -> LoopResult:
+        tracer = self.tracer
+        with tracer.span("acquire", "orchestrator"):
+            documents = self.acquirer.acquire(request)
         processed = documents
         for processor in self.processors:
-            processed = processor.process(processed, request)
-        context_bundle = self.constructor.construct(processed, request)
+            with tracer.span(f"process.{type(processor).__name__}", "orchestrator"):
+                processed = processor.process(processed, request)
+        with tracer.span("construct", "orchestrator"):
+            context_bundle = self.constructor.construct(processed, request)
         prompt = self._format_prompt(request, context_bundle)
-        llm_response = self.llm.complete(prompt)
-        response = ModelResponse(text=llm_response.text, metadata=llm_response.raw or {})
-        evaluation = self.evaluator.evaluate(request, response, context_bundle)
-        evolution = self.evolver.evolve(context_bundle, evaluation)
+        with tracer.span("llm", "llm", streamed=on_chunk is not None) as span:
+            if on_chunk is None:
+                llm_response = self.llm.complete(prompt)
+                response = ModelResponse(text=llm_response.text, metadata=llm_response.raw or {})
+                llm_usage = llm_response.usage
+            else:
+                chunks: List[str] = []
+                started = time.perf_counter()
+                first_chunk: Optional[float] = None
+                for chunk in self.llm.stream(prompt):
+                    if first_chunk is None:
+                        first_chunk = time.perf_counter() - started
+                    chunks.append(chunk)
+                    on_chunk(chunk)
+                response = ModelResponse(
+                    text=self.llm.postprocess_text("".join(chunks)), metadata={"streamed": True}
+                )
+                llm_usage = LLMUsage(
+                    prompt_tokens=estimate_tokens(prompt),
+                    completion_tokens=estimate_tokens(response.text),
+                    time_to_first_token=first_chunk,
+                    latency=time.perf_counter() - started,
+                )
+            if llm_usage is not None:
+                span.set(
+                    prompt_tokens=llm_usage.prompt_tokens,
+                    completion_tokens=llm_usage.completion_tokens,
+                )
+        with tracer.span("evaluate", "orchestrator"):
+            evaluation = self.evaluator.evaluate(request, response, context_bundle)
+        with tracer.span("evolve", "orchestrator"):
+            evolution = self.evolver.evolve(context_bundle, evaluation)
+        usage = {
+            "llm": llm_usage,
+            "evaluator": evaluation.metadata.get("usage"),
+            "evolver": evolution.updates.get("usage"),
+        }
         return LoopResult(
             request=request,
             prompt=prompt,
@@ -78,6 +148,9 @@ class ClosedLoopOrchestrator:
             response=response,
             evaluation=evaluation,
             evolution=evolution,
+            usage={
+                pillar: value for pillar, value in usage.items() if isinstance(value, LLMUsage)
+            },
         )
 
     def _format_prompt(self, request: LLMRequest, context: ContextBundle) -> str:
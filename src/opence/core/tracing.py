@@ -0,0 +1,249 @@
+"""Lightweight span tracing for adapter and orchestrator runs.
+
+Components take an optional ``tracer`` and default to :data:`NULL_TRACER`,
+whose spans are a shared no-op context manager, so untraced runs pay one
+method call per stage. A :class:`Tracer` records every span with its thread
+and can export a Chrome trace-event file (open it in ``chrome://tracing`` or
+Perfetto) or a per-stage CSV summary.
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+from ..models.clients import LLMClient, LLMResponse, LLMUsage
+
+
+@dataclass
+class Span:
+    """One finished span; times are seconds relative to the tracer's start."""
+
+    name: str
+    category: str
+    start: float
+    duration: float
+    thread_id: int
+    thread_name: str
+    args: Dict[str, Any] = field(default_factory=dict)
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        return None
+
+    def set(self, **args: Any) -> None:
+        return None
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class NullTracer:
+    """Tracer that records nothing; the default of every traced component."""
+
+    enabled = False
+
+    def span(self, name: str, category: str = "", **args: Any) -> _NullSpan:
+        return _NULL_SPAN
+
+
+NULL_TRACER = NullTracer()
+
+
+class _ActiveSpan:
+    __slots__ = ("_tracer", "_name", "_category", "_args", "_started")
+
+    def __init__(self, tracer: "Tracer", name: str, category: str, args: Dict[str, Any]) -> None:
+        self._tracer = tracer
+        self._name = name
+        self._category = category
+        self._args = args
+        self._started = 0.0
+
+    def __enter__(self) -> "_ActiveSpan":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, traceback: Any) -> None:
+        ended = time.perf_counter()
+        if exc_type is not None:
+            self._args["error"] = exc_type.__name__
+        self._tracer._record(self._name, self._category, self._started, ended, self._args)
+
+    def set(self, **args: Any) -> None:
+        """Attach arguments known only once the span is running (e.g. token counts)."""
+        self._args.update(args)
+
+
+class Tracer:
+    """Collects timed spans from any number of threads.
+
+    Use ``with tracer.span("curate", "ace", step=3):`` around a stage; spans
+    nest naturally per thread in the exported timeline.
+    """
+
+    enabled = True
+
+    def __init__(self) -> None:
+        self.spans: List[Span] = []
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def span(self, name: str, category: str = "", **args: Any) -> _ActiveSpan:
+        return _ActiveSpan(self, name, category, args)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.spans.clear()
+            self._origin = time.perf_counter()
+
+    def _record(
+        self, name: str, category: str, started: float, ended: float, args: Dict[str, Any]
+    ) -> None:
+        thread = threading.current_thread()
+        span = Span(
+            name=name,
+            category=category,
+            start=started - self._origin,
+            duration=ended - started,
+            thread_id=thread.ident or 0,
+            thread_name=thread.name,
+            args=args,
+        )
+        with self._lock:
+            self.spans.append(span)
+
+    # ------------------------------------------------------------------ #
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Per span name: count, total, mean and max seconds, slowest total first."""
+        with self._lock:
+            spans = list(self.spans)
+        stats: Dict[str, Dict[str, float]] = {}
+        for span in spans:
+            entry = stats.setdefault(span.name, {"count": 0, "total": 0.0, "max": 0.0})
+            entry["count"] += 1
+            entry["total"] += span.duration
+            entry["max"] = max(entry["max"], span.duration)
+        for entry in stats.values():
+            entry["mean"] = entry["total"] / entry["count"]
+        return dict(sorted(stats.items(), key=lambda item: item[1]["total"], reverse=True))
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """Spans as Chrome trace-event JSON (complete ``X`` events, microseconds)."""
+        with self._lock:
+            spans = list(self.spans)
+        pid = os.getpid()
+        events: List[Dict[str, Any]] = []
+        thread_names: Dict[int, str] = {}
+        for span in spans:
+            thread_names.setdefault(span.thread_id, span.thread_name)
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": span.category,
+                    "ph": "X",
+                    "ts": span.start * 1e6,
+                    "dur": span.duration * 1e6,
+                    "pid": pid,
+                    "tid": span.thread_id,
+                    "args": span.args,
+                }
+            )
+        for thread_id, thread_name in thread_names.items():
+            events.append(
+                {
+                    "name": "thread_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "tid": thread_id,
+                    "args": {"name": thread_name},
+                }
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_chrome_trace(self, path: Union[str, Path]) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(
+            json.dumps(self.to_chrome_trace(), ensure_ascii=False, default=repr), encoding="utf-8"
+        )
+        return path
+
+    def export_csv(self, path: Union[str, Path]) -> Path:
+        """Write :meth:`summary` as CSV with one row per span name."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w", encoding="utf-8", newline="") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(["name", "count", "total_s", "mean_s", "max_s"])
+            for name, entry in self.summary().items():
+                writer.writerow(
+                    [
+                        name,
+                        int(entry["count"]),
+                        f"{entry['total']:.6f}",
+                        f"{entry['mean']:.6f}",
+                        f"{entry['max']:.6f}",
+                    ]
+                )
+        return path
+
+
+AnyTracer = Union[Tracer, NullTracer]
+
+
+class TracedLLMClient(LLMClient):
+    """Wraps a client so every completion is recorded as an ``llm`` span.
+
+    Span arguments carry the model and, when the wrapped client reports
+    usage, token counts and queue time, so slow calls can be told apart from
+    calls that waited on a rate limiter.
+    """
+
+    def __init__(self, client: LLMClient, tracer: AnyTracer, *, name: str = "llm") -> None:
+        super().__init__(model=client.model)
+        self.client = client
+        self.tracer = tracer
+        self.name = name
+
+    def complete(self, prompt: str, **kwargs: Any) -> LLMResponse:
+        with self.tracer.span(self.name, "llm", model=self.model) as span:
+            response = self.client.complete(prompt, **kwargs)
+            span.set(**_usage_args(response.usage))
+        return response
+
+    async def acomplete(self, prompt: str, **kwargs: Any) -> LLMResponse:
+        with self.tracer.span(self.name, "llm", model=self.model) as span:
+            response = await self.client.acomplete(prompt, **kwargs)
+            span.set(**_usage_args(response.usage))
+        return response
+
+    def stream(self, prompt: str, **kwargs: Any) -> Iterator[str]:
+        with self.tracer.span(f"{self.name}.stream", "llm", model=self.model):
+            yield from self.client.stream(prompt, **kwargs)
+
+    def postprocess_text(self, text: str) -> str:
+        return self.client.postprocess_text(text)
+
+
+def _usage_args(usage: Optional[LLMUsage]) -> Dict[str, Any]:
+    if usage is None:
+        return {}
+    return {
+        "prompt_tokens": usage.prompt_tokens,
+        "completion_tokens": usage.completion_tokens,
+        "queue_time": usage.queue_time,
+        "retries": usage.retries,
+    }
@@ -2,6 +2,11 @@
 
 from .playbook import Bullet, Playbook
 from .delta import DeltaOperation, DeltaBatch
+from .journal import PlaybookJournal
+from .storage import InMemoryStorage, PlaybookStorage, SQLiteStorage
+from .retrieval import BulletIndex, PlaybookRetriever
+from .json_repair import JsonRepairStats, repair_json
+from .json_stream import JsonFieldParser
 from opence.models.clients import LLMClient, DummyLLMClient, TransformersLLMClient
 from .roles import (
     Generator,
@@ -18,13 +23,29 @@ from .adaptation import (
     TaskEnvironment,
     EnvironmentResult,
     AdapterStepResult,
+    PipelineStats,
+    SNAPSHOT_POLICIES,
+    aggregate_usage,
+    apply_snapshot_diff,
+    snapshot_diff,
 )
+from .checkpoint import AdapterCheckpoint
+from .sinks import CallbackResultSink, JsonlResultSink, ResultSink, read_results
 
 __all__ = [
     "Bullet",
     "Playbook",
     "DeltaOperation",
     "DeltaBatch",
+    "PlaybookJournal",
+    "PlaybookStorage",
+    "InMemoryStorage",
+    "SQLiteStorage",
+    "BulletIndex",
+    "PlaybookRetriever",
+    "JsonRepairStats",
+    "repair_json",
+    "JsonFieldParser",
     "LLMClient",
     "DummyLLMClient",
     "TransformersLLMClient",
@@ -40,4 +61,14 @@ __all__ = [
     "TaskEnvironment",
     "EnvironmentResult",
     "AdapterStepResult",
+    "PipelineStats",
+    "AdapterCheckpoint",
+    "SNAPSHOT_POLICIES",
+    "aggregate_usage",
+    "snapshot_diff",
+    "apply_snapshot_diff",
+    "ResultSink",
+    "JsonlResultSink",
+    "CallbackResultSink",
+    "read_results",
 ]
@@ -2,14 +2,56 @@
 
 from __future__ import annotations
 
+import difflib
+import itertools
 import json
+import queue
+import re
+import threading
+import time
+import uuid
 from abc import ABC, abstractmethod
-from dataclasses import dataclass, field
-from typing import Dict, Iterable, List, Optional, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Type,
+    Union,
+)
 
+from opence.core.tracing import NULL_TRACER, AnyTracer
+from opence.models.clients import LLMUsage
+
+from .checkpoint import CHECKPOINT_MARKER_KEY, AdapterCheckpoint
 from .deduplication import Deduplicator
-from .playbook import Playbook
-from .roles import Curator, CuratorOutput, Generator, GeneratorOutput, Reflector, ReflectorOutput
+from .delta import DeltaBatch, DeltaOperation
+from .playbook import BULLET_TAGS, Playbook
+from .roles import (
+    BulletTag,
+    Curator,
+    CuratorOutput,
+    Generator,
+    GeneratorOutput,
+    Reflector,
+    ReflectorOutput,
+)
+
+if TYPE_CHECKING:  # pragma: no cover - for type hints only
+    from .sinks import ResultSink
+
+# How each step records the playbook: the full prompt text, a unified diff
+# against the previous step, only the playbook version, or nothing.
+SNAPSHOT_POLICIES = ("full", "diff", "version", "none")
 
 
 @dataclass
@@ -43,16 +85,186 @@ class TaskEnvironment(ABC):
 
 @dataclass
 class AdapterStepResult:
+    """Outcome of one sample.
+
+    With batched curation every step of a batch shares the same
+    ``curator_output`` and post-apply ``playbook_snapshot``;
+    ``curation_batch_size`` records how many reflections that curator call
+    merged.
+
+    What ``playbook_snapshot`` holds depends on the adapter's
+    ``snapshot_policy``: the rendered playbook (``"full"``), a diff against
+    the previous step's rendering to be replayed with
+    :func:`apply_snapshot_diff` (``"diff"``), or ``""`` (``"version"`` and
+    ``"none"``). ``playbook_version`` is the :attr:`Playbook.version` after
+    the step, except under ``"none"``.
+    """
+
     sample: Sample
     generator_output: GeneratorOutput
     environment_result: EnvironmentResult
     reflection: ReflectorOutput
     curator_output: CuratorOutput
     playbook_snapshot: str
+    curation_batch_size: int = 1
+    playbook_version: Optional[int] = None
+
+    @property
+    def usage(self) -> Dict[str, LLMUsage]:
+        """Token and latency usage of each role's LLM calls for this sample.
+
+        With batched curation the ``curator`` entry covers the whole batch;
+        :func:`aggregate_usage` counts it once.
+        """
+        roles = {
+            "generator": self.generator_output.usage,
+            "reflector": self.reflection.usage,
+            "curator": self.curator_output.usage,
+        }
+        return {role: usage for role, usage in roles.items() if usage is not None}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-ready form; role outputs keep their ``usage`` records."""
+        return asdict(self)
+
+    @classmethod
+    def from_dict(
+        cls, payload: Dict[str, Any], *, sample_type: Type[Sample] = Sample
+    ) -> "AdapterStepResult":
+        """Inverse of :meth:`to_dict`; ``sample_type`` restores Sample subclasses."""
+        generator = dict(payload["generator_output"])
+        generator["usage"] = _load_usage(generator.get("usage"))
+        reflection = dict(payload["reflection"])
+        reflection["usage"] = _load_usage(reflection.get("usage"))
+        reflection["bullet_tags"] = [BulletTag(**tag) for tag in reflection["bullet_tags"]]
+        curator = payload["curator_output"]
+        return cls(
+            sample=sample_type(**payload["sample"]),
+            generator_output=GeneratorOutput(**generator),
+            environment_result=EnvironmentResult(**payload["environment_result"]),
+            reflection=ReflectorOutput(**reflection),
+            curator_output=CuratorOutput(
+                delta=DeltaBatch.from_json(curator["delta"]),
+                raw=curator["raw"],
+                usage=_load_usage(curator.get("usage")),
+            ),
+            playbook_snapshot=payload["playbook_snapshot"],
+            curation_batch_size=payload.get("curation_batch_size", 1),
+            playbook_version=payload.get("playbook_version"),
+        )
+
+
+def _load_usage(payload: Optional[Dict[str, Any]]) -> Optional[LLMUsage]:
+    return LLMUsage(**payload) if payload else None
+
+
+def _restore_results(
+    payloads: Iterable[Dict[str, Any]], sample_type: Type[Sample]
+) -> List[AdapterStepResult]:
+    """Load results, re-sharing one curator output across each curation batch."""
+    results: List[AdapterStepResult] = []
+    remaining = 0
+    for payload in payloads:
+        result = AdapterStepResult.from_dict(payload, sample_type=sample_type)
+        if remaining:
+            result.curator_output = results[-1].curator_output
+            remaining -= 1
+        else:
+            remaining = result.curation_batch_size - 1
+        results.append(result)
+    return results
+
+
+_HUNK_HEADER = re.compile(r"@@ -(\d+)(?:,(\d+))? \+\d+(?:,\d+)? @@")
+
+
+def snapshot_diff(previous: str, current: str) -> str:
+    """Line diff turning ``previous`` into ``current``; ``""`` when unchanged."""
+    if previous == current:
+        return ""
+    lines = difflib.unified_diff(
+        previous.split("\n"), current.split("\n"), lineterm="", n=0
+    )
+    # Drop the ---/+++ file headers; only the hunks are needed to replay.
+    return "\n".join(itertools.islice(lines, 2, None))
+
+
+def apply_snapshot_diff(previous: str, diff: str) -> str:
+    """Replay a :func:`snapshot_diff` on ``previous``.
+
+    Starting from ``""`` and applying the ``playbook_snapshot`` of each step
+    of a ``snapshot_policy="diff"`` run in order rebuilds every snapshot.
+    """
+    if not diff:
+        return previous
+    source = previous.split("\n")
+    patched: List[str] = []
+    cursor = 0
+    for line in diff.split("\n"):
+        header = _HUNK_HEADER.match(line)
+        if header:
+            length = int(header.group(2) or 1)
+            # Pure insertions name the line they follow rather than the first replaced.
+            start = int(header.group(1)) - (1 if length else 0)
+            patched.extend(source[cursor:start])
+            cursor = start + length
+        elif line.startswith("+"):
+            patched.append(line[1:])
+    patched.extend(source[cursor:])
+    return "\n".join(patched)
+
+
+def aggregate_usage(results: Iterable[AdapterStepResult]) -> Dict[str, LLMUsage]:
+    """Sum per-role usage over ``results``, e.g. to see which role dominates cost."""
+    totals = {role: LLMUsage(calls=0) for role in ("generator", "reflector", "curator")}
+    seen_curations = set()
+    for result in results:
+        for role, usage in result.usage.items():
+            if role == "curator":
+                if id(result.curator_output) in seen_curations:
+                    continue
+                seen_curations.add(id(result.curator_output))
+            totals[role].add(usage)
+    return totals
+
+
+@dataclass
+class PipelineStats:
+    """Per-stage timings collected while running with ``pipeline_staleness``.
+
+    ``busy`` is the time each stage spent working and ``stalled`` the time it
+    spent blocked: ``generate`` stalls when it would exceed the staleness
+    bound, ``reflect`` stalls while waiting for the next generator output.
+    """
+
+    wall_time: float = 0.0
+    samples: int = 0
+    busy: Dict[str, float] = field(default_factory=dict)
+    stalled: Dict[str, float] = field(default_factory=dict)
+
+    def record(self, stage: str, seconds: float, *, stalled: bool = False) -> None:
+        bucket = self.stalled if stalled else self.busy
+        bucket[stage] = bucket.get(stage, 0.0) + seconds
+
+    def occupancy(self) -> Dict[str, float]:
+        """Fraction of the wall time each stage was busy."""
+        if self.wall_time <= 0:
+            return {stage: 0.0 for stage in self.busy}
+        return {stage: seconds / self.wall_time for stage, seconds in self.busy.items()}
+
+
+_PIPELINE_DONE = object()
 
 
 class AdapterBase:
-    """Shared orchestration logic for offline and online ACE adaptation."""
+    """Shared orchestration logic for offline and online ACE adaptation.
+
+    With a :class:`~opence.core.tracing.Tracer` each sample records
+    ``generate``, ``evaluate``, ``reflect``, ``tag`` (when bullets were
+    tagged), ``curate``, ``apply_delta`` and ``snapshot`` spans, inside a
+    ``sample`` span when processed sequentially; wrap the role clients in
+    :class:`~opence.core.tracing.TracedLLMClient` to see the LLM calls too.
+    """
 
     def __init__(
         self,
@@ -63,14 +275,36 @@ class AdapterBase:
         curator: Curator,
         max_refinement_rounds: int = 1,
         reflection_window: int = 3,
+        pipeline_staleness: Optional[int] = None,
+        curation_batch_size: int = 1,
+        snapshot_policy: str = "full",
+        tracer: Optional[AnyTracer] = None,
     ) -> None:
+        if pipeline_staleness is not None and pipeline_staleness < 0:
+            raise ValueError("pipeline_staleness must be non-negative.")
+        if curation_batch_size < 1:
+            raise ValueError("curation_batch_size must be at least 1.")
+        if snapshot_policy not in SNAPSHOT_POLICIES:
+            raise ValueError(f"snapshot_policy must be one of {SNAPSHOT_POLICIES}.")
         self.playbook = playbook or Playbook()
         self.generator = generator
         self.reflector = reflector
         self.curator = curator
         self.max_refinement_rounds = max_refinement_rounds
         self.reflection_window = reflection_window
+        self.pipeline_staleness = pipeline_staleness
+        self.curation_batch_size = curation_batch_size
+        self.snapshot_policy = snapshot_policy
+        self.pipeline_stats: Optional[PipelineStats] = None
+        self.tracer = tracer or NULL_TRACER
         self._recent_reflections: List[str] = []
+        self._active_snapshot_policy = snapshot_policy
+        self._last_snapshot = ""
+        if generator.retriever is not None:
+            # Index the live playbook once; snapshots are resolved against it.
+            generator.retriever.attach(self.playbook)
+        # Guards live-playbook mutations against the pipelined generator thread.
+        self._pipeline_lock = threading.RLock()
 
     # ------------------------------------------------------------------ #
     def _reflection_context(self) -> str:
@@ -83,11 +317,51 @@ class AdapterBase:
             self._recent_reflections = self._recent_reflections[-self.reflection_window :]
 
     def _apply_bullet_tags(self, reflection: ReflectorOutput) -> None:
+        operations: List[DeltaOperation] = []
         for tag in reflection.bullet_tags:
-            try:
-                self.playbook.tag_bullet(tag.id, tag.tag)
-            except ValueError:
+            bullet = self.playbook.get_bullet(tag.id)
+            if bullet is None or tag.tag not in BULLET_TAGS:
                 continue
+            operations.append(
+                DeltaOperation(
+                    type="TAG",
+                    section=bullet.section,
+                    bullet_id=tag.id,
+                    metadata={tag.tag: 1},
+                )
+            )
+        if operations:
+            # Routed through apply_delta so journaled playbooks record the tags.
+            with self.tracer.span("tag", "ace", operations=len(operations)):
+                self.playbook.apply_delta(
+                    DeltaBatch(reasoning="reflector bullet tags", operations=operations)
+                )
+
+    def _apply_delta(self, delta: DeltaBatch) -> None:
+        with self.tracer.span("apply_delta", "ace", operations=len(delta.operations)):
+            self.playbook.apply_delta(delta)
+
+    def _begin_snapshots(self, snapshot_policy: Optional[str]) -> None:
+        policy = snapshot_policy or self.snapshot_policy
+        if policy not in SNAPSHOT_POLICIES:
+            raise ValueError(f"snapshot_policy must be one of {SNAPSHOT_POLICIES}.")
+        self._active_snapshot_policy = policy
+        self._last_snapshot = ""
+
+    def _snapshot_prompt(self) -> Tuple[str, Optional[int]]:
+        """The step's ``(playbook_snapshot, playbook_version)`` under the active policy."""
+        policy = self._active_snapshot_policy
+        if policy == "none":
+            return "", None
+        if policy == "version":
+            return "", self.playbook.version
+        with self.tracer.span("snapshot", "ace"):
+            prompt = self.playbook.as_prompt()
+            if policy == "diff":
+                diff = snapshot_diff(self._last_snapshot, prompt)
+                self._last_snapshot = prompt
+                return diff, self.playbook.version
+        return prompt, self.playbook.version
 
     def _question_context(self, sample: Sample, environment_result: EnvironmentResult) -> str:
         parts = [
@@ -102,6 +376,56 @@ class AdapterBase:
     def _progress_string(self, epoch: int, total_epochs: int, step: int, total_steps: int) -> str:
         return f"epoch {epoch}/{total_epochs} · sample {step}/{total_steps}"
 
+    def _generate(
+        self,
+        sample: Sample,
+        environment: TaskEnvironment,
+        playbook: Playbook,
+        reflection_context: str,
+    ) -> Tuple[GeneratorOutput, EnvironmentResult]:
+        with self.tracer.span("generate", "ace"):
+            generator_output = self.generator.generate(
+                question=sample.question,
+                context=sample.context,
+                playbook=playbook,
+                reflection=reflection_context,
+            )
+        with self.tracer.span("evaluate", "ace"):
+            return generator_output, environment.evaluate(sample, generator_output)
+
+    def _reflect(
+        self,
+        sample: Sample,
+        generator_output: GeneratorOutput,
+        env_result: EnvironmentResult,
+        playbook: Playbook,
+    ) -> ReflectorOutput:
+        with self.tracer.span("reflect", "ace"):
+            return self.reflector.reflect(
+                question=sample.question,
+                generator_output=generator_output,
+                playbook=playbook,
+                ground_truth=env_result.ground_truth,
+                feedback=env_result.feedback,
+                max_refinement_rounds=self.max_refinement_rounds,
+            )
+
+    def _curate(
+        self,
+        sample: Sample,
+        env_result: EnvironmentResult,
+        reflection: ReflectorOutput,
+        playbook: Playbook,
+        progress: str,
+    ) -> CuratorOutput:
+        with self.tracer.span("curate", "ace"):
+            return self.curator.curate(
+                reflection=reflection,
+                playbook=playbook,
+                question_context=self._question_context(sample, env_result),
+                progress=progress,
+            )
+
     def _process_sample(
         self,
         sample: Sample,
@@ -112,42 +436,227 @@ class AdapterBase:
         step_index: int,
         total_steps: int,
     ) -> AdapterStepResult:
-        generator_output = self.generator.generate(
-            question=sample.question,
-            context=sample.context,
-            playbook=self.playbook,
-            reflection=self._reflection_context(),
-        )
-        env_result = environment.evaluate(sample, generator_output)
-        reflection = self.reflector.reflect(
-            question=sample.question,
-            generator_output=generator_output,
-            playbook=self.playbook,
-            ground_truth=env_result.ground_truth,
-            feedback=env_result.feedback,
-            max_refinement_rounds=self.max_refinement_rounds,
+        with self.tracer.span("sample", "ace", epoch=epoch, step=step_index):
+            progress = self._progress_string(epoch, total_epochs, step_index, total_steps)
+            return self._process_sample_stages(sample, environment, progress)
+
+    def _process_sample_stages(
+        self, sample: Sample, environment: TaskEnvironment, progress: str
+    ) -> AdapterStepResult:
+        generator_output, env_result = self._generate(
+            sample, environment, self.playbook, self._reflection_context()
         )
+        reflection = self._reflect(sample, generator_output, env_result, self.playbook)
         self._apply_bullet_tags(reflection)
         self._update_recent_reflections(reflection)
-        curator_output = self.curator.curate(
-            reflection=reflection,
-            playbook=self.playbook,
-            question_context=self._question_context(sample, env_result),
-            progress=self._progress_string(epoch, total_epochs, step_index, total_steps),
+        curator_output = self._curate(
+            sample,
+            env_result,
+            reflection,
+            self.playbook,
+            progress,
         )
-        self.playbook.apply_delta(curator_output.delta)
+        self._apply_delta(curator_output.delta)
+        playbook_snapshot, playbook_version = self._snapshot_prompt()
         return AdapterStepResult(
             sample=sample,
             generator_output=generator_output,
             environment_result=env_result,
             reflection=reflection,
             curator_output=curator_output,
-            playbook_snapshot=self.playbook.as_prompt(),
+            playbook_snapshot=playbook_snapshot,
+            playbook_version=playbook_version,
         )
 
+    def _process_batch(
+        self,
+        batch: Sequence[Sample],
+        environment: TaskEnvironment,
+        progress: str,
+    ) -> List[AdapterStepResult]:
+        """Generate and reflect on each sample, then curate the batch in one call.
+
+        Reflector tags are applied per sample as before; the curator sees all
+        reflections of the batch at once and its merged delta is applied once.
+        """
+        steps = []
+        for sample in batch:
+            generator_output, env_result = self._generate(
+                sample, environment, self.playbook, self._reflection_context()
+            )
+            reflection = self._reflect(sample, generator_output, env_result, self.playbook)
+            self._apply_bullet_tags(reflection)
+            self._update_recent_reflections(reflection)
+            steps.append((sample, generator_output, env_result, reflection))
+        with self.tracer.span("curate", "ace", batch=len(steps)):
+            curator_output = self.curator.curate_batch(
+                reflections=[reflection for *_, reflection in steps],
+                playbook=self.playbook,
+                question_contexts=[
+                    self._question_context(sample, env_result)
+                    for sample, _, env_result, _ in steps
+                ],
+                progress=progress,
+            )
+        self._apply_delta(curator_output.delta)
+        results = []
+        for sample, generator_output, env_result, reflection in steps:
+            # Cached render: "full" steps share one string, later "diff" steps are empty.
+            playbook_snapshot, playbook_version = self._snapshot_prompt()
+            results.append(
+                AdapterStepResult(
+                    sample=sample,
+                    generator_output=generator_output,
+                    environment_result=env_result,
+                    reflection=reflection,
+                    curator_output=curator_output,
+                    playbook_snapshot=playbook_snapshot,
+                    curation_batch_size=len(steps),
+                    playbook_version=playbook_version,
+                )
+            )
+        return results
+
+    def _check_batch_size(self, curation_batch_size: Optional[int]) -> int:
+        batch_size = curation_batch_size or self.curation_batch_size
+        if batch_size < 1:
+            raise ValueError("curation_batch_size must be at least 1.")
+        if batch_size > 1 and self.pipeline_staleness is not None:
+            raise ValueError("Batched curation cannot be combined with pipeline_staleness.")
+        return batch_size
+
+    def _iter_pipelined(
+        self,
+        samples: Iterable[Sample],
+        environment: TaskEnvironment,
+        progress: Callable[[int], str],
+        stats: PipelineStats,
+    ) -> Iterator[AdapterStepResult]:
+        """Overlap generation of later samples with reflect/curate of earlier ones.
+
+        A background thread generates and evaluates samples in order against
+        a :meth:`Playbook.snapshot` of the live playbook, while this thread
+        reflects, curates and applies deltas. Sample ``k`` is generated only
+        once at least ``k - pipeline_staleness`` deltas have been applied, so
+        with ``pipeline_staleness=0`` results match sequential processing.
+        """
+        staleness = self.pipeline_staleness or 0
+        handoff: "queue.Queue[object]" = queue.Queue(maxsize=staleness + 1)
+        progressed = threading.Condition(self._pipeline_lock)
+        stop = threading.Event()
+        applied = [0]
+
+        def hand_over(item: object) -> None:
+            while not stop.is_set():
+                try:
+                    handoff.put(item, timeout=0.05)
+                    return
+                except queue.Full:
+                    continue
+
+        def produce() -> None:
+            snapshot: Optional[Playbook] = None
+            try:
+                for index, sample in enumerate(samples):
+                    started = time.perf_counter()
+                    with progressed:
+                        while applied[0] < index - staleness and not stop.is_set():
+                            progressed.wait(0.05)
+                        if stop.is_set():
+                            return
+                        waited = time.perf_counter()
+                        if snapshot is None or snapshot.version != self.playbook.version:
+                            with self.tracer.span("playbook.snapshot", "ace"):
+                                snapshot = self.playbook.snapshot()
+                        reflection_context = self._reflection_context()
+                    snapshotted = time.perf_counter()
+                    stats.record("generate", waited - started, stalled=True)
+                    stats.record("snapshot", snapshotted - waited)
+                    generator_output, env_result = self._generate(
+                        sample, environment, snapshot, reflection_context
+                    )
+                    stats.record("generate", time.perf_counter() - snapshotted)
+                    hand_over((index, sample, generator_output, env_result))
+            except BaseException as exc:  # surfaced on the consuming thread
+                hand_over(exc)
+                return
+            hand_over(_PIPELINE_DONE)
+
+        producer = threading.Thread(target=produce, name="ace-generator", daemon=True)
+        run_started = time.perf_counter()
+        producer.start()
+        try:
+            while True:
+                started = time.perf_counter()
+                item = handoff.get()
+                stats.record("reflect", time.perf_counter() - started, stalled=True)
+                if item is _PIPELINE_DONE:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                index, sample, generator_output, env_result = item  # type: ignore[misc]
+
+                started = time.perf_counter()
+                reflection = self._reflect(sample, generator_output, env_result, self.playbook)
+                stats.record("reflect", time.perf_counter() - started)
+
+                started = time.perf_counter()
+                with progressed:
+                    self._apply_bullet_tags(reflection)
+                    self._update_recent_reflections(reflection)
+                stats.record("apply", time.perf_counter() - started)
+
+                started = time.perf_counter()
+                curator_output = self._curate(
+                    sample, env_result, reflection, self.playbook, progress(index + 1)
+                )
+                stats.record("curate", time.perf_counter() - started)
+
+                started = time.perf_counter()
+                with progressed:
+                    self._apply_delta(curator_output.delta)
+                    applied[0] += 1
+                    progressed.notify_all()
+                playbook_snapshot, playbook_version = self._snapshot_prompt()
+                stats.record("apply", time.perf_counter() - started)
+                stats.samples += 1
+                yield AdapterStepResult(
+                    sample=sample,
+                    generator_output=generator_output,
+                    environment_result=env_result,
+                    reflection=reflection,
+                    curator_output=curator_output,
+                    playbook_snapshot=playbook_snapshot,
+                    playbook_version=playbook_version,
+                )
+        finally:
+            stop.set()
+            with progressed:
+                progressed.notify_all()
+            producer.join()
+            stats.wall_time += time.perf_counter() - run_started
+
 
 class OfflineAdapter(AdapterBase):
-    """Runs multi-epoch offline adaptation on a training split."""
+    """Runs multi-epoch offline adaptation on a training split.
+
+    With ``max_workers > 1`` samples are processed in waves of
+    ``max_workers``: generate, evaluate, reflect and curate run in parallel
+    against an immutable :meth:`Playbook.snapshot` taken at the start of the
+    wave, then reflector tags and curator deltas are merged into the live
+    playbook in sample order. Given an LLM client that is deterministic per
+    prompt, results do not depend on thread scheduling.
+
+    ``pipeline_staleness`` enables the alternative pipelined mode (see
+    :meth:`AdapterBase._iter_pipelined`); the two modes are exclusive.
+
+    ``curation_batch_size`` (overridable per :meth:`run`) sends K reflections
+    to the curator in one call; a shorter final batch is flushed at the end
+    of each epoch.
+
+    ``snapshot_policy`` (see :class:`AdapterStepResult`) bounds how much
+    playbook text each returned result keeps.
+    """
 
     def __init__(
         self,
@@ -159,6 +668,11 @@ class OfflineAdapter(AdapterBase):
         deduplicator: Optional[Deduplicator] = None,
         max_refinement_rounds: int = 1,
         reflection_window: int = 3,
+        max_workers: int = 1,
+        pipeline_staleness: Optional[int] = None,
+        curation_batch_size: int = 1,
+        snapshot_policy: str = "full",
+        tracer: Optional[AnyTracer] = None,
     ) -> None:
         super().__init__(
             playbook=playbook,
@@ -167,51 +681,404 @@ class OfflineAdapter(AdapterBase):
             curator=curator,
             max_refinement_rounds=max_refinement_rounds,
             reflection_window=reflection_window,
+            pipeline_staleness=pipeline_staleness,
+            curation_batch_size=curation_batch_size,
+            snapshot_policy=snapshot_policy,
+            tracer=tracer,
         )
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1.")
+        if max_workers > 1 and pipeline_staleness is not None:
+            raise ValueError("max_workers and pipeline_staleness cannot be combined.")
         self.deduplicator = deduplicator
+        self.max_workers = max_workers
+        self._checkpoint_run_id = ""
 
     def run(
         self,
         samples: Sequence[Sample],
         environment: TaskEnvironment,
         epochs: int = 1,
+        *,
+        curation_batch_size: Optional[int] = None,
+        checkpoint_path: Optional[Union[str, Path]] = None,
+        checkpoint_every: Optional[int] = None,
+        checkpoint_interval: Optional[float] = None,
+        resume_from: Optional[Union[str, Path]] = None,
     ) -> List[AdapterStepResult]:
+        """Adapt on ``samples`` for ``epochs`` epochs and return every step's result.
+
+        With ``checkpoint_path`` the run state (playbook, reflection window,
+        epoch/step cursor, the epoch's new bullet ids awaiting deduplication
+        and the results so far) is saved atomically after every
+        ``checkpoint_every`` steps and/or ``checkpoint_interval`` seconds, and
+        at the end of each epoch. ``resume_from`` restores such a checkpoint
+        into :attr:`playbook` (keeping its storage, journal and listeners) and
+        continues with the first step it does not cover, so completed steps
+        are not sent to the LLM again; it also keeps checkpointing there
+        unless ``checkpoint_path`` points elsewhere. Steps are checkpointed
+        whole: a curation batch or worker wave at a time, and in pipelined
+        mode any generations still in flight are redone.
+
+        Only in-memory playbooks without a journal are copied into the
+        checkpoint. A journaled playbook is checkpointed by its journal
+        sequence number and rewound to it on resume. Durable storage (e.g.
+        :class:`SQLiteStorage`) is checkpointed by a marker: the run keeps a
+        storage transaction open that commits with each checkpoint and is
+        rolled back if the run fails, so resume the same storage and build a
+        fresh :class:`Playbook` over it after a failure.
+        """
         results: List[AdapterStepResult] = []
         total_steps = len(samples)
-        for epoch_idx in range(1, epochs + 1):
-            bullet_ids_this_epoch = []
-            for step_idx, sample in enumerate(samples, start=1):
-                result = self._process_sample(
-                    sample,
+        batch_size = self._check_batch_size(curation_batch_size)
+        if batch_size > 1 and self.max_workers > 1:
+            raise ValueError("Batched curation cannot be combined with max_workers > 1.")
+        self._begin_snapshots(None)
+        first_epoch, first_step = 1, 0
+        bullet_ids_this_epoch: List[str] = []
+        restored: List[Dict[str, Any]] = []
+        storage = self.playbook.storage
+        if resume_from is not None:
+            marker = storage.get_meta(CHECKPOINT_MARKER_KEY) if storage.durable else None
+            state, restored = AdapterCheckpoint.load(resume_from, storage_marker=marker)
+            if state["total_steps"] != total_steps:
+                raise ValueError(
+                    f"Checkpoint {resume_from} was written for {state['total_steps']} "
+                    f"samples per epoch, not {total_steps}."
+                )
+            self._restore_state(state)
+            first_epoch, first_step = state["epoch"], state["step"]
+            bullet_ids_this_epoch = list(state["bullet_ids_this_epoch"])
+            sample_type = type(samples[0]) if total_steps else Sample
+            results = _restore_results(restored, sample_type)
+            checkpoint_path = checkpoint_path or resume_from
+        checkpoint: Optional[AdapterCheckpoint] = None
+        if checkpoint_path is not None:
+            checkpoint = AdapterCheckpoint(
+                checkpoint_path, every_steps=checkpoint_every, every_seconds=checkpoint_interval
+            )
+            checkpoint.start(restored)
+        holds_storage = checkpoint is not None and storage.durable
+        if holds_storage:
+            storage.begin()
+        if self.pipeline_staleness is not None:
+            self.pipeline_stats = PipelineStats()
+        executor = (
+            ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ace-worker")
+            if self.max_workers > 1
+            else None
+        )
+        try:
+            for epoch_idx in range(first_epoch, epochs + 1):
+                step = first_step if epoch_idx == first_epoch else 0
+                if epoch_idx != first_epoch:
+                    bullet_ids_this_epoch = []
+                chunks = self._iter_epoch(
+                    samples,
                     environment,
+                    executor,
                     epoch=epoch_idx,
+                    epochs=epochs,
+                    batch_size=batch_size,
+                    first_step=step,
+                )
+                for chunk in chunks:
+                    counted = set()
+                    for result in chunk:
+                        results.append(result)
+                        # Steps of a curation batch share one curator output.
+                        if id(result.curator_output) in counted:
+                            continue
+                        counted.add(id(result.curator_output))
+                        bullet_ids_this_epoch.extend(
+                            op.bullet_id
+                            for op in result.curator_output.delta.operations
+                            if op.bullet_id
+                        )
+                    step += len(chunk)
+                    if checkpoint is not None:
+                        checkpoint.record([result.to_dict() for result in chunk])
+                        if checkpoint.due():
+                            self._save_checkpoint(
+                                checkpoint, epoch_idx, step, total_steps, bullet_ids_this_epoch
+                            )
+
+                if self.deduplicator:
+                    with self.tracer.span("deduplicate", "ace", epoch=epoch_idx):
+                        self.playbook.deduplicate(self.deduplicator, bullet_ids_this_epoch)
+                        self.deduplicator.save_embeddings()
+                if checkpoint is not None:
+                    self._save_checkpoint(checkpoint, epoch_idx + 1, 0, total_steps, [])
+        except BaseException:
+            if holds_storage:
+                storage.rollback()
+                holds_storage = False
+            raise
+        finally:
+            if executor is not None:
+                executor.shutdown()
+            if holds_storage:
+                storage.commit()
+            if checkpoint is not None:
+                checkpoint.close()
+
+        return results
+
+    def _iter_epoch(
+        self,
+        samples: Sequence[Sample],
+        environment: TaskEnvironment,
+        executor: Optional[ThreadPoolExecutor],
+        *,
+        epoch: int,
+        epochs: int,
+        batch_size: int,
+        first_step: int,
+    ) -> Iterator[List[AdapterStepResult]]:
+        """Yield an epoch's results from ``first_step`` on, one checkpointable unit at a time."""
+        total_steps = len(samples)
+        if self.pipeline_staleness is not None:
+            for result in self._iter_pipelined(
+                samples[first_step:],
+                environment,
+                lambda step: self._progress_string(epoch, epochs, first_step + step, total_steps),
+                self.pipeline_stats,
+            ):
+                yield [result]
+        elif batch_size > 1:
+            for start in range(first_step, total_steps, batch_size):
+                batch = samples[start : start + batch_size]
+                yield self._process_batch(
+                    batch,
+                    environment,
+                    self._progress_string(epoch, epochs, start + len(batch), total_steps),
+                )
+        elif executor is None:
+            for step_idx in range(first_step, total_steps):
+                yield [
+                    self._process_sample(
+                        samples[step_idx],
+                        environment,
+                        epoch=epoch,
+                        total_epochs=epochs,
+                        step_index=step_idx + 1,
+                        total_steps=total_steps,
+                    )
+                ]
+        else:
+            for start in range(first_step, total_steps, self.max_workers):
+                yield self._process_wave(
+                    executor,
+                    samples[start : start + self.max_workers],
+                    environment,
+                    epoch=epoch,
                     total_epochs=epochs,
-                    step_index=step_idx,
+                    first_step=start + 1,
                     total_steps=total_steps,
                 )
-                results.append(result)
-                bullet_ids_this_epoch.extend(
-                    op.bullet_id for op in result.curator_output.delta.operations if op.bullet_id
-                )
 
-            if self.deduplicator:
-                self.playbook.deduplicate(self.deduplicator, bullet_ids_this_epoch)
+    def _save_checkpoint(
+        self,
+        checkpoint: AdapterCheckpoint,
+        epoch: int,
+        step: int,
+        total_steps: int,
+        bullet_ids_this_epoch: List[str],
+    ) -> None:
+        state = self._checkpoint_state(epoch, step, total_steps, bullet_ids_this_epoch)
+        storage = self.playbook.storage
+        if not storage.durable:
+            checkpoint.save(state)
+            return
+        if checkpoint.saves == 0:
+            self._checkpoint_run_id = uuid.uuid4().hex
+        marker = f"{self._checkpoint_run_id}:{checkpoint.saves + 1}"
+        storage.set_meta(CHECKPOINT_MARKER_KEY, marker)
+        state["storage_marker"] = marker
+
+        def commit() -> None:
+            storage.commit()
+            storage.begin()
+
+        checkpoint.save(state, commit=commit)
 
+    def _checkpoint_state(
+        self, epoch: int, step: int, total_steps: int, bullet_ids_this_epoch: List[str]
+    ) -> Dict[str, Any]:
+        state = {
+            "epoch": epoch,
+            "step": step,
+            "total_steps": total_steps,
+            "bullet_ids_this_epoch": list(bullet_ids_this_epoch),
+            "playbook_version": self.playbook.version,
+            "recent_reflections": list(self._recent_reflections),
+            "snapshot_policy": self._active_snapshot_policy,
+            "last_snapshot": self._last_snapshot,
+        }
+        journal = self.playbook.journal
+        if journal is not None:
+            journal.flush()
+            state["journal_seq"] = journal.seq
+        elif not self.playbook.storage.durable:
+            state["playbook"] = self.playbook.to_dict()
+        return state
+
+    def _restore_state(self, state: Dict[str, Any]) -> None:
+        journal = self.playbook.journal
+        if "journal_seq" in state:
+            if journal is None:
+                raise ValueError("Checkpoint refers to a playbook journal but none is attached.")
+            rewound = journal.rewind(state["journal_seq"])
+            if not self.playbook.storage.durable:
+                self.playbook.restore(rewound.to_dict())
+        elif "playbook" in state:
+            self.playbook.restore(state["playbook"])
+        self.playbook._version = state["playbook_version"]
+        self._recent_reflections = list(state["recent_reflections"])
+        self._active_snapshot_policy = state["snapshot_policy"]
+        self._last_snapshot = state["last_snapshot"]
+
+    def _process_wave(
+        self,
+        executor: ThreadPoolExecutor,
+        wave: Sequence[Sample],
+        environment: TaskEnvironment,
+        *,
+        epoch: int,
+        total_epochs: int,
+        first_step: int,
+        total_steps: int,
+    ) -> List[AdapterStepResult]:
+        with self.tracer.span("playbook.snapshot", "ace"):
+            snapshot = self.playbook.snapshot()
+        reflection_context = self._reflection_context()
+        futures = [
+            executor.submit(
+                self._process_on_snapshot,
+                sample,
+                environment,
+                snapshot,
+                reflection_context,
+                self._progress_string(epoch, total_epochs, first_step + offset, total_steps),
+            )
+            for offset, sample in enumerate(wave)
+        ]
+        results: List[AdapterStepResult] = []
+        # Merge in sample order so the live playbook evolves deterministically.
+        for sample, future in zip(wave, futures):
+            generator_output, env_result, reflection, curator_output = future.result()
+            self._apply_bullet_tags(reflection)
+            self._update_recent_reflections(reflection)
+            self._apply_delta(curator_output.delta)
+            playbook_snapshot, playbook_version = self._snapshot_prompt()
+            results.append(
+                AdapterStepResult(
+                    sample=sample,
+                    generator_output=generator_output,
+                    environment_result=env_result,
+                    reflection=reflection,
+                    curator_output=curator_output,
+                    playbook_snapshot=playbook_snapshot,
+                    playbook_version=playbook_version,
+                )
+            )
         return results
 
+    def _process_on_snapshot(
+        self,
+        sample: Sample,
+        environment: TaskEnvironment,
+        snapshot: Playbook,
+        reflection_context: str,
+        progress: str,
+    ) -> Tuple[GeneratorOutput, EnvironmentResult, ReflectorOutput, CuratorOutput]:
+        generator_output, env_result = self._generate(
+            sample, environment, snapshot, reflection_context
+        )
+        reflection = self._reflect(sample, generator_output, env_result, snapshot)
+        curator_output = self._curate(sample, env_result, reflection, snapshot, progress)
+        return generator_output, env_result, reflection, curator_output
+
 
 class OnlineAdapter(AdapterBase):
-    """Processes a stream of samples sequentially, updating the playbook in-place."""
+    """Processes a stream of samples sequentially, updating the playbook in-place.
+
+    With ``curation_batch_size`` K > 1 the playbook is curated once per K
+    samples; a shorter final batch is flushed when the stream ends.
+
+    :meth:`iter_run` yields results as they complete and keeps none of them,
+    so with ``snapshot_policy="diff"``, ``"version"`` or ``"none"`` memory
+    stays flat over an unbounded stream; :meth:`run` collects them in a list.
+    """
 
     def run(
         self,
         samples: Iterable[Sample],
         environment: TaskEnvironment,
+        *,
+        curation_batch_size: Optional[int] = None,
+        snapshot_policy: Optional[str] = None,
+        sinks: Sequence["ResultSink"] = (),
     ) -> List[AdapterStepResult]:
-        results: List[AdapterStepResult] = []
-        step_idx = 0
+        return list(
+            self.iter_run(
+                samples,
+                environment,
+                curation_batch_size=curation_batch_size,
+                snapshot_policy=snapshot_policy,
+                sinks=sinks,
+            )
+        )
+
+    def iter_run(
+        self,
+        samples: Iterable[Sample],
+        environment: TaskEnvironment,
+        *,
+        curation_batch_size: Optional[int] = None,
+        snapshot_policy: Optional[str] = None,
+        sinks: Sequence["ResultSink"] = (),
+    ) -> Iterator[AdapterStepResult]:
+        """Yield each step's result as soon as its delta has been applied.
+
+        Every result is passed to each of ``sinks`` (see
+        :mod:`opence.methods.ace.sinks`) before it is yielded; closing them
+        is left to the caller. ``snapshot_policy`` overrides the adapter's
+        for this run.
+        """
+        batch_size = self._check_batch_size(curation_batch_size)
+        self._begin_snapshots(snapshot_policy)
+        for result in self._iter_steps(samples, environment, batch_size):
+            for sink in sinks:
+                sink.write(result)
+            yield result
+
+    def _iter_steps(
+        self, samples: Iterable[Sample], environment: TaskEnvironment, batch_size: int
+    ) -> Iterator[AdapterStepResult]:
+        if batch_size > 1:
+            stream = iter(samples)
+            step_idx = 0
+            while True:
+                batch = list(itertools.islice(stream, batch_size))
+                if not batch:
+                    break
+                step_idx += len(batch)
+                yield from self._process_batch(
+                    batch, environment, self._progress_string(1, 1, step_idx, step_idx)
+                )
+            return
+        if self.pipeline_staleness is not None:
+            self.pipeline_stats = PipelineStats()
+            yield from self._iter_pipelined(
+                samples,
+                environment,
+                lambda step: self._progress_string(1, 1, step, step),
+                self.pipeline_stats,
+            )
+            return
         for step_idx, sample in enumerate(samples, start=1):
-            result = self._process_sample(
+            yield self._process_sample(
                 sample,
                 environment,
                 epoch=1,
@@ -219,5 +1086,3 @@ class OnlineAdapter(AdapterBase):
                 step_index=step_idx,
                 total_steps=step_idx,
             )
-            results.append(result)
-        return results
@@ -0,0 +1,151 @@
+"""Atomic on-disk checkpoints for long :class:`OfflineAdapter` runs."""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, TextIO, Tuple, Union
+
+CHECKPOINT_FORMAT = 1
+RESULTS_SUFFIX = ".results.jsonl"
+CHECKPOINT_MARKER_KEY = "adapter_checkpoint"
+
+
+def results_path(path: Union[str, Path]) -> Path:
+    path = Path(path)
+    return path.with_name(path.name + RESULTS_SUFFIX)
+
+
+class AdapterCheckpoint:
+    """Writes run state every ``every_steps`` samples or ``every_seconds`` seconds.
+
+    The state (playbook, reflection window, epoch/step cursor, ...) is a JSON
+    file replaced atomically via a fsync'ed temp file and ``os.replace``, so a
+    crash leaves either the previous or the new checkpoint. Step results are
+    appended to a JSONL file next to it as they complete; the checkpoint
+    records how many of its lines it covers, so lines written after the last
+    checkpoint are ignored on :meth:`load`.
+
+    When the playbook lives in durable storage the state carries a
+    ``storage_marker`` instead of the playbook, and :meth:`save` commits the
+    storage (``commit``) between writing the temp file and replacing the
+    checkpoint. A crash between the two leaves the temp file matching the
+    storage, which :meth:`load` then picks up.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        *,
+        every_steps: Optional[int] = None,
+        every_seconds: Optional[float] = None,
+    ) -> None:
+        if every_steps is not None and every_steps < 1:
+            raise ValueError("checkpoint_every must be at least 1.")
+        if every_seconds is not None and every_seconds <= 0:
+            raise ValueError("checkpoint_interval must be positive.")
+        self.path = Path(path)
+        self.results_path = results_path(self.path)
+        self.every_steps = every_steps
+        self.every_seconds = every_seconds
+        self.saves = 0
+        self._results: Optional[TextIO] = None
+        self._written = 0
+        self._steps_since_save = 0
+        self._last_save = time.monotonic()
+
+    def start(self, results: List[Dict[str, Any]]) -> None:
+        """Begin a run whose already completed results are ``results``.
+
+        The results file is rewritten (atomically) so it matches this run even
+        when resuming from a checkpoint stored elsewhere.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.results_path.with_name(self.results_path.name + ".tmp")
+        with tmp_path.open("w", encoding="utf-8") as fh:
+            for payload in results:
+                fh.write(_dumps(payload) + "\n")
+        os.replace(tmp_path, self.results_path)
+        self._results = self.results_path.open("a", encoding="utf-8")
+        self._written = len(results)
+        self._steps_since_save = 0
+        self._last_save = time.monotonic()
+
+    def record(self, results: List[Dict[str, Any]]) -> None:
+        """Append the results of one completed step (or batch/wave of steps)."""
+        for payload in results:
+            self._results.write(_dumps(payload) + "\n")
+        self._written += len(results)
+        self._steps_since_save += len(results)
+
+    def due(self) -> bool:
+        if self.every_steps is not None and self._steps_since_save >= self.every_steps:
+            return True
+        if self.every_seconds is not None:
+            return time.monotonic() - self._last_save >= self.every_seconds
+        return False
+
+    def save(self, state: Dict[str, Any], *, commit: Optional[Callable[[], None]] = None) -> None:
+        self._results.flush()
+        os.fsync(self._results.fileno())
+        payload = dict(
+            state, format=CHECKPOINT_FORMAT, results=self._written, saved_at=time.time()
+        )
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with tmp_path.open("w", encoding="utf-8") as fh:
+            json.dump(payload, fh, ensure_ascii=False, default=repr)
+            fh.flush()
+            os.fsync(fh.fileno())
+        if commit is not None:
+            commit()
+        os.replace(tmp_path, self.path)
+        self.saves += 1
+        self._steps_since_save = 0
+        self._last_save = time.monotonic()
+
+    def close(self) -> None:
+        if self._results is not None and not self._results.closed:
+            self._results.close()
+
+    @staticmethod
+    def load(
+        path: Union[str, Path], *, storage_marker: Optional[str] = None
+    ) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """Return the checkpointed state and the result payloads it covers.
+
+        ``storage_marker`` is the marker found in the playbook storage; a
+        checkpoint made against storage must match it (see the class docs).
+        """
+        path = Path(path)
+        state = json.loads(path.read_text(encoding="utf-8"))
+        if "storage_marker" in state and state["storage_marker"] != storage_marker:
+            tmp_path = path.with_name(path.name + ".tmp")
+            pending = json.loads(tmp_path.read_text(encoding="utf-8")) if tmp_path.exists() else {}
+            if pending.get("storage_marker") is None or pending["storage_marker"] != storage_marker:
+                raise ValueError(
+                    f"Checkpoint {path} does not match the playbook storage "
+                    f"(expected marker {state['storage_marker']!r}, found {storage_marker!r})."
+                )
+            os.replace(tmp_path, path)
+            state = pending
+        if state.get("format") != CHECKPOINT_FORMAT:
+            raise ValueError(f"Unsupported checkpoint format in {path}.")
+        results: List[Dict[str, Any]] = []
+        if state["results"]:
+            with results_path(path).open("r", encoding="utf-8") as fh:
+                for line in fh:
+                    if len(results) == state["results"]:
+                        break
+                    results.append(json.loads(line))
+        if len(results) != state["results"]:
+            raise ValueError(
+                f"Checkpoint {path} covers {state['results']} results "
+                f"but only {len(results)} were found."
+            )
+        return state, results
+
+
+def _dumps(payload: Dict[str, Any]) -> str:
+    return json.dumps(payload, ensure_ascii=False, default=repr)
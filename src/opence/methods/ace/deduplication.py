@@ -2,25 +2,180 @@
 
 from __future__ import annotations
 
-from typing import Dict, List
+import hashlib
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
 
 try:  # Optional heavy dependency
     from sentence_transformers import SentenceTransformer  # type: ignore
-    from sklearn.metrics.pairwise import cosine_similarity  # type: ignore
 except ImportError:  # pragma: no cover - fallback logic used
     SentenceTransformer = None  # type: ignore[assignment]
-    cosine_similarity = None  # type: ignore[assignment]
+
+try:  # Ships with sentence-transformers; only the embedding path needs it
+    import numpy as np  # type: ignore
+except ImportError:  # pragma: no cover - fallback logic used
+    np = None  # type: ignore[assignment]
+
+from .minhash import MinHashLSHIndex
+
+Encoder = Callable[[List[str]], Any]
+BACKENDS = ("auto", "embedding", "minhash", "substring")
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+
+# Hex SHA-1 digests are 40 characters; a fixed-width array loads without pickle.
+_KEY_DTYPE = "U40"
+
+
+class EmbeddingStore:
+    """Content-addressed cache of L2-normalised float32 embeddings.
+
+    Vectors live in one contiguous matrix that grows geometrically as new
+    contents arrive, so every distinct bullet text is embedded exactly once
+    and similarity search is a single matrix product.
+    """
+
+    def __init__(self, encoder: Encoder, *, initial_capacity: int = 1024) -> None:
+        if np is None:
+            raise ImportError("EmbeddingStore requires numpy.")
+        self._encoder = encoder
+        self._rows: Dict[str, int] = {}
+        self._matrix: Optional["np.ndarray"] = None
+        self._size = 0
+        self._initial_capacity = initial_capacity
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def matrix(self) -> "np.ndarray":
+        """View of the populated rows of the embedding matrix."""
+        if self._matrix is None:
+            return np.zeros((0, 0), dtype=np.float32)
+        return self._matrix[: self._size]
+
+    def rows(self, contents: Sequence[str]) -> "np.ndarray":
+        """Return matrix row indices for ``contents``, embedding unseen texts in one batch."""
+        keys = [content_hash(content) for content in contents]
+        missing: Dict[str, str] = {}
+        for key, content in zip(keys, contents):
+            if key not in self._rows and key not in missing:
+                missing[key] = content
+        if missing:
+            vectors = np.asarray(self._encoder(list(missing.values())), dtype=np.float32)
+            self._append(list(missing), vectors)
+        return np.fromiter((self._rows[key] for key in keys), dtype=np.int64, count=len(keys))
+
+    def save(self, path: Union[str, Path]) -> None:
+        """Persist the store as a ``.npz`` archive."""
+        np.savez(
+            path,
+            keys=np.array(list(self._rows), dtype=_KEY_DTYPE),
+            rows=np.fromiter(self._rows.values(), dtype=np.int64, count=len(self._rows)),
+            matrix=self.matrix,
+        )
+
+    def load(self, path: Union[str, Path]) -> None:
+        """Merge vectors from a ``.npz`` archive written by :meth:`save`."""
+        with np.load(path, allow_pickle=False) as archive:
+            keys = [str(key) for key in archive["keys"]]
+            matrix = archive["matrix"]
+            rows = archive["rows"]
+        fresh = [(key, row) for key, row in zip(keys, rows) if key not in self._rows]
+        if fresh:
+            self._append([key for key, _ in fresh], matrix[[row for _, row in fresh]])
+
+    def _append(self, keys: List[str], vectors: "np.ndarray") -> None:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        vectors = vectors / norms
+        needed = self._size + len(keys)
+        if self._matrix is None:
+            capacity = max(self._initial_capacity, needed)
+            self._matrix = np.empty((capacity, vectors.shape[1]), dtype=np.float32)
+        elif needed > self._matrix.shape[0]:
+            capacity = max(needed, self._matrix.shape[0] * 2)
+            grown = np.empty((capacity, self._matrix.shape[1]), dtype=np.float32)
+            grown[: self._size] = self._matrix[: self._size]
+            self._matrix = grown
+        self._matrix[self._size : needed] = vectors
+        for offset, key in enumerate(keys):
+            self._rows[key] = self._size + offset
+        self._size = needed
+
 
 class Deduplicator:
-    """Finds semantically similar bullets using embeddings."""
+    """Finds semantically similar bullets using embeddings.
+
+    Embeddings are cached in an :class:`EmbeddingStore` for the lifetime of
+    the deduplicator (and optionally on disk via ``cache_path``), so each
+    bullet is encoded once no matter how many epochs compare against it.
+    :class:`OfflineAdapter` writes the cache after each epoch's
+    deduplication; other callers persist it with :meth:`save_embeddings`.
+
+    ``backend`` selects the matching strategy: ``"embedding"`` (cosine
+    similarity, needs an encoder or sentence-transformers), ``"minhash"``
+    (MinHash + LSH over character shingles, compared against
+    ``jaccard_threshold``), ``"substring"`` (the legacy containment check) or
+    ``"auto"``, which uses embeddings when available and falls back to the
+    substring check otherwise. MinHash is opt-in.
+    """
 
     def __init__(
         self,
         model_name: str = "all-MiniLM-L6-v2",
         similarity_threshold: float = 0.8,
+        *,
+        backend: str = "auto",
+        jaccard_threshold: float = 0.8,
+        num_perm: int = 128,
+        shingle_size: int = 3,
+        encoder: Optional[Encoder] = None,
+        cache_path: Optional[Union[str, Path]] = None,
+        chunk_size: int = 8192,
     ) -> None:
-        self._model = SentenceTransformer(model_name) if SentenceTransformer else None
+        if backend not in BACKENDS:
+            raise ValueError(f"Unsupported deduplication backend: {backend}")
+        wants_embeddings = backend in ("auto", "embedding")
+        if encoder is None and SentenceTransformer is not None and wants_embeddings:
+            model = SentenceTransformer(model_name)
+
+            def encoder(texts: List[str]) -> Any:
+                return model.encode(texts, convert_to_numpy=True, normalize_embeddings=True)
+
         self._threshold = similarity_threshold
+        self._chunk_size = chunk_size
+        self._cache_path = Path(cache_path) if cache_path else None
+        self._store: Optional[EmbeddingStore] = None
+        if encoder is not None and np is not None:
+            self._store = EmbeddingStore(encoder)
+            if self._cache_path and self._cache_path.exists():
+                self._store.load(self._cache_path)
+        if backend == "auto":
+            backend = "embedding" if self._store is not None else "substring"
+        elif backend == "embedding" and self._store is None:
+            raise ImportError(
+                "The embedding backend needs sentence-transformers (or an encoder) and numpy."
+            )
+        self.backend = backend
+        self._lsh: Optional[MinHashLSHIndex] = None
+        self._lsh_contents: Dict[str, str] = {}
+        if backend == "minhash":
+            self._lsh = MinHashLSHIndex(
+                jaccard_threshold, num_perm=num_perm, shingle_size=shingle_size
+            )
+
+    @property
+    def embedding_store(self) -> Optional[EmbeddingStore]:
+        return self._store
+
+    def save_embeddings(self) -> None:
+        """Write cached embeddings to ``cache_path`` (no-op without one)."""
+        if self._store is not None and self._cache_path is not None:
+            self._store.save(self._cache_path)
 
     def find_duplicates(
         self,
@@ -44,17 +199,14 @@ class Deduplicator:
         existing_contents = list(existing_bullets.values())
         new_ids = list(new_bullets.keys())
 
-        if self._model and cosine_similarity:
-            new_embeddings = self._model.encode(new_contents, convert_to_tensor=True)
-            existing_embeddings = self._model.encode(existing_contents, convert_to_tensor=True)
-            similarities = cosine_similarity(new_embeddings, existing_embeddings)
-            duplicate_ids = []
-            for i, similarity_row in enumerate(similarities):
-                if any(similarity > self._threshold for similarity in similarity_row):
-                    duplicate_ids.append(new_ids[i])
-            return duplicate_ids
-
-        # Fallback: simple exact-match/substring heuristic (keeps tests lightweight)
+        if self.backend == "embedding":
+            best = self._top1_similarity(new_contents, existing_contents)
+            return [new_ids[i] for i in np.flatnonzero(best > self._threshold)]
+
+        if self.backend == "minhash":
+            return self._minhash_duplicates(new_bullets, existing_bullets)
+
+        # Legacy exact-match/substring heuristic (quadratic)
         duplicates: List[str] = []
         existing_lower = [text.lower() for text in existing_contents]
         for idx, content in zip(new_ids, new_contents):
@@ -62,3 +214,38 @@ class Deduplicator:
             if any(normalized == other or normalized in other or other in normalized for other in existing_lower):
                 duplicates.append(idx)
         return duplicates
+
+    def _minhash_duplicates(
+        self, new_bullets: Dict[str, str], existing_bullets: Dict[str, str]
+    ) -> List[str]:
+        lsh = self._lsh
+        # Keep the index in sync with the existing bullets; unchanged entries
+        # are neither re-hashed nor re-bucketed between calls.
+        for bullet_id in [key for key in self._lsh_contents if key not in existing_bullets]:
+            lsh.remove(bullet_id)
+            del self._lsh_contents[bullet_id]
+        for bullet_id, content in existing_bullets.items():
+            if self._lsh_contents.get(bullet_id) != content:
+                lsh.add(bullet_id, content)
+                self._lsh_contents[bullet_id] = content
+        duplicates: List[str] = []
+        for bullet_id, content in new_bullets.items():
+            if any(match != bullet_id for match, _ in lsh.query(content)):
+                duplicates.append(bullet_id)
+        return duplicates
+
+    def _top1_similarity(
+        self, new_contents: List[str], existing_contents: List[str]
+    ) -> "np.ndarray":
+        """Best cosine similarity of each new content against all existing ones."""
+        store = self._store
+        new_rows = store.rows(new_contents)
+        existing_rows = store.rows(existing_contents)
+        matrix = store.matrix
+        queries = matrix[new_rows]
+        best = np.full(len(new_rows), -np.inf, dtype=np.float32)
+        # Chunk the existing side so memory stays bounded for large playbooks.
+        for start in range(0, len(existing_rows), self._chunk_size):
+            block = matrix[existing_rows[start : start + self._chunk_size]]
+            np.maximum(best, (queries @ block.T).max(axis=1), out=best)
+        return best
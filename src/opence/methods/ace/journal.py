@@ -0,0 +1,307 @@
+"""Append-only delta journal (write-ahead log) for playbook persistence."""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional, Tuple, Union
+
+from .delta import DeltaBatch
+
+if TYPE_CHECKING:  # pragma: no cover - for type hints only
+    from .playbook import Bullet, Playbook
+
+SNAPSHOT_NAME = "snapshot.json"
+SEGMENT_PREFIX = "journal-"
+SEGMENT_SUFFIX = ".log"
+
+
+class PlaybookJournal:
+    """Persists a playbook as a snapshot plus an append-only log of deltas.
+
+    Every ``DeltaBatch`` applied to an attached playbook is appended to the
+    current log segment as one JSON line, so checkpoint cost scales with the
+    delta rather than the playbook. Appends are fsync'ed in batches (every
+    ``fsync_every`` records or ``fsync_interval`` seconds). Once
+    ``compact_threshold`` records accumulate, a new snapshot is written in a
+    background thread and the log segments it covers are deleted.
+
+    Loading replays the latest snapshot plus every logged record with a higher
+    sequence number. A torn final line (crash mid-write) is truncated. Bullet
+    ``created_at``/``updated_at`` timestamps of replayed records reflect the
+    replay time.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, Path],
+        *,
+        fsync_every: int = 32,
+        fsync_interval: float = 1.0,
+        compact_threshold: int = 1000,
+        background_compaction: bool = True,
+    ) -> None:
+        self.directory = Path(directory)
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.compact_threshold = compact_threshold
+        self.background_compaction = background_compaction
+        self._lock = threading.RLock()
+        self._playbook: Optional["Playbook"] = None
+        self._segment = None
+        self._seq = 0
+        self._snapshot_seq = 0
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        self._compaction: Optional[threading.Thread] = None
+        self._compaction_error: Optional[BaseException] = None
+
+    # ------------------------------------------------------------------ #
+    # Lifecycle
+    # ------------------------------------------------------------------ #
+    @property
+    def seq(self) -> int:
+        """Sequence number of the last appended record."""
+        return self._seq
+
+    def open(self) -> "Playbook":
+        """Load the journaled playbook and attach it so new deltas are logged."""
+        playbook = self.load()
+        playbook.attach_journal(self)
+        return playbook
+
+    def load(self, until_seq: Optional[int] = None) -> "Playbook":
+        """Rebuild the playbook from the latest snapshot and the log tail.
+
+        With ``until_seq`` records after that sequence number are not
+        replayed; it must not precede the latest snapshot.
+        """
+        from .playbook import Playbook
+
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            snapshot_path = self.directory / SNAPSHOT_NAME
+            if snapshot_path.exists():
+                payload = json.loads(snapshot_path.read_text(encoding="utf-8"))
+                playbook = Playbook.from_dict(payload.get("playbook", {}))
+                snapshot_seq = int(payload.get("seq", 0))
+            else:
+                playbook = Playbook()
+                snapshot_seq = 0
+            if until_seq is not None and until_seq < snapshot_seq:
+                raise ValueError(
+                    f"Journal was compacted at record {snapshot_seq}, past record {until_seq}."
+                )
+            last_seq = snapshot_seq
+            for _, path in self._segments():
+                for seq, delta in self._read_segment(path):
+                    if seq <= last_seq:
+                        continue
+                    if until_seq is not None and seq > until_seq:
+                        break
+                    playbook.apply_delta(delta)
+                    last_seq = seq
+            if until_seq is None:
+                self._seq = last_seq
+                self._snapshot_seq = snapshot_seq
+            return playbook
+
+    def rewind(self, seq: int) -> "Playbook":
+        """Return the playbook as of record ``seq`` and make that the journaled state.
+
+        Later records are superseded by a snapshot of the rewound state (taken
+        at the current sequence number), so reloading yields it too. Used to
+        resume a run from a checkpoint that recorded ``seq``.
+        """
+        self.wait_for_compaction()
+        with self._lock:
+            if seq > self._seq:
+                raise ValueError(f"Journal has no record {seq}; it ends at {self._seq}.")
+            playbook = self.load(until_seq=seq)
+            if seq < self._seq:
+                self.compact(playbook, wait=True)
+            return playbook
+
+    def attach(self, playbook: "Playbook") -> None:
+        """Start logging deltas for ``playbook``; called by ``Playbook.attach_journal``."""
+        with self._lock:
+            self._playbook = playbook
+            if self._segment is None:
+                self._open_segment(self._seq + 1)
+
+    def close(self) -> None:
+        """Flush pending records, wait for compaction and close the log."""
+        self.wait_for_compaction()
+        with self._lock:
+            if self._segment is not None:
+                self._sync()
+                self._segment.close()
+                self._segment = None
+            if self._playbook is not None and self._playbook._journal is self:
+                self._playbook._journal = None
+            self._playbook = None
+
+    def __enter__(self) -> "PlaybookJournal":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    # ------------------------------------------------------------------ #
+    # Logging
+    # ------------------------------------------------------------------ #
+    def append(self, delta: DeltaBatch) -> int:
+        """Append ``delta`` to the log and return its sequence number."""
+        with self._lock:
+            if self._segment is None:
+                self._open_segment(self._seq + 1)
+            self._seq += 1
+            record = {"seq": self._seq, "delta": delta.to_json()}
+            self._segment.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._pending += 1
+            if (
+                self._pending >= self.fsync_every
+                or time.monotonic() - self._last_sync >= self.fsync_interval
+            ):
+                self._sync()
+            if (
+                self._playbook is not None
+                and self._seq - self._snapshot_seq >= self.compact_threshold
+                and not self._compacting()
+            ):
+                self.compact()
+            return self._seq
+
+    def flush(self) -> None:
+        """Force pending records to stable storage."""
+        with self._lock:
+            if self._segment is not None:
+                self._sync()
+
+    # ------------------------------------------------------------------ #
+    # Compaction
+    # ------------------------------------------------------------------ #
+    def compact(self, playbook: Optional["Playbook"] = None, *, wait: bool = False) -> None:
+        """Write a snapshot of ``playbook`` and drop the log segments it covers.
+
+        Only shallow copies of the bullets are taken under the journal lock
+        (appends wait for that, not for the snapshot); building the payload,
+        encoding and writing it happen in a background thread unless
+        background compaction is disabled or ``wait`` is set.
+        """
+        if playbook is None:
+            playbook = self._playbook
+        if playbook is None:
+            raise ValueError("No playbook attached to the journal to compact.")
+        self.wait_for_compaction()
+        with self._lock:
+            if self._segment is not None:
+                self._sync()
+                self._segment.close()
+            snapshot_seq = self._seq
+            state = playbook._copy_state()
+            self._open_segment(snapshot_seq + 1)
+            self._snapshot_seq = snapshot_seq
+            if self.background_compaction and not wait:
+                self._compaction = threading.Thread(
+                    target=self._write_snapshot,
+                    args=(state, snapshot_seq),
+                    name="playbook-journal-compaction",
+                    daemon=True,
+                )
+                self._compaction.start()
+                return
+        self._write_snapshot(state, snapshot_seq)
+        self._raise_compaction_error()
+
+    def wait_for_compaction(self) -> None:
+        """Block until an in-flight background compaction has finished."""
+        thread = self._compaction
+        if thread is not None:
+            thread.join()
+            self._compaction = None
+        self._raise_compaction_error()
+
+    # ------------------------------------------------------------------ #
+    # Internal helpers
+    # ------------------------------------------------------------------ #
+    def _compacting(self) -> bool:
+        return self._compaction is not None and self._compaction.is_alive()
+
+    def _raise_compaction_error(self) -> None:
+        error, self._compaction_error = self._compaction_error, None
+        if error is not None:
+            raise RuntimeError("Playbook journal compaction failed.") from error
+
+    def _write_snapshot(self, state: Tuple[List["Bullet"], int], snapshot_seq: int) -> None:
+        from .playbook import Playbook
+
+        try:
+            payload = {"seq": snapshot_seq, "playbook": Playbook._payload(*state)}
+            snapshot_path = self.directory / SNAPSHOT_NAME
+            tmp_path = snapshot_path.with_suffix(".json.tmp")
+            with tmp_path.open("w", encoding="utf-8") as fh:
+                json.dump(payload, fh, ensure_ascii=False)
+                fh.flush()
+                os.fsync(fh.fileno())
+            os.replace(tmp_path, snapshot_path)
+            self._fsync_directory()
+            for start_seq, path in self._segments():
+                if start_seq <= snapshot_seq:
+                    path.unlink(missing_ok=True)
+        except BaseException as exc:  # pragma: no cover - surfaced on next wait
+            self._compaction_error = exc
+
+    def _open_segment(self, start_seq: int) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{SEGMENT_PREFIX}{start_seq:012d}{SEGMENT_SUFFIX}"
+        self._segment = path.open("a", encoding="utf-8")
+        self._fsync_directory()
+
+    def _sync(self) -> None:
+        self._segment.flush()
+        os.fsync(self._segment.fileno())
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def _fsync_directory(self) -> None:
+        if os.name != "posix":  # pragma: no cover - directory fsync is POSIX only
+            return
+        fd = os.open(self.directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def _segments(self) -> List[Tuple[int, Path]]:
+        segments = []
+        for path in self.directory.glob(f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}"):
+            start = path.name[len(SEGMENT_PREFIX) : -len(SEGMENT_SUFFIX)]
+            if start.isdigit():
+                segments.append((int(start), path))
+        return sorted(segments)
+
+    @staticmethod
+    def _read_segment(path: Path) -> List[Tuple[int, DeltaBatch]]:
+        """Parse a log segment, truncating a torn tail left by a crash."""
+        records: List[Tuple[int, DeltaBatch]] = []
+        valid_bytes = 0
+        with path.open("rb") as fh:
+            for line in fh:
+                try:
+                    record = json.loads(line.decode("utf-8"))
+                    delta = DeltaBatch.from_json(record["delta"])
+                    seq = int(record["seq"])
+                except (ValueError, KeyError, TypeError):
+                    break
+                if not line.endswith(b"\n"):
+                    break
+                records.append((seq, delta))
+                valid_bytes += len(line)
+        if valid_bytes < path.stat().st_size:
+            with path.open("r+b") as fh:
+                fh.truncate(valid_bytes)
+        return records
@@ -0,0 +1,173 @@
+"""Local repair of almost-valid JSON objects emitted by LLMs."""
+
+from __future__ import annotations
+
+import json
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+_FENCE = re.compile(r"```(?:json|JSON)?\s*\n?(.*?)(?:```|$)", re.DOTALL)
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+@dataclass
+class JsonRepairStats:
+    """Counts how malformed role outputs were recovered.
+
+    ``local_repairs`` responses were fixed without any LLM call; each one
+    saves a full-prompt retry. ``fix_prompts`` retries were sent as short
+    "fix this JSON" prompts instead of the full role prompt.
+    """
+
+    parsed: int = 0
+    local_repairs: int = 0
+    fix_prompts: int = 0
+    full_retries: int = 0
+
+    @property
+    def saved_calls(self) -> int:
+        return self.local_repairs
+
+    def merge(self, other: "JsonRepairStats") -> None:
+        self.parsed += other.parsed
+        self.local_repairs += other.local_repairs
+        self.fix_prompts += other.fix_prompts
+        self.full_retries += other.full_retries
+
+
+_stats_lock = threading.Lock()
+
+
+def record(stats: Optional[JsonRepairStats], field: str) -> None:
+    if stats is not None:
+        with _stats_lock:
+            setattr(stats, field, getattr(stats, field) + 1)
+
+
+def strip_code_fence(text: str) -> str:
+    match = _FENCE.search(text)
+    return match.group(1) if match else text
+
+
+def repair_json(text: str) -> str:
+    """Best-effort rewrite of ``text`` into a parseable JSON object.
+
+    Handles fenced code blocks, prose around the outermost object,
+    unescaped quotes and raw newlines inside strings, trailing commas and
+    objects truncated before their closing quotes/brackets.
+    """
+    text = strip_code_fence(text)
+    start = text.find("{")
+    if start == -1:
+        return text.strip()
+    out: List[str] = []
+    stack: List[str] = []
+    # (output length, open brackets) after each structural comma, used to cut
+    # a truncated document back to its last complete member.
+    commas: List[Tuple[int, List[str]]] = []
+    in_string = False
+    index = start
+    length = len(text)
+    while index < length:
+        char = text[index]
+        if in_string:
+            if char == "\\" and index + 1 < length:
+                out.append(text[index : index + 2])
+                index += 2
+                continue
+            if char == '"':
+                if _closes_string(text, index + 1, stack):
+                    in_string = False
+                    out.append(char)
+                else:
+                    out.append('\\"')
+            elif char == "\n":
+                out.append("\\n")
+            elif char == "\r":
+                out.append("\\r")
+            elif char == "\t":
+                out.append("\\t")
+            else:
+                out.append(char)
+            index += 1
+            continue
+        if char == '"':
+            in_string = True
+            out.append(char)
+        elif char in _CLOSERS:
+            stack.append(_CLOSERS[char])
+            out.append(char)
+        elif char in "}]":
+            _drop_trailing_comma(out)
+            if stack and stack[-1] == char:
+                stack.pop()
+            out.append(char)
+            if not stack:
+                break
+        else:
+            if char == ",":
+                commas.append((len(out), list(stack)))
+            out.append(char)
+        index += 1
+
+    if not stack:
+        return "".join(out)
+    if in_string:
+        out.append('"')
+    candidate = _close_truncated(list(out), stack)
+    if not _parses(candidate) and commas:
+        cut, open_brackets = commas[-1]
+        fallback = _close_truncated(out[:cut], open_brackets)
+        if _parses(fallback):
+            return fallback
+    return candidate
+
+
+def loads_lenient(text: str) -> Dict[str, Any]:
+    """Parse ``text`` as a JSON object, repairing it locally if needed."""
+    data = json.loads(repair_json(text))
+    if not isinstance(data, dict):
+        raise ValueError("Expected a JSON object from LLM.")
+    return data
+
+
+def _closes_string(text: str, position: int, stack: List[str]) -> bool:
+    """Decide whether a quote ends the string by looking at what follows it."""
+    for char in text[position:]:
+        if char.isspace():
+            continue
+        if char in ",:":
+            return True
+        if char in "}]":
+            return not stack or char == stack[-1]
+        return False
+    return True
+
+
+def _drop_trailing_comma(out: List[str]) -> None:
+    position = len(out) - 1
+    while position >= 0 and out[position].isspace():
+        position -= 1
+    if position >= 0 and out[position] == ",":
+        del out[position]
+
+
+def _close_truncated(out: List[str], stack: List[str]) -> str:
+    """Make the tail of a truncated document syntactically complete."""
+    while out and out[-1].isspace():
+        out.pop()
+    if out and out[-1] == ",":
+        out.pop()
+    elif out and out[-1] == ":":
+        out.append("null")
+    return "".join(out) + "".join(reversed(stack))
+
+
+def _parses(candidate: str) -> bool:
+    try:
+        json.loads(candidate)
+    except json.JSONDecodeError:
+        return False
+    return True
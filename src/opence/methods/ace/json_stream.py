@@ -0,0 +1,112 @@
+"""Incremental extraction of top-level fields from a streamed JSON object."""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Collection, Dict, Optional
+
+
+class JsonFieldParser:
+    """Surfaces top-level fields of a JSON object as soon as their value is complete.
+
+    Feed text chunks as they arrive; :meth:`feed` returns the fields whose
+    values closed within that chunk, so e.g. ``final_answer`` is available
+    while a long ``reasoning`` string after it is still being decoded. Prose
+    before the opening ``{`` is ignored, and values that do not parse are
+    skipped (the role's full parse still decides the final result).
+    """
+
+    def __init__(self, fields: Optional[Collection[str]] = None) -> None:
+        self.fields = set(fields) if fields is not None else None
+        self.values: Dict[str, Any] = {}
+        self.done = False
+        self._text = ""
+        self._position = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._string_start = 0
+        self._expect_key = False
+        self._key: Optional[str] = None
+        self._value_start: Optional[int] = None
+
+    def feed(self, chunk: str) -> Dict[str, Any]:
+        found: Dict[str, Any] = {}
+        if self.done or not chunk:
+            return found
+        self._text += chunk
+        text = self._text
+        for index in range(self._position, len(text)):
+            char = text[index]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        if self._expect_key:
+                            self._key = _loads(text[self._string_start : index + 1])
+                            self._expect_key = False
+                        elif self._value_start == self._string_start:
+                            self._emit(text[self._value_start : index + 1], found)
+                continue
+            if char == '"':
+                self._in_string = True
+                self._string_start = index
+                if self._depth == 1 and self._key is not None and self._value_start is None:
+                    self._value_start = index
+            elif char in "{[":
+                if self._depth == 0:
+                    if char == "{":
+                        self._depth = 1
+                        self._expect_key = True
+                    continue
+                if self._depth == 1 and self._value_start is None:
+                    self._value_start = index
+                self._depth += 1
+            elif char in "}]":
+                if self._depth == 0:
+                    continue
+                self._depth -= 1
+                if self._depth == 1 and self._value_start is not None:
+                    self._emit(text[self._value_start : index + 1], found)
+                elif self._depth == 0:
+                    self._finish_scalar(text, index, found)
+                    self.done = True
+                    self._position = index + 1
+                    return found
+            elif self._depth == 1:
+                if char == ",":
+                    self._finish_scalar(text, index, found)
+                    self._expect_key = True
+                elif char == ":":
+                    self._value_start = None
+                elif not char.isspace() and self._key is not None and self._value_start is None:
+                    self._value_start = index
+        self._position = len(text)
+        return found
+
+    def _finish_scalar(self, text: str, end: int, found: Dict[str, Any]) -> None:
+        """Emit a pending number/literal value, which only ends at ``,`` or ``}``."""
+        if self._key is not None and self._value_start is not None:
+            self._emit(text[self._value_start : end], found)
+
+    def _emit(self, raw: str, found: Dict[str, Any]) -> None:
+        key, self._key, self._value_start = self._key, None, None
+        if key is None or (self.fields is not None and key not in self.fields):
+            return
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            return
+        self.values[key] = value
+        found[key] = value
+
+
+def _loads(raw: str) -> Optional[str]:
+    try:
+        return json.loads(raw)
+    except json.JSONDecodeError:
+        return None
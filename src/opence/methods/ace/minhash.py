@@ -0,0 +1,155 @@
+"""MinHash signatures and LSH banding for near-duplicate bullet detection."""
+
+from __future__ import annotations
+
+import random
+import re
+import zlib
+from typing import Dict, Hashable, List, Sequence, Set, Tuple
+
+try:  # Vectorises signature computation when available
+    import numpy as np  # type: ignore
+except ImportError:  # pragma: no cover - pure-Python path used
+    np = None  # type: ignore[assignment]
+
+_WHITESPACE = re.compile(r"\s+")
+# Mersenne prime 2**31 - 1: keeps a * x + b below 2**62 so the NumPy (uint64)
+# and pure-Python paths produce identical signatures.
+_PRIME = (1 << 31) - 1
+
+
+def shingles(text: str, size: int = 3) -> Set[str]:
+    """Character shingles of the normalised text (works for unsegmented CJK)."""
+    normalized = _WHITESPACE.sub(" ", text.lower()).strip()
+    if len(normalized) <= size:
+        return {normalized} if normalized else set()
+    return {normalized[i : i + size] for i in range(len(normalized) - size + 1)}
+
+
+def optimal_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """Pick ``(bands, rows)`` for the LSH S-curve.
+
+    Chooses the split whose midpoint ``(1/bands) ** (1/rows)`` is the highest
+    one not above ``threshold``: pairs at the threshold then collide with high
+    probability (favouring recall); false candidates are filtered by the
+    signature-estimated Jaccard check afterwards.
+    """
+    splits = [
+        (bands, num_perm // bands) for bands in range(1, num_perm + 1) if num_perm % bands == 0
+    ]
+    below = [
+        (bands, rows) for bands, rows in splits if (1.0 / bands) ** (1.0 / rows) <= threshold
+    ]
+    if not below:
+        return splits[-1]
+    return max(below, key=lambda split: (1.0 / split[0]) ** (1.0 / split[1]))
+
+
+class MinHasher:
+    """Computes fixed-length MinHash signatures over character shingles."""
+
+    def __init__(self, num_perm: int = 128, *, shingle_size: int = 3, seed: int = 1) -> None:
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = random.Random(seed)
+        self._a = [rng.randrange(1, _PRIME) for _ in range(num_perm)]
+        self._b = [rng.randrange(0, _PRIME) for _ in range(num_perm)]
+        if np is not None:
+            self._a_np = np.array(self._a, dtype=np.uint64)[:, None]
+            self._b_np = np.array(self._b, dtype=np.uint64)[:, None]
+
+    def signature(self, text: str) -> Tuple[int, ...]:
+        hashed = [
+            zlib.crc32(shingle.encode("utf-8")) % _PRIME
+            for shingle in shingles(text, self.shingle_size)
+        ]
+        if not hashed:
+            return (_PRIME,) * self.num_perm
+        if np is not None:
+            values = np.array(hashed, dtype=np.uint64)[None, :]
+            mins = ((self._a_np * values + self._b_np) % _PRIME).min(axis=1)
+            return tuple(int(value) for value in mins)
+        return tuple(
+            min((a * value + b) % _PRIME for value in hashed)
+            for a, b in zip(self._a, self._b)
+        )
+
+    @staticmethod
+    def jaccard(left: Sequence[int], right: Sequence[int]) -> float:
+        """Estimate Jaccard similarity from two signatures."""
+        matches = sum(1 for x, y in zip(left, right) if x == y)
+        return matches / len(left) if left else 0.0
+
+
+class MinHashLSHIndex:
+    """LSH banding index answering "which keys are near-duplicates of this text?".
+
+    Each signature is split into ``bands`` bands of ``rows`` values; keys that
+    share any band bucket become candidates, which are then verified against
+    ``threshold`` using the signature-estimated Jaccard similarity. Lookups
+    therefore touch only colliding buckets instead of every stored key.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        *,
+        num_perm: int = 128,
+        shingle_size: int = 3,
+        seed: int = 1,
+    ) -> None:
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm, shingle_size=shingle_size, seed=seed)
+        self.bands, self.rows = optimal_bands(num_perm, threshold)
+        self._buckets: List[Dict[Tuple[int, ...], Set[Hashable]]] = [
+            {} for _ in range(self.bands)
+        ]
+        self._signatures: Dict[Hashable, Tuple[int, ...]] = {}
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._signatures
+
+    def add(self, key: Hashable, text: str) -> None:
+        self.add_signature(key, self.hasher.signature(text))
+
+    def add_signature(self, key: Hashable, signature: Tuple[int, ...]) -> None:
+        self.remove(key)
+        self._signatures[key] = signature
+        for band, bucket in zip(self._bands(signature), self._buckets):
+            bucket.setdefault(band, set()).add(key)
+
+    def remove(self, key: Hashable) -> None:
+        signature = self._signatures.pop(key, None)
+        if signature is None:
+            return
+        for band, bucket in zip(self._bands(signature), self._buckets):
+            members = bucket.get(band)
+            if members is None:
+                continue
+            members.discard(key)
+            if not members:
+                del bucket[band]
+
+    def query(self, text: str) -> List[Tuple[Hashable, float]]:
+        return self.query_signature(self.hasher.signature(text))
+
+    def query_signature(self, signature: Tuple[int, ...]) -> List[Tuple[Hashable, float]]:
+        """Return ``(key, estimated_jaccard)`` for stored keys above the threshold."""
+        candidates: Set[Hashable] = set()
+        for band, bucket in zip(self._bands(signature), self._buckets):
+            members = bucket.get(band)
+            if members:
+                candidates.update(members)
+        matches = []
+        for key in candidates:
+            similarity = MinHasher.jaccard(signature, self._signatures[key])
+            if similarity >= self.threshold:
+                matches.append((key, similarity))
+        return sorted(matches, key=lambda item: -item[1])
+
+    def _bands(self, signature: Tuple[int, ...]) -> List[Tuple[int, ...]]:
+        rows = self.rows
+        return [signature[i * rows : (i + 1) * rows] for i in range(self.bands)]
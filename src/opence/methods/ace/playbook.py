@@ -2,13 +2,20 @@
 
 from __future__ import annotations
 
+import copy
 import json
 from dataclasses import asdict, dataclass, field
 from datetime import datetime, timezone
-from typing import Dict, Iterable, List, Optional
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 from .delta import DeltaBatch, DeltaOperation
 from .deduplication import Deduplicator
+from .storage import InMemoryStorage, PlaybookStorage
+
+if TYPE_CHECKING:  # pragma: no cover - for type hints only
+    from .journal import PlaybookJournal
+
+BULLET_TAGS = ("helpful", "harmful", "neutral")
 
 
 @dataclass
@@ -34,20 +41,86 @@ class Bullet:
                 setattr(self, key, int(value))
 
     def tag(self, tag: str, increment: int = 1) -> None:
-        if tag not in ("helpful", "harmful", "neutral"):
+        if tag not in BULLET_TAGS:
             raise ValueError(f"Unsupported tag: {tag}")
         current = getattr(self, tag)
         setattr(self, tag, current + increment)
         self.updated_at = datetime.now(timezone.utc).isoformat()
 
 
-class Playbook:
-    """Structured context store as defined by ACE."""
+def format_bullet(bullet: Bullet) -> str:
+    """Render one bullet the way it appears in playbook prompts."""
+    counters = f"(helpful={bullet.helpful}, harmful={bullet.harmful}, neutral={bullet.neutral})"
+    return f"- [{bullet.id}] {bullet.content} {counters}"
+
+
+class PlaybookListener:
+    """Receives bullet content changes, e.g. to keep a search index in sync."""
+
+    def bullet_updated(self, bullet: Bullet) -> None:
+        """Called after a bullet is added or its content/section changes."""
+
+    def bullet_removed(self, bullet: Bullet) -> None:
+        """Called after a bullet is removed."""
 
-    def __init__(self) -> None:
-        self._bullets: Dict[str, Bullet] = {}
-        self._sections: Dict[str, List[str]] = {}
-        self._next_id = 0
+
+class Playbook:
+    """Structured context store as defined by ACE.
+
+    Bullets are held by a :class:`PlaybookStorage` engine; the default keeps
+    them in memory, while :class:`SQLiteStorage` serves playbooks that are
+    too large to load whole.
+    """
+
+    def __init__(self, storage: Optional[PlaybookStorage] = None) -> None:
+        self._storage = storage or InMemoryStorage()
+        self._next_id = int(self._storage.get_meta("next_id") or 0)
+        # Rendering cache: per-section prompt text plus the sections whose
+        # bullets changed since they were last rendered. Sections are only
+        # enumerated on the first render so opening large stores stays cheap.
+        self._section_cache: Dict[str, str] = {}
+        self._dirty_sections: Set[str] = set()
+        self._cache_primed = False
+        self._prompt_cache: Optional[str] = None
+        self._journal: Optional["PlaybookJournal"] = None
+        self._listeners: List[PlaybookListener] = []
+        self._version = 0
+
+    @property
+    def storage(self) -> PlaybookStorage:
+        return self._storage
+
+    @property
+    def journal(self) -> Optional["PlaybookJournal"]:
+        return self._journal
+
+    @property
+    def version(self) -> int:
+        """Counter bumped by every mutation; identifies a playbook state."""
+        return self._version
+
+    def snapshot(self) -> "Playbook":
+        """Return an in-memory copy of the current state for concurrent readers.
+
+        The copy carries this playbook's :attr:`version` and a pre-rendered
+        prompt cache, so threads that only read it (``as_prompt``, ``stats``,
+        ``get_bullet``) never mutate shared state. It must not be modified.
+        """
+        bullets, next_id = self._copy_state()
+        # Same order as a to_dict round trip: grouped by section.
+        sections: Dict[str, List[Bullet]] = {}
+        for bullet in bullets:
+            sections.setdefault(bullet.section, []).append(bullet)
+        frozen = Playbook()
+        with frozen._storage.transaction():
+            for group in sections.values():
+                for bullet in group:
+                    frozen._storage.put(bullet)
+            frozen._next_id = next_id
+            frozen._storage.set_meta("next_id", str(next_id))
+        frozen._version = self._version
+        frozen.as_prompt()
+        return frozen
 
     # ------------------------------------------------------------------ #
     # CRUD utils
@@ -59,12 +132,18 @@ class Playbook:
         bullet_id: Optional[str] = None,
         metadata: Optional[Dict[str, int]] = None,
     ) -> Bullet:
+        if bullet_id:
+            previous = self._storage.get(bullet_id)
+            if previous is not None:
+                self._mark_dirty(previous.section)
         bullet_id = bullet_id or self._generate_id(section)
         metadata = metadata or {}
         bullet = Bullet(id=bullet_id, section=section, content=content)
         bullet.apply_metadata(metadata)
-        self._bullets[bullet_id] = bullet
-        self._sections.setdefault(section, []).append(bullet_id)
+        self._storage.put(bullet)
+        self._mark_dirty(section)
+        for listener in self._listeners:
+            listener.bullet_updated(bullet)
         return bullet
 
     def update_bullet(
@@ -74,7 +153,7 @@ class Playbook:
         content: Optional[str] = None,
         metadata: Optional[Dict[str, int]] = None,
     ) -> Optional[Bullet]:
-        bullet = self._bullets.get(bullet_id)
+        bullet = self._storage.get(bullet_id)
         if bullet is None:
             return None
         if content is not None:
@@ -82,60 +161,121 @@ class Playbook:
         if metadata:
             bullet.apply_metadata(metadata)
         bullet.updated_at = datetime.now(timezone.utc).isoformat()
+        self._storage.put(bullet)
+        self._mark_dirty(bullet.section)
+        if content is not None:
+            for listener in self._listeners:
+                listener.bullet_updated(bullet)
         return bullet
 
     def tag_bullet(self, bullet_id: str, tag: str, increment: int = 1) -> Optional[Bullet]:
-        bullet = self._bullets.get(bullet_id)
+        bullet = self._storage.get(bullet_id)
         if bullet is None:
             return None
         bullet.tag(tag, increment=increment)
+        self._storage.put(bullet)
+        self._mark_dirty(bullet.section)
         return bullet
 
     def remove_bullet(self, bullet_id: str) -> None:
-        bullet = self._bullets.pop(bullet_id, None)
+        bullet = self._storage.delete(bullet_id)
         if bullet is None:
             return
-        section_list = self._sections.get(bullet.section)
-        if section_list:
-            self._sections[bullet.section] = [
-                bid for bid in section_list if bid != bullet_id
-            ]
-            if not self._sections[bullet.section]:
-                del self._sections[bullet.section]
+        self._mark_dirty(bullet.section)
+        for listener in self._listeners:
+            listener.bullet_removed(bullet)
 
     def get_bullet(self, bullet_id: str) -> Optional[Bullet]:
-        return self._bullets.get(bullet_id)
+        return self._storage.get(bullet_id)
 
     def bullets(self) -> List[Bullet]:
-        return list(self._bullets.values())
+        return list(self._storage.iter_bullets())
+
+    def iter_bullets(self) -> Iterator[Bullet]:
+        """Yield bullets lazily; preferred over :meth:`bullets` for large stores."""
+        return self._storage.iter_bullets()
 
     # ------------------------------------------------------------------ #
     # Serialization
     # ------------------------------------------------------------------ #
     def to_dict(self) -> Dict[str, object]:
+        return self._payload(self._storage.iter_bullets(), self._next_id)
+
+    def _copy_state(self) -> Tuple[List[Bullet], int]:
+        """Shallow bullet copies and the id counter, for :meth:`_payload` later.
+
+        Bullets are flat and mutated in place, so copying them is enough to
+        freeze the state, and much cheaper than building the payload.
+        """
+        return [copy.copy(bullet) for bullet in self._storage.iter_bullets()], self._next_id
+
+    @staticmethod
+    def _payload(bullets: Iterable[Bullet], next_id: int) -> Dict[str, object]:
+        bullets_payload: Dict[str, object] = {}
+        sections: Dict[str, List[str]] = {}
+        for bullet in bullets:
+            bullets_payload[bullet.id] = asdict(bullet)
+            sections.setdefault(bullet.section, []).append(bullet.id)
         return {
-            "bullets": {bullet_id: asdict(bullet) for bullet_id, bullet in self._bullets.items()},
-            "sections": self._sections,
-            "next_id": self._next_id,
+            "bullets": bullets_payload,
+            "sections": sections,
+            "next_id": next_id,
         }
 
     @classmethod
-    def from_dict(cls, payload: Dict[str, object]) -> "Playbook":
-        instance = cls()
+    def from_dict(
+        cls, payload: Dict[str, object], storage: Optional[PlaybookStorage] = None
+    ) -> "Playbook":
+        instance = cls(storage)
+        bullets: Dict[str, Bullet] = {}
         bullets_payload = payload.get("bullets", {})
         if isinstance(bullets_payload, dict):
             for bullet_id, bullet_value in bullets_payload.items():
                 if isinstance(bullet_value, dict):
-                    instance._bullets[bullet_id] = Bullet(**bullet_value)
+                    bullets[bullet_id] = Bullet(**bullet_value)
+        # Section listings define bullet order; unlisted bullets follow.
+        ordered: List[str] = []
         sections_payload = payload.get("sections", {})
         if isinstance(sections_payload, dict):
-            instance._sections = {
-                section: list(ids) if isinstance(ids, Iterable) else []
-                for section, ids in sections_payload.items()
-            }
-        instance._next_id = int(payload.get("next_id", 0))
+            for ids in sections_payload.values():
+                if isinstance(ids, Iterable):
+                    ordered.extend(str(bullet_id) for bullet_id in ids)
+        ordered.extend(bullets)
+        with instance._storage.transaction():
+            seen: Set[str] = set()
+            for bullet_id in ordered:
+                if bullet_id in bullets and bullet_id not in seen:
+                    seen.add(bullet_id)
+                    instance._storage.put(bullets[bullet_id])
+            instance._next_id = int(payload.get("next_id", 0))
+            instance._storage.set_meta("next_id", str(instance._next_id))
         return instance
 
+    def restore(self, payload: Dict[str, object]) -> None:
+        """Replace the contents with a :meth:`to_dict` payload in place.
+
+        Unlike :meth:`from_dict` this keeps the storage engine, the journal
+        and the listeners (which see the old bullets removed and the restored
+        ones added). The change is not journaled.
+        """
+        source = Playbook.from_dict(payload)
+        with self._storage.transaction():
+            for bullet in list(self._storage.iter_bullets()):
+                self._storage.delete(bullet.id)
+                for listener in self._listeners:
+                    listener.bullet_removed(bullet)
+            for bullet in source.iter_bullets():
+                self._storage.put(bullet)
+                for listener in self._listeners:
+                    listener.bullet_updated(bullet)
+            self._next_id = source._next_id
+            self._storage.set_meta("next_id", str(self._next_id))
+        self._section_cache.clear()
+        self._dirty_sections.clear()
+        self._cache_primed = False
+        self._prompt_cache = None
+        self._version += 1
+
     def dumps(self) -> str:
         return json.dumps(self.to_dict(), ensure_ascii=False, indent=2)
 
@@ -150,8 +290,25 @@ class Playbook:
     # Delta application
     # ------------------------------------------------------------------ #
     def apply_delta(self, delta: DeltaBatch) -> None:
-        for operation in delta.operations:
-            self._apply_operation(operation)
+        with self._storage.transaction():
+            for operation in delta.operations:
+                self._apply_operation(operation)
+        if self._journal is not None:
+            self._journal.append(delta)
+
+    def add_listener(self, listener: PlaybookListener) -> None:
+        """Notify ``listener`` of every subsequent bullet content change."""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: PlaybookListener) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def attach_journal(self, journal: "PlaybookJournal") -> None:
+        """Log every subsequently applied delta to ``journal``."""
+        self._journal = journal
+        journal.attach(self)
 
     def _apply_operation(self, operation: DeltaOperation) -> None:
         op_type = operation.type.upper()
@@ -191,21 +348,35 @@ class Playbook:
         Returns:
             A list of bullet IDs that were removed.
         """
-        new_bullets = {
-            bullet_id: self._bullets[bullet_id].content
-            for bullet_id in bullet_ids
-            if bullet_id in self._bullets
-        }
+        new_bullets: Dict[str, str] = {}
+        sections: Dict[str, str] = {}
+        for bullet_id in bullet_ids:
+            bullet = self._storage.get(bullet_id)
+            if bullet is not None:
+                new_bullets[bullet_id] = bullet.content
+                sections[bullet_id] = bullet.section
         existing_bullets = {
-            bullet_id: bullet.content
-            for bullet_id, bullet in self._bullets.items()
-            if bullet_id not in new_bullets
+            bullet.id: bullet.content
+            for bullet in self._storage.iter_bullets()
+            if bullet.id not in new_bullets
         }
 
         duplicate_ids = deduplicator.find_duplicates(new_bullets, existing_bullets)
 
-        for bullet_id in duplicate_ids:
-            self.remove_bullet(bullet_id)
+        if duplicate_ids:
+            self.apply_delta(
+                DeltaBatch(
+                    reasoning="deduplication",
+                    operations=[
+                        DeltaOperation(
+                            type="REMOVE",
+                            section=sections[bullet_id],
+                            bullet_id=bullet_id,
+                        )
+                        for bullet_id in duplicate_ids
+                    ],
+                )
+            )
 
         return duplicate_ids
 
@@ -213,33 +384,62 @@ class Playbook:
     # Presentation helpers
     # ------------------------------------------------------------------ #
     def as_prompt(self) -> str:
-        """Return a human-readable playbook string for prompting LLMs."""
-        parts: List[str] = []
-        for section, bullet_ids in sorted(self._sections.items()):
-            parts.append(f"## {section}")
-            for bullet_id in bullet_ids:
-                bullet = self._bullets[bullet_id]
-                counters = (
-                    f"(helpful={bullet.helpful}, harmful={bullet.harmful}, neutral={bullet.neutral})"
-                )
-                parts.append(f"- [{bullet.id}] {bullet.content} {counters}")
-        return "\n".join(parts)
+        """Return a human-readable playbook string for prompting LLMs.
+
+        Section blocks are cached between calls; only sections touched by
+        ``add_bullet``/``update_bullet``/``tag_bullet``/``remove_bullet`` since
+        the previous render are formatted again. Bullets mutated directly
+        (bypassing these methods) are not picked up until their section is
+        touched again.
+        """
+        if self._prompt_cache is not None and not self._dirty_sections:
+            return self._prompt_cache
+        if not self._cache_primed:
+            self._dirty_sections.update(self._storage.section_names())
+            self._cache_primed = True
+        for section in self._dirty_sections:
+            section_bullets = self._storage.section_bullets(section)
+            if section_bullets:
+                self._section_cache[section] = self._render_section(section, section_bullets)
+            else:
+                self._section_cache.pop(section, None)
+        self._dirty_sections.clear()
+        self._prompt_cache = "\n".join(
+            self._section_cache[section] for section in sorted(self._section_cache)
+        )
+        return self._prompt_cache
+
+    def render_bullets(self, bullets: Iterable[Bullet]) -> str:
+        """Render a subset of bullets grouped by section like :meth:`as_prompt`."""
+        grouped: Dict[str, List[Bullet]] = {}
+        for bullet in bullets:
+            grouped.setdefault(bullet.section, []).append(bullet)
+        return "\n".join(
+            self._render_section(section, grouped[section]) for section in sorted(grouped)
+        )
 
     def stats(self) -> Dict[str, object]:
         return {
-            "sections": len(self._sections),
-            "bullets": len(self._bullets),
-            "tags": {
-                "helpful": sum(b.helpful for b in self._bullets.values()),
-                "harmful": sum(b.harmful for b in self._bullets.values()),
-                "neutral": sum(b.neutral for b in self._bullets.values()),
-            },
+            "sections": len(self._storage.section_names()),
+            "bullets": self._storage.count(),
+            "tags": self._storage.tag_totals(),
         }
 
     # ------------------------------------------------------------------ #
     # Internal helpers
     # ------------------------------------------------------------------ #
+    def _render_section(self, section: str, bullets: List[Bullet]) -> str:
+        parts = [f"## {section}"]
+        parts.extend(format_bullet(bullet) for bullet in bullets)
+        return "\n".join(parts)
+
+    def _mark_dirty(self, section: str) -> None:
+        self._dirty_sections.add(section)
+        self._prompt_cache = None
+        self._version += 1
+
     def _generate_id(self, section: str) -> str:
         self._next_id += 1
+        self._storage.set_meta("next_id", str(self._next_id))
         section_prefix = section.split()[0].lower()
         return f"{section_prefix}-{self._next_id:05d}"
@@ -87,3 +87,45 @@ Respond with JSON:
 }}
 If no updates are required, return an empty list for "operations".
 """
+
+
+CURATOR_BATCH_PROMPT = """\
+You are the curator of the ACE playbook. Merge the latest {count} reflections into one set of structured updates.
+Only add genuinely new material, and consolidate lessons shared by several reflections into a single bullet.
+Do not regenerate the entire playbook.
+Respond with a single valid JSON object only—no analysis or extra narration.
+
+Training progress: {progress}
+Playbook stats: {stats}
+
+Recent reflections:
+{reflections}
+
+Current playbook:
+{playbook}
+
+Respond with JSON:
+{{
+  "reasoning": "<how you decided on the updates>",
+  "operations": [
+    {{
+      "type": "ADD|UPDATE|TAG|REMOVE",
+      "section": "<section name>",
+      "content": "<bullet text>",
+      "bullet_id": "<optional existing id>",
+      "metadata": {{"helpful": 1, "harmful": 0}}
+    }}
+  ]
+}}
+If no updates are required, return an empty list for "operations".
+"""
+
+
+JSON_FIX_PROMPT = """\
+The text below was meant to be a single JSON object but it does not parse ({error}).
+Return the same content as one valid JSON object: escape inner double quotes, close every string, array and object, and drop trailing commas.
+Respond with the JSON object only—no analysis or extra narration.
+
+Broken output:
+{broken}
+"""
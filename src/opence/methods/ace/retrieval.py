@@ -0,0 +1,207 @@
+"""Question-conditioned bullet retrieval so prompts carry only relevant playbook entries."""
+
+from __future__ import annotations
+
+import heapq
+import math
+import re
+import threading
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from opence.models.rate_limit import estimate_tokens
+
+from .playbook import Bullet, Playbook, PlaybookListener, format_bullet
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def char_ngrams(text: str, sizes: Sequence[int] = (2, 3)) -> List[str]:
+    """Split ``text`` into overlapping character n-grams.
+
+    Character n-grams need no word segmentation, so the same index serves the
+    Chinese and English content found in playbooks.
+    """
+    normalized = _WHITESPACE.sub(" ", text.lower()).strip()
+    grams: List[str] = []
+    for size in sizes:
+        if len(normalized) < size:
+            if normalized and size == sizes[0]:
+                grams.append(normalized)
+            continue
+        grams.extend(normalized[i : i + size] for i in range(len(normalized) - size + 1))
+    return grams
+
+
+class BulletIndex:
+    """Incremental BM25 inverted index over bullet contents."""
+
+    def __init__(
+        self,
+        *,
+        ngram_sizes: Sequence[int] = (2, 3),
+        k1: float = 1.2,
+        b: float = 0.75,
+        max_df_ratio: float = 0.3,
+    ) -> None:
+        self.ngram_sizes = tuple(ngram_sizes)
+        self.k1 = k1
+        self.b = b
+        self.max_df_ratio = max_df_ratio
+        self._postings: Dict[str, Dict[str, int]] = {}
+        self._doc_terms: Dict[str, Counter] = {}
+        self._doc_lengths: Dict[str, int] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+
+    def __contains__(self, bullet_id: object) -> bool:
+        return bullet_id in self._doc_lengths
+
+    def add(self, bullet_id: str, content: str) -> None:
+        """Index ``content`` under ``bullet_id``, replacing any previous entry."""
+        self.remove(bullet_id)
+        terms = Counter(char_ngrams(content, self.ngram_sizes))
+        for term, count in terms.items():
+            self._postings.setdefault(term, {})[bullet_id] = count
+        length = sum(terms.values())
+        self._doc_terms[bullet_id] = terms
+        self._doc_lengths[bullet_id] = length
+        self._total_length += length
+
+    def remove(self, bullet_id: str) -> None:
+        terms = self._doc_terms.pop(bullet_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            postings.pop(bullet_id, None)
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._doc_lengths.pop(bullet_id)
+
+    def search(
+        self, query: str, top_k: int, include: Optional[Callable[[str], bool]] = None
+    ) -> List[Tuple[str, float]]:
+        """Return up to ``top_k`` ``(bullet_id, score)`` pairs, best first.
+
+        ``include`` restricts the candidates before the cut, so filtered-out
+        ids never take a slot.
+        """
+        if not self._doc_lengths or top_k <= 0:
+            return []
+        doc_count = len(self._doc_lengths)
+        avg_length = self._total_length / doc_count or 1.0
+        max_df = max(1, int(doc_count * self.max_df_ratio))
+        base_norm = self.k1 * (1.0 - self.b)
+        length_norm = self.k1 * self.b / avg_length
+        lengths = self._doc_lengths
+        scores: Dict[str, float] = {}
+        for term, query_tf in Counter(char_ngrams(query, self.ngram_sizes)).items():
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            df = len(postings)
+            if df > max_df and doc_count > 1:
+                # Near-ubiquitous n-grams carry almost no IDF weight but dominate
+                # scoring cost; skipping them keeps lookups proportional to the
+                # selective terms of the query.
+                continue
+            idf = math.log(1.0 + (doc_count - df + 0.5) / (df + 0.5))
+            weight = query_tf * idf * (self.k1 + 1.0)
+            for bullet_id, tf in postings.items():
+                scores[bullet_id] = scores.get(bullet_id, 0.0) + weight * tf / (
+                    tf + base_norm + length_norm * lengths[bullet_id]
+                )
+        candidates: Iterable[Tuple[str, float]] = scores.items()
+        if include is not None:
+            candidates = [item for item in candidates if include(item[0])]
+        return heapq.nlargest(top_k, candidates, key=lambda item: (item[1], item[0]))
+
+
+def _holds(playbook: Playbook) -> Callable[[str], bool]:
+    return lambda bullet_id: playbook.get_bullet(bullet_id) is not None
+
+
+class PlaybookRetriever(PlaybookListener):
+    """Selects the bullets most relevant to a question within a token budget.
+
+    The retriever indexes the playbook it is attached to (by default the
+    first one it is used with) and registers as a :class:`PlaybookListener`,
+    so added, updated and removed bullets (e.g. from applied deltas) keep the
+    index current without rebuilding it. :meth:`retrieve` on another
+    playbook, such as a :meth:`Playbook.snapshot` of the attached one, ranks
+    with the attached index restricted to the ids the given playbook
+    contains, so it still gets ``top_k`` hits however far the attached one
+    has moved on; only :meth:`attach` re-targets.
+    """
+
+    def __init__(
+        self,
+        *,
+        top_k: int = 20,
+        token_budget: Optional[int] = 2000,
+        ngram_sizes: Sequence[int] = (2, 3),
+    ) -> None:
+        self.top_k = top_k
+        self.token_budget = token_budget
+        self.ngram_sizes = tuple(ngram_sizes)
+        self._index = BulletIndex(ngram_sizes=self.ngram_sizes)
+        self._playbook: Optional[Playbook] = None
+        self._lock = threading.RLock()
+        self.rebuilds = 0
+
+    # ------------------------------------------------------------------ #
+    # PlaybookListener
+    # ------------------------------------------------------------------ #
+    def bullet_updated(self, bullet: Bullet) -> None:
+        with self._lock:
+            self._index.add(bullet.id, bullet.content)
+
+    def bullet_removed(self, bullet: Bullet) -> None:
+        with self._lock:
+            self._index.remove(bullet.id)
+
+    # ------------------------------------------------------------------ #
+    def attach(self, playbook: Playbook) -> None:
+        """(Re)build the index for ``playbook`` and follow its future changes."""
+        with self._lock:
+            if self._playbook is playbook:
+                return
+            if self._playbook is not None:
+                self._playbook.remove_listener(self)
+            self._index = BulletIndex(ngram_sizes=self.ngram_sizes)
+            for bullet in playbook.iter_bullets():
+                self._index.add(bullet.id, bullet.content)
+            playbook.add_listener(self)
+            self._playbook = playbook
+            self.rebuilds += 1
+
+    def retrieve(self, playbook: Playbook, query: str) -> List[Bullet]:
+        """Return the top-k bullets for ``query`` that fit in the token budget."""
+        with self._lock:
+            if self._playbook is None:
+                self.attach(playbook)
+            # Rank only ids the target holds, e.g. a snapshot the live
+            # playbook has since grown past.
+            include = None if playbook is self._playbook else _holds(playbook)
+            ranked = self._index.search(query, self.top_k, include)
+        selected: List[Bullet] = []
+        used = 0
+        for bullet_id, _ in ranked:
+            bullet = playbook.get_bullet(bullet_id)
+            if bullet is None:
+                continue
+            cost = estimate_tokens(format_bullet(bullet))
+            if self.token_budget is not None and used + cost > self.token_budget:
+                continue
+            selected.append(bullet)
+            used += cost
+        return selected
+
+    def render(self, playbook: Playbook, query: str) -> str:
+        """Render the retrieved bullets in the same layout as ``Playbook.as_prompt``."""
+        return playbook.render_bullets(self.retrieve(playbook, query))
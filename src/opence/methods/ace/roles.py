@@ -3,29 +3,48 @@
 from __future__ import annotations
 
 import json
+import logging
+import time
 from dataclasses import dataclass
-from pathlib import Path
-from typing import Any, Dict, List, Optional, Sequence
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence, Tuple, TypeVar
+from typing import Generator as _Protocol
 
 from .delta import DeltaBatch
-from opence.models.clients import LLMClient
+from .json_repair import JsonRepairStats, loads_lenient, record
+from .json_stream import JsonFieldParser
+from opence.models.clients import LLMClient, LLMUsage
+from opence.models.rate_limit import estimate_tokens
 from .playbook import Playbook
-from .prompts import CURATOR_PROMPT, GENERATOR_PROMPT, REFLECTOR_PROMPT
+from .prompts import (
+    CURATOR_BATCH_PROMPT,
+    CURATOR_PROMPT,
+    GENERATOR_PROMPT,
+    JSON_FIX_PROMPT,
+    REFLECTOR_PROMPT,
+)
 
+if TYPE_CHECKING:  # pragma: no cover - for type hints only
+    from .retrieval import PlaybookRetriever
 
-def _safe_json_loads(text: str) -> Dict[str, Any]:
+
+logger = logging.getLogger(__name__)
+
+
+def _safe_json_loads(text: str, stats: Optional[JsonRepairStats] = None) -> Dict[str, Any]:
     try:
         data = json.loads(text)
     except json.JSONDecodeError as exc:
-        debug_path = Path("logs/json_failures.log")
-        debug_path.parent.mkdir(parents=True, exist_ok=True)
-        with debug_path.open("a", encoding="utf-8") as fh:
-            fh.write("----\n")
-            fh.write(repr(text))
-            fh.write("\n")
-        raise ValueError(f"LLM response is not valid JSON: {exc}\n{text}") from exc
+        try:
+            data = loads_lenient(text)
+        except ValueError:
+            logger.warning("LLM response is not valid JSON: %s", exc)
+            logger.debug("Unparseable LLM response: %r", text)
+            raise ValueError(f"LLM response is not valid JSON: {exc}\n{text}") from exc
+        record(stats, "local_repairs")
+        return data
     if not isinstance(data, dict):
         raise ValueError("Expected a JSON object from LLM.")
+    record(stats, "parsed")
     return data
 
 
@@ -33,16 +52,153 @@ def _format_optional(value: Optional[str]) -> str:
     return value or "(none)"
 
 
+T = TypeVar("T")
+# A role's request logic written once, independent of transport: it yields
+# ``(prompt, extra_kwargs)`` for each LLM call, receives the response text,
+# and returns the parsed result. ``_run`` / ``_arun`` drive it sync or async.
+RequestProtocol = _Protocol[Tuple[str, Dict[str, Any]], str, T]
+
+
+def _json_request(
+    base_prompt: str,
+    parse: Callable[[Dict[str, Any]], T],
+    *,
+    max_retries: int,
+    retry_suffix: str,
+    failure: str,
+    stats: Optional[JsonRepairStats] = None,
+    **extra: Any,
+) -> RequestProtocol[T]:
+    """Request, locally repair and parse a JSON object.
+
+    Malformed output is first repaired locally (see
+    :mod:`~opence.methods.ace.json_repair`). If that fails, output that at
+    least attempted JSON is retried with the short :data:`JSON_FIX_PROMPT`
+    carrying only the broken text; otherwise the full prompt is resent.
+    """
+    prompt = base_prompt
+    last_error: Optional[Exception] = None
+    for attempt in range(max_retries):
+        text = yield prompt, extra
+        try:
+            return parse(_safe_json_loads(text, stats))
+        except ValueError as err:
+            last_error = err
+            if attempt + 1 >= max_retries:
+                break
+            if "{" in text:
+                record(stats, "fix_prompts")
+                prompt = JSON_FIX_PROMPT.format(error=_first_line(err), broken=text)
+            else:
+                record(stats, "full_retries")
+                prompt = base_prompt + retry_suffix
+    raise RuntimeError(failure) from last_error
+
+
+def _first_line(error: Exception) -> str:
+    return str(error).splitlines()[0] if str(error) else type(error).__name__
+
+
+def _with_usage(result: T, usage: LLMUsage) -> T:
+    """Attach the summed usage of every call a role made to its output."""
+    if hasattr(result, "usage"):
+        result.usage = usage  # type: ignore[attr-defined]
+    return result
+
+
+def _run(llm: LLMClient, protocol: RequestProtocol[T], kwargs: Dict[str, Any]) -> T:
+    usage = LLMUsage(calls=0)
+    try:
+        prompt, extra = next(protocol)
+        while True:
+            response = llm.complete(prompt, **extra, **kwargs)
+            if response.usage is not None:
+                usage.add(response.usage)
+            prompt, extra = protocol.send(response.text)
+    except StopIteration as stop:
+        return _with_usage(stop.value, usage)
+
+
+def _run_streaming(
+    llm: LLMClient,
+    protocol: RequestProtocol[T],
+    kwargs: Dict[str, Any],
+    on_field: Callable[[str, Any], None],
+    fields: Sequence[str],
+) -> T:
+    """:func:`_run` over :meth:`LLMClient.stream`, reporting ``fields`` early.
+
+    ``on_field(name, value)`` fires as soon as a field's value is complete in
+    the streamed text. If a response has to be retried, a field is reported
+    again only when its value changed.
+    """
+    reported: Dict[str, Any] = {}
+    usage = LLMUsage(calls=0)
+    try:
+        prompt, extra = next(protocol)
+        while True:
+            parser = JsonFieldParser(fields)
+            chunks: List[str] = []
+            started = time.perf_counter()
+            first_chunk: Optional[float] = None
+            for chunk in llm.stream(prompt, **extra, **kwargs):
+                if first_chunk is None:
+                    first_chunk = time.perf_counter() - started
+                chunks.append(chunk)
+                for name, value in parser.feed(chunk).items():
+                    if name not in reported or reported[name] != value:
+                        reported[name] = value
+                        on_field(name, value)
+            text = llm.postprocess_text("".join(chunks))
+            # Streams carry no usage report, so token counts are estimated.
+            usage.add(
+                LLMUsage(
+                    prompt_tokens=estimate_tokens(prompt),
+                    completion_tokens=estimate_tokens(text),
+                    time_to_first_token=first_chunk,
+                    latency=time.perf_counter() - started,
+                )
+            )
+            prompt, extra = protocol.send(text)
+    except StopIteration as stop:
+        return _with_usage(stop.value, usage)
+
+
+async def _arun(llm: LLMClient, protocol: RequestProtocol[T], kwargs: Dict[str, Any]) -> T:
+    usage = LLMUsage(calls=0)
+    try:
+        prompt, extra = next(protocol)
+        while True:
+            response = await llm.acomplete(prompt, **extra, **kwargs)
+            if response.usage is not None:
+                usage.add(response.usage)
+            prompt, extra = protocol.send(response.text)
+    except StopIteration as stop:
+        return _with_usage(stop.value, usage)
+
+
 @dataclass
 class GeneratorOutput:
     reasoning: str
     final_answer: str
     bullet_ids: List[str]
     raw: Dict[str, Any]
+    usage: Optional[LLMUsage] = None
 
 
 class Generator:
-    """Produces trajectories using the current playbook."""
+    """Produces trajectories using the current playbook.
+
+    With a ``retriever`` the prompt carries only the bullets most relevant to
+    the question (within the retriever's token budget) instead of the whole
+    playbook.
+
+    Passing ``on_field`` to :meth:`generate` streams the response and calls
+    ``on_field(name, value)`` for each of :attr:`streamed_fields` as soon as
+    it is complete, before the rest of the object has been decoded.
+    """
+
+    streamed_fields: Tuple[str, ...] = ("final_answer", "bullet_ids")
 
     def __init__(
         self,
@@ -50,10 +206,13 @@ class Generator:
         prompt_template: str = GENERATOR_PROMPT,
         *,
         max_retries: int = 3,
+        retriever: Optional["PlaybookRetriever"] = None,
     ) -> None:
         self.llm = llm
         self.prompt_template = prompt_template
         self.max_retries = max_retries
+        self.retriever = retriever
+        self.json_stats = JsonRepairStats()
 
     def generate(
         self,
@@ -62,43 +221,73 @@ class Generator:
         context: Optional[str],
         playbook: Playbook,
         reflection: Optional[str] = None,
+        on_field: Optional[Callable[[str, Any], None]] = None,
         **kwargs: Any,
     ) -> GeneratorOutput:
+        protocol = self._generation(question, context, playbook, reflection)
+        if on_field is not None:
+            return _run_streaming(self.llm, protocol, kwargs, on_field, self.streamed_fields)
+        return _run(self.llm, protocol, kwargs)
+
+    async def agenerate(
+        self,
+        *,
+        question: str,
+        context: Optional[str],
+        playbook: Playbook,
+        reflection: Optional[str] = None,
+        **kwargs: Any,
+    ) -> GeneratorOutput:
+        return await _arun(
+            self.llm, self._generation(question, context, playbook, reflection), kwargs
+        )
+
+    def _generation(
+        self,
+        question: str,
+        context: Optional[str],
+        playbook: Playbook,
+        reflection: Optional[str],
+    ) -> RequestProtocol[GeneratorOutput]:
+        if self.retriever is not None:
+            playbook_text = self.retriever.render(
+                playbook, f"{question}\n{context or ''}"
+            )
+        else:
+            playbook_text = playbook.as_prompt()
         base_prompt = self.prompt_template.format(
-            playbook=playbook.as_prompt() or "(empty playbook)",
+            playbook=playbook_text or "(empty playbook)",
             reflection=_format_optional(reflection),
             question=question,
             context=_format_optional(context),
         )
-        prompt = base_prompt
-        last_error: Optional[Exception] = None
-        for attempt in range(self.max_retries):
-            response = self.llm.complete(prompt, **kwargs)
-            try:
-                data = _safe_json_loads(response.text)
-                reasoning = str(data.get("reasoning", ""))
-                final_answer = str(data.get("final_answer", ""))
-                bullet_ids = [
-                    str(item)
-                    for item in data.get("bullet_ids", [])
-                    if isinstance(item, (str, int))
-                ]
-                return GeneratorOutput(
-                    reasoning=reasoning,
-                    final_answer=final_answer,
-                    bullet_ids=bullet_ids,
-                    raw=data,
-                )
-            except ValueError as err:
-                last_error = err
-                if attempt + 1 >= self.max_retries:
-                    break
-                prompt = (
-                    base_prompt
-                    + "\n\n务必仅输出单个有效 JSON 对象，"
-                    "请转义所有引号或改用单引号，避免输出额外文本。"
-                )
-        raise RuntimeError("Generator failed to produce valid JSON.") from last_error
+        return _json_request(
+            base_prompt,
+            _parse_generator_output,
+            max_retries=self.max_retries,
+            retry_suffix=(
+                "\n\n务必仅输出单个有效 JSON 对象，"
+                "请转义所有引号或改用单引号，避免输出额外文本。"
+            ),
+            failure="Generator failed to produce valid JSON.",
+            stats=self.json_stats,
+        )
+
+
+def _parse_generator_output(data: Dict[str, Any]) -> GeneratorOutput:
+    reasoning = str(data.get("reasoning", ""))
+    final_answer = str(data.get("final_answer", ""))
+    bullet_ids = [
+        str(item)
+        for item in data.get("bullet_ids", [])
+        if isinstance(item, (str, int))
+    ]
+    return GeneratorOutput(
+        reasoning=reasoning,
+        final_answer=final_answer,
+        bullet_ids=bullet_ids,
+        raw=data,
+    )
 
 
 @dataclass
@@ -116,6 +305,7 @@ class ReflectorOutput:
     key_insight: str
     bullet_tags: List[BulletTag]
     raw: Dict[str, Any]
+    usage: Optional[LLMUsage] = None
 
 
 class Reflector:
@@ -131,6 +321,7 @@ class Reflector:
         self.llm = llm
         self.prompt_template = prompt_template
         self.max_retries = max_retries
+        self.json_stats = JsonRepairStats()
 
     def reflect(
         self,
@@ -143,6 +334,42 @@ class Reflector:
         max_refinement_rounds: int = 1,
         **kwargs: Any,
     ) -> ReflectorOutput:
+        return _run(
+            self.llm,
+            self._reflection(
+                question, generator_output, playbook, ground_truth, feedback, max_refinement_rounds
+            ),
+            kwargs,
+        )
+
+    async def areflect(
+        self,
+        *,
+        question: str,
+        generator_output: GeneratorOutput,
+        playbook: Playbook,
+        ground_truth: Optional[str],
+        feedback: Optional[str],
+        max_refinement_rounds: int = 1,
+        **kwargs: Any,
+    ) -> ReflectorOutput:
+        return await _arun(
+            self.llm,
+            self._reflection(
+                question, generator_output, playbook, ground_truth, feedback, max_refinement_rounds
+            ),
+            kwargs,
+        )
+
+    def _reflection(
+        self,
+        question: str,
+        generator_output: GeneratorOutput,
+        playbook: Playbook,
+        ground_truth: Optional[str],
+        feedback: Optional[str],
+        max_refinement_rounds: int,
+    ) -> RequestProtocol[ReflectorOutput]:
         playbook_excerpt = _make_playbook_excerpt(playbook, generator_output.bullet_ids)
         base_prompt = self.prompt_template.format(
             question=question,
@@ -153,62 +380,67 @@ class Reflector:
             playbook_excerpt=playbook_excerpt or "(no bullets referenced)",
         )
         result: Optional[ReflectorOutput] = None
-        prompt = base_prompt
-        last_error: Optional[Exception] = None
+        last_error: Optional[BaseException] = None
         for round_idx in range(max_refinement_rounds):
-            prompt = base_prompt
-            for attempt in range(self.max_retries):
-                response = self.llm.complete(
-                    prompt, refinement_round=round_idx, **kwargs
-                )
-                try:
-                    data = _safe_json_loads(response.text)
-                    bullet_tags: List[BulletTag] = []
-                    tags_payload = data.get("bullet_tags", [])
-                    if isinstance(tags_payload, Sequence):
-                        for item in tags_payload:
-                            if isinstance(item, dict) and "id" in item and "tag" in item:
-                                bullet_tags.append(
-                                    BulletTag(
-                                        id=str(item["id"]), tag=str(item["tag"]).lower()
-                                    )
-                                )
-                    candidate = ReflectorOutput(
-                        reasoning=str(data.get("reasoning", "")),
-                        error_identification=str(data.get("error_identification", "")),
-                        root_cause_analysis=str(data.get("root_cause_analysis", "")),
-                        correct_approach=str(data.get("correct_approach", "")),
-                        key_insight=str(data.get("key_insight", "")),
-                        bullet_tags=bullet_tags,
-                        raw=data,
-                    )
-                    result = candidate
-                    # Early exit if we already have actionable output
-                    if bullet_tags or candidate.key_insight:
-                        return candidate
-                    break
-                except ValueError as err:
-                    last_error = err
-                    if attempt + 1 >= self.max_retries:
-                        break
-                    prompt = (
-                        base_prompt
-                        + "\n\n请严格输出有效 JSON，对双引号进行转义，"
+            try:
+                candidate = yield from _json_request(
+                    base_prompt,
+                    _parse_reflector_output,
+                    max_retries=self.max_retries,
+                    retry_suffix=(
+                        "\n\n请严格输出有效 JSON，对双引号进行转义，"
                         "不要输出额外解释性文本。"
-                    )
+                    ),
+                    failure="Reflector failed to produce valid JSON.",
+                    stats=self.json_stats,
+                    refinement_round=round_idx,
+                )
+            except RuntimeError as err:
+                last_error = err.__cause__
+                continue
+            result = candidate
+            # Early exit if we already have actionable output
+            if candidate.bullet_tags or candidate.key_insight:
+                return candidate
         if result is None:
             raise RuntimeError("Reflector failed to produce a result.") from last_error
         return result
 
 
+def _parse_reflector_output(data: Dict[str, Any]) -> ReflectorOutput:
+    bullet_tags: List[BulletTag] = []
+    tags_payload = data.get("bullet_tags", [])
+    if isinstance(tags_payload, Sequence):
+        for item in tags_payload:
+            if isinstance(item, dict) and "id" in item and "tag" in item:
+                bullet_tags.append(
+                    BulletTag(id=str(item["id"]), tag=str(item["tag"]).lower())
+                )
+    return ReflectorOutput(
+        reasoning=str(data.get("reasoning", "")),
+        error_identification=str(data.get("error_identification", "")),
+        root_cause_analysis=str(data.get("root_cause_analysis", "")),
+        correct_approach=str(data.get("correct_approach", "")),
+        key_insight=str(data.get("key_insight", "")),
+        bullet_tags=bullet_tags,
+        raw=data,
+    )
+
+
 @dataclass
 class CuratorOutput:
     delta: DeltaBatch
     raw: Dict[str, Any]
+    usage: Optional[LLMUsage] = None
 
 
 class Curator:
-    """Transforms reflections into delta updates."""
+    """Transforms reflections into delta updates.
+
+    :meth:`curate_batch` merges several reflections in one call using
+    ``batch_prompt_template``, so the playbook and its stats are sent once
+    per batch instead of once per reflection.
+    """
 
     def __init__(
         self,
@@ -216,10 +448,13 @@ class Curator:
         prompt_template: str = CURATOR_PROMPT,
         *,
         max_retries: int = 3,
+        batch_prompt_template: str = CURATOR_BATCH_PROMPT,
     ) -> None:
         self.llm = llm
         self.prompt_template = prompt_template
+        self.batch_prompt_template = batch_prompt_template
         self.max_retries = max_retries
+        self.json_stats = JsonRepairStats()
 
     def curate(
         self,
@@ -230,6 +465,61 @@ class Curator:
         progress: str,
         **kwargs: Any,
     ) -> CuratorOutput:
+        return _run(
+            self.llm, self._curation(reflection, playbook, question_context, progress), kwargs
+        )
+
+    async def acurate(
+        self,
+        *,
+        reflection: ReflectorOutput,
+        playbook: Playbook,
+        question_context: str,
+        progress: str,
+        **kwargs: Any,
+    ) -> CuratorOutput:
+        return await _arun(
+            self.llm, self._curation(reflection, playbook, question_context, progress), kwargs
+        )
+
+    def curate_batch(
+        self,
+        *,
+        reflections: Sequence[ReflectorOutput],
+        playbook: Playbook,
+        question_contexts: Sequence[str],
+        progress: str,
+        **kwargs: Any,
+    ) -> CuratorOutput:
+        """Produce one merged delta for several reflections."""
+        return _run(
+            self.llm,
+            self._batch_curation(reflections, playbook, question_contexts, progress),
+            kwargs,
+        )
+
+    async def acurate_batch(
+        self,
+        *,
+        reflections: Sequence[ReflectorOutput],
+        playbook: Playbook,
+        question_contexts: Sequence[str],
+        progress: str,
+        **kwargs: Any,
+    ) -> CuratorOutput:
+        return await _arun(
+            self.llm,
+            self._batch_curation(reflections, playbook, question_contexts, progress),
+            kwargs,
+        )
+
+    def _curation(
+        self,
+        reflection: ReflectorOutput,
+        playbook: Playbook,
+        question_context: str,
+        progress: str,
+    ) -> RequestProtocol[CuratorOutput]:
         base_prompt = self.prompt_template.format(
             progress=progress,
             stats=json.dumps(playbook.stats()),
@@ -237,24 +527,52 @@ class Curator:
             playbook=playbook.as_prompt() or "(empty playbook)",
             question_context=question_context,
         )
-        prompt = base_prompt
-        last_error: Optional[Exception] = None
-        for attempt in range(self.max_retries):
-            response = self.llm.complete(prompt, **kwargs)
-            try:
-                data = _safe_json_loads(response.text)
-                delta = DeltaBatch.from_json(data)
-                return CuratorOutput(delta=delta, raw=data)
-            except ValueError as err:
-                last_error = err
-                if attempt + 1 >= self.max_retries:
-                    break
-                prompt = (
-                    base_prompt
-                    + "\n\n提醒：仅输出有效 JSON，所有字符串请转义双引号或改用单引号，"
-                    "不要添加额外文本。"
-                )
-        raise RuntimeError("Curator failed to produce valid JSON.") from last_error
+        return self._request(base_prompt)
+
+    def _batch_curation(
+        self,
+        reflections: Sequence[ReflectorOutput],
+        playbook: Playbook,
+        question_contexts: Sequence[str],
+        progress: str,
+    ) -> RequestProtocol[CuratorOutput]:
+        if len(reflections) != len(question_contexts):
+            raise ValueError("Each reflection needs a matching question context.")
+        if len(reflections) == 1:
+            return self._curation(reflections[0], playbook, question_contexts[0], progress)
+        entries = [
+            f"### Reflection {index}\n"
+            f"Question context:\n{question_context}\n"
+            f"Reflection:\n{json.dumps(reflection.raw, ensure_ascii=False, indent=2)}"
+            for index, (reflection, question_context) in enumerate(
+                zip(reflections, question_contexts), start=1
+            )
+        ]
+        base_prompt = self.batch_prompt_template.format(
+            count=len(reflections),
+            progress=progress,
+            stats=json.dumps(playbook.stats()),
+            reflections="\n\n".join(entries),
+            playbook=playbook.as_prompt() or "(empty playbook)",
+        )
+        return self._request(base_prompt)
+
+    def _request(self, base_prompt: str) -> RequestProtocol[CuratorOutput]:
+        return _json_request(
+            base_prompt,
+            _parse_curator_output,
+            max_retries=self.max_retries,
+            retry_suffix=(
+                "\n\n提醒：仅输出有效 JSON，所有字符串请转义双引号或改用单引号，"
+                "不要添加额外文本。"
+            ),
+            failure="Curator failed to produce valid JSON.",
+            stats=self.json_stats,
+        )
+
+
+def _parse_curator_output(data: Dict[str, Any]) -> CuratorOutput:
+    return CuratorOutput(delta=DeltaBatch.from_json(data), raw=data)
 
 
 def _make_playbook_excerpt(playbook: Playbook, bullet_ids: Sequence[str]) -> str:
@@ -0,0 +1,70 @@
+"""Destinations for adapter step results streamed by :meth:`OnlineAdapter.iter_run`."""
+
+from __future__ import annotations
+
+import json
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Callable, Iterator, Type, Union
+
+from .adaptation import AdapterStepResult, Sample
+
+
+class ResultSink(ABC):
+    """Receives every :class:`AdapterStepResult` of a run as it completes."""
+
+    @abstractmethod
+    def write(self, result: AdapterStepResult) -> None:
+        """Consume one step result."""
+
+    def close(self) -> None:
+        """Release resources; the default does nothing."""
+
+    def __enter__(self) -> "ResultSink":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+class JsonlResultSink(ResultSink):
+    """Appends each result as one :meth:`AdapterStepResult.to_dict` JSON line.
+
+    Lines are flushed as they are written, so a crashed run still leaves a
+    readable file; :func:`read_results` loads it back.
+    """
+
+    def __init__(self, path: Union[str, Path], *, append: bool = True) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.written = 0
+        self._file = self.path.open("a" if append else "w", encoding="utf-8")
+
+    def write(self, result: AdapterStepResult) -> None:
+        self._file.write(json.dumps(result.to_dict(), ensure_ascii=False, default=repr) + "\n")
+        self._file.flush()
+        self.written += 1
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+
+class CallbackResultSink(ResultSink):
+    """Hands each result to ``callback``, e.g. to update metrics or a progress bar."""
+
+    def __init__(self, callback: Callable[[AdapterStepResult], None]) -> None:
+        self.callback = callback
+
+    def write(self, result: AdapterStepResult) -> None:
+        self.callback(result)
+
+
+def read_results(
+    path: Union[str, Path], *, sample_type: Type[Sample] = Sample
+) -> Iterator[AdapterStepResult]:
+    """Lazily load the results written by a :class:`JsonlResultSink`."""
+    with Path(path).open("r", encoding="utf-8") as handle:
+        for line in handle:
+            if line.strip():
+                yield AdapterStepResult.from_dict(json.loads(line), sample_type=sample_type)
@@ -0,0 +1,324 @@
+"""Pluggable storage engines backing the ACE playbook."""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import astuple
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Union
+
+if TYPE_CHECKING:  # pragma: no cover - for type hints only
+    from .playbook import Bullet
+
+
+class PlaybookStorage(ABC):
+    """Persistence contract used by :class:`~opence.methods.ace.playbook.Playbook`.
+
+    Bullets keep their insertion order, both globally and within a section.
+    ``put`` on an existing id overwrites the bullet in place.
+
+    ``durable`` storages outlive the process. Their :meth:`begin` /
+    :meth:`commit` / :meth:`rollback` open a transaction spanning any number
+    of later calls (nested :meth:`transaction` blocks join it), which
+    checkpointed adapter runs use to commit only at checkpoints.
+    """
+
+    durable = False
+
+    @abstractmethod
+    def get(self, bullet_id: str) -> Optional["Bullet"]:
+        """Return the bullet with ``bullet_id`` or ``None``."""
+
+    @abstractmethod
+    def put(self, bullet: "Bullet") -> None:
+        """Insert a new bullet or overwrite an existing one."""
+
+    @abstractmethod
+    def delete(self, bullet_id: str) -> Optional["Bullet"]:
+        """Remove and return the bullet with ``bullet_id`` if present."""
+
+    @abstractmethod
+    def iter_bullets(self) -> Iterator["Bullet"]:
+        """Yield every bullet in insertion order."""
+
+    @abstractmethod
+    def section_bullets(self, section: str) -> List["Bullet"]:
+        """Return the bullets of ``section`` in insertion order."""
+
+    @abstractmethod
+    def section_names(self) -> List[str]:
+        """Return the names of all non-empty sections."""
+
+    @abstractmethod
+    def count(self) -> int:
+        """Return the number of stored bullets."""
+
+    @abstractmethod
+    def tag_totals(self) -> Dict[str, int]:
+        """Return the helpful/harmful/neutral counters summed over all bullets."""
+
+    @abstractmethod
+    def get_meta(self, key: str) -> Optional[str]:
+        """Return a stored playbook-level value."""
+
+    @abstractmethod
+    def set_meta(self, key: str, value: str) -> None:
+        """Store a playbook-level value (e.g. the id counter)."""
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Group several mutations into one atomic unit where supported."""
+        yield
+
+    def begin(self) -> None:
+        """Open a transaction that later mutations join; no-op by default."""
+
+    def commit(self) -> None:
+        """Commit the transaction opened by :meth:`begin`."""
+
+    def rollback(self) -> None:
+        """Discard the transaction opened by :meth:`begin`."""
+
+    def close(self) -> None:
+        """Release any underlying resources."""
+
+
+class InMemoryStorage(PlaybookStorage):
+    """Default storage keeping every bullet in process memory."""
+
+    def __init__(self) -> None:
+        self._bullets: Dict[str, "Bullet"] = {}
+        # Dicts double as ordered sets so removals stay O(1).
+        self._sections: Dict[str, Dict[str, None]] = {}
+        self._meta: Dict[str, str] = {}
+
+    def get(self, bullet_id: str) -> Optional["Bullet"]:
+        return self._bullets.get(bullet_id)
+
+    def put(self, bullet: "Bullet") -> None:
+        previous = self._bullets.get(bullet.id)
+        if previous is not None and previous.section != bullet.section:
+            self._discard_from_section(previous.section, bullet.id)
+        self._bullets[bullet.id] = bullet
+        self._sections.setdefault(bullet.section, {})[bullet.id] = None
+
+    def delete(self, bullet_id: str) -> Optional["Bullet"]:
+        bullet = self._bullets.pop(bullet_id, None)
+        if bullet is not None:
+            self._discard_from_section(bullet.section, bullet_id)
+        return bullet
+
+    def iter_bullets(self) -> Iterator["Bullet"]:
+        return iter(list(self._bullets.values()))
+
+    def section_bullets(self, section: str) -> List["Bullet"]:
+        return [self._bullets[bullet_id] for bullet_id in self._sections.get(section, ())]
+
+    def section_names(self) -> List[str]:
+        return list(self._sections)
+
+    def count(self) -> int:
+        return len(self._bullets)
+
+    def tag_totals(self) -> Dict[str, int]:
+        return {
+            "helpful": sum(b.helpful for b in self._bullets.values()),
+            "harmful": sum(b.harmful for b in self._bullets.values()),
+            "neutral": sum(b.neutral for b in self._bullets.values()),
+        }
+
+    def get_meta(self, key: str) -> Optional[str]:
+        return self._meta.get(key)
+
+    def set_meta(self, key: str, value: str) -> None:
+        self._meta[key] = value
+
+    def _discard_from_section(self, section: str, bullet_id: str) -> None:
+        members = self._sections.get(section)
+        if members is None:
+            return
+        members.pop(bullet_id, None)
+        if not members:
+            del self._sections[section]
+
+
+class SQLiteStorage(PlaybookStorage):
+    """SQLite-backed storage for playbooks that do not fit in memory.
+
+    Bullets live in an indexed table (unique ``id``, ``(section, seq)``) and
+    are materialised into :class:`Bullet` objects only when read, so opening
+    a multi-million-bullet playbook does not load it. Outside of
+    :meth:`transaction` every mutation commits on its own; ``Playbook``
+    wraps ``apply_delta`` in a transaction so a delta is written in one
+    batch. :meth:`iter_bullets` reads ``batch_size`` rows at a time.
+    """
+
+    durable = True
+
+    _COLUMNS = (
+        "id",
+        "section",
+        "content",
+        "helpful",
+        "harmful",
+        "neutral",
+        "created_at",
+        "updated_at",
+    )
+
+    def __init__(
+        self, path: Union[str, Path], *, synchronous: str = "NORMAL", batch_size: int = 1000
+    ) -> None:
+        self.path = str(path)
+        self.batch_size = batch_size
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._conn = sqlite3.connect(
+            self.path, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"PRAGMA synchronous={synchronous}")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS bullets (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                id TEXT NOT NULL UNIQUE,
+                section TEXT NOT NULL,
+                content TEXT NOT NULL,
+                helpful INTEGER NOT NULL DEFAULT 0,
+                harmful INTEGER NOT NULL DEFAULT 0,
+                neutral INTEGER NOT NULL DEFAULT 0,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_bullets_section ON bullets(section, seq);
+            CREATE TABLE IF NOT EXISTS meta (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+            """
+        )
+        self._select = f"SELECT {', '.join(self._COLUMNS)} FROM bullets"
+        updates = ", ".join(f"{column} = excluded.{column}" for column in self._COLUMNS[1:])
+        self._upsert = (
+            f"INSERT INTO bullets ({', '.join(self._COLUMNS)}) "
+            f"VALUES ({', '.join('?' for _ in self._COLUMNS)}) "
+            f"ON CONFLICT(id) DO UPDATE SET {updates}"
+        )
+
+    def get(self, bullet_id: str) -> Optional["Bullet"]:
+        with self._lock:
+            row = self._conn.execute(
+                f"{self._select} WHERE id = ?", (bullet_id,)
+            ).fetchone()
+        return self._to_bullet(row) if row else None
+
+    def put(self, bullet: "Bullet") -> None:
+        # Bullet's dataclass field order matches _COLUMNS.
+        with self._lock:
+            self._conn.execute(self._upsert, astuple(bullet))
+
+    def delete(self, bullet_id: str) -> Optional["Bullet"]:
+        with self._lock, self.transaction():
+            bullet = self.get(bullet_id)
+            if bullet is not None:
+                self._conn.execute("DELETE FROM bullets WHERE id = ?", (bullet_id,))
+        return bullet
+
+    def iter_bullets(self) -> Iterator["Bullet"]:
+        # Page by seq so only one batch is in memory and the lock is free
+        # between batches (other threads share this connection).
+        last_seq = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT seq, {', '.join(self._COLUMNS)} FROM bullets "
+                    "WHERE seq > ? ORDER BY seq LIMIT ?",
+                    (last_seq, self.batch_size),
+                ).fetchall()
+            for row in rows:
+                yield self._to_bullet(row[1:])
+            if len(rows) < self.batch_size:
+                return
+            last_seq = rows[-1][0]
+
+    def section_bullets(self, section: str) -> List["Bullet"]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"{self._select} WHERE section = ? ORDER BY seq", (section,)
+            ).fetchall()
+        return [self._to_bullet(row) for row in rows]
+
+    def section_names(self) -> List[str]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT section FROM bullets GROUP BY section ORDER BY MIN(seq)"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def count(self) -> int:
+        with self._lock:
+            return int(self._conn.execute("SELECT COUNT(*) FROM bullets").fetchone()[0])
+
+    def tag_totals(self) -> Dict[str, int]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COALESCE(SUM(helpful), 0), COALESCE(SUM(harmful), 0), "
+                "COALESCE(SUM(neutral), 0) FROM bullets"
+            ).fetchone()
+        return {"helpful": int(row[0]), "harmful": int(row[1]), "neutral": int(row[2])}
+
+    def get_meta(self, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO meta (key, value) VALUES (?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+                (key, value),
+            )
+
+    @contextmanager
+    def transaction(self) -> Iterator[None]:
+        with self._lock:
+            self.begin()
+            try:
+                yield
+            except BaseException:
+                self.rollback()
+                raise
+            self.commit()
+
+    def begin(self) -> None:
+        with self._lock:
+            if self._depth == 0:
+                self._conn.execute("BEGIN")
+            self._depth += 1
+
+    def commit(self) -> None:
+        with self._lock:
+            self._depth -= 1
+            if self._depth == 0:
+                self._conn.execute("COMMIT")
+
+    def rollback(self) -> None:
+        with self._lock:
+            self._depth -= 1
+            if self._depth == 0:
+                self._conn.execute("ROLLBACK")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _to_bullet(row: tuple) -> "Bullet":
+        from .playbook import Bullet
+
+        return Bullet(*row)
@@ -3,9 +3,14 @@
 from .clients import (
     DummyLLMClient,
     LLMClient,
+    LLMResponse,
+    LLMUsage,
     TransformersLLMClient,
     DeepseekLLMClient,
 )
+from .balancer import BalancedLLMClient
+from .cache import CacheStats, CachingLLMClient, ResponseCache
+from .cassette import CassetteMiss, RecordingLLMClient, ReplayLLMClient
 from .providers import (
     BaseModelProvider,
     OpenAIModelProvider,
@@ -17,9 +22,18 @@ from .rwkv_client import RWKVLLMClient
 
 __all__ = [
     "LLMClient",
+    "LLMResponse",
+    "LLMUsage",
     "DummyLLMClient",
     "TransformersLLMClient",
     "DeepseekLLMClient",
+    "BalancedLLMClient",
+    "CachingLLMClient",
+    "ResponseCache",
+    "CacheStats",
+    "RecordingLLMClient",
+    "ReplayLLMClient",
+    "CassetteMiss",
     "RWKVLLMClient",
     "BaseModelProvider",
     "OpenAIModelProvider",
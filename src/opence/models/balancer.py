@@ -0,0 +1,385 @@
+"""Spread completions over several equivalent LLM endpoints."""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .clients import LLMClient, LLMResponse
+
+POLICIES = ("least_outstanding", "ewma")
+
+
+@dataclass
+class EndpointState:
+    """Load, latency and circuit-breaker bookkeeping for one child client."""
+
+    client: LLMClient
+    outstanding: int = 0
+    ewma_latency: Optional[float] = None
+    consecutive_failures: int = 0
+    open_until: float = 0.0
+    requests: int = 0
+    failures: int = 0
+    hedges: int = 0
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=256))
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+class BalancedLLMClient(LLMClient):
+    """Routes each call to one of several interchangeable child clients.
+
+    ``policy="least_outstanding"`` picks the endpoint with the fewest
+    in-flight calls; ``policy="ewma"`` picks the lowest exponentially
+    weighted latency scaled by its in-flight count (unmeasured endpoints
+    are tried first). Ties go round-robin.
+
+    A failing call is retried on the next endpoint. After
+    ``failure_threshold`` consecutive failures an endpoint's circuit opens
+    for ``cooldown`` seconds; afterwards one call is let through (after the
+    optional ``health_check(client)`` probe) and success closes it again.
+
+    With ``hedge=True``, once ``hedge_min_samples`` latencies are known a
+    backup call goes to a second endpoint when the first has not answered
+    within the pool's ``hedge_quantile`` latency; whichever answers first
+    wins. Hedging trades extra load for lower tail latency.
+    """
+
+    def __init__(
+        self,
+        clients: Sequence[LLMClient],
+        *,
+        policy: str = "least_outstanding",
+        ewma_alpha: float = 0.3,
+        failure_threshold: int = 3,
+        cooldown: float = 30.0,
+        health_check: Optional[Callable[[LLMClient], bool]] = None,
+        hedge: bool = False,
+        hedge_quantile: float = 0.95,
+        hedge_min_samples: int = 20,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if not clients:
+            raise ValueError("BalancedLLMClient needs at least one client.")
+        if policy not in POLICIES:
+            raise ValueError(f"policy must be one of {POLICIES}.")
+        super().__init__(model=clients[0].model)
+        self.endpoints = [EndpointState(client) for client in clients]
+        self.policy = policy
+        self.ewma_alpha = ewma_alpha
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.health_check = health_check
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.hedge_min_samples = hedge_min_samples
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._turn = 0
+        self._pool_latencies: Deque[float] = deque(maxlen=1024)
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    # ------------------------------------------------------------------ #
+    # Public API
+    # ------------------------------------------------------------------ #
+    def complete(self, prompt: str, **kwargs: Any) -> LLMResponse:
+        return self._with_failover(lambda index: self._complete_on(index, prompt, kwargs))
+
+    async def acomplete(self, prompt: str, **kwargs: Any) -> LLMResponse:
+        tried: List[int] = []
+        last_error: Optional[Exception] = None
+        failovers = 0
+        for _ in self.endpoints:
+            index = self._acquire(exclude=tried)
+            if index is None:
+                break
+            tried.append(index)
+            try:
+                response = await self._acall_hedged(index, prompt, kwargs, tried)
+            except Exception as error:
+                last_error = error
+                failovers += 1
+                continue
+            return self._count_failovers(response, failovers)
+        raise self._exhausted(last_error)
+
+    def stream(self, prompt: str, **kwargs: Any) -> Iterator[str]:
+        """Stream from one endpoint; failover happens only before the first chunk."""
+        tried: List[int] = []
+        last_error: Optional[Exception] = None
+        for _ in self.endpoints:
+            index = self._acquire(exclude=tried)
+            if index is None:
+                break
+            tried.append(index)
+            start = self._clock()
+            chunks = self.endpoints[index].client.stream(prompt, **kwargs)
+            try:
+                first = next(chunks, None)
+            except Exception as error:
+                self._release(index, start, error)
+                last_error = error
+                continue
+            failure: Optional[Exception] = None
+            try:
+                if first is not None:
+                    yield first
+                yield from chunks
+            except Exception as error:
+                failure = error
+                raise
+            finally:
+                self._release(index, start, failure)
+            return
+        raise self._exhausted(last_error)
+
+    def postprocess_text(self, text: str) -> str:
+        # Endpoints are interchangeable, so any of them post-processes alike.
+        return self.endpoints[0].client.postprocess_text(text)
+
+    def hedge_delay(self) -> Optional[float]:
+        """Current hedging threshold in seconds, or ``None`` while warming up."""
+        with self._lock:
+            if len(self._pool_latencies) < self.hedge_min_samples:
+                return None
+            ordered = sorted(self._pool_latencies)
+        return ordered[max(0, math.ceil(self.hedge_quantile * len(ordered)) - 1)]
+
+    def describe(self) -> List[Dict[str, Any]]:
+        """Per-endpoint load and health summary."""
+        now = self._clock()
+        with self._lock:
+            return [
+                {
+                    "model": endpoint.client.model,
+                    "outstanding": endpoint.outstanding,
+                    "requests": endpoint.requests,
+                    "failures": endpoint.failures,
+                    "hedges": endpoint.hedges,
+                    "ewma_latency": endpoint.ewma_latency,
+                    "p95_latency": endpoint.quantile(0.95),
+                    "circuit_open": endpoint.open_until > now,
+                }
+                for endpoint in self.endpoints
+            ]
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    # ------------------------------------------------------------------ #
+    # Routing
+    # ------------------------------------------------------------------ #
+    def _acquire(self, exclude: Sequence[int] = ()) -> Optional[int]:
+        """Pick an endpoint and count the call as outstanding on it."""
+        now = self._clock()
+        with self._lock:
+            candidates = [
+                index
+                for index, endpoint in enumerate(self.endpoints)
+                if index not in exclude and endpoint.open_until <= now
+            ]
+            if not candidates:
+                return None
+            count = len(self.endpoints)
+            # Rotate the candidate order so ties are broken round-robin.
+            candidates.sort(key=lambda index: (index - self._turn) % count)
+            self._turn = (self._turn + 1) % count
+            index = min(candidates, key=self._load)
+            endpoint = self.endpoints[index]
+            half_open = endpoint.consecutive_failures >= self.failure_threshold
+            if half_open:
+                # Only one probe at a time through a half-open circuit.
+                endpoint.open_until = now + self.cooldown
+            endpoint.outstanding += 1
+            endpoint.requests += 1
+        if half_open and self.health_check is not None:
+            try:
+                healthy = bool(self.health_check(endpoint.client))
+            except Exception:
+                healthy = False
+            if not healthy:
+                with self._lock:
+                    endpoint.outstanding -= 1
+                    endpoint.failures += 1
+                return self._acquire(exclude=[*exclude, index])
+        return index
+
+    def _load(self, index: int) -> Tuple[float, ...]:
+        endpoint = self.endpoints[index]
+        if self.policy == "ewma":
+            if endpoint.ewma_latency is None:
+                return (0.0, endpoint.outstanding)
+            return (endpoint.ewma_latency * (endpoint.outstanding + 1), endpoint.outstanding)
+        return (endpoint.outstanding,)
+
+    def _release(
+        self, index: int, start: float, error: Optional[Exception], *, measured: bool = True
+    ) -> None:
+        latency = self._clock() - start
+        with self._lock:
+            endpoint = self.endpoints[index]
+            endpoint.outstanding -= 1
+            if not measured:  # a cancelled hedge says nothing about the endpoint
+                return
+            if error is None:
+                endpoint.consecutive_failures = 0
+                endpoint.open_until = 0.0
+                endpoint.latencies.append(latency)
+                self._pool_latencies.append(latency)
+                if endpoint.ewma_latency is None:
+                    endpoint.ewma_latency = latency
+                else:
+                    endpoint.ewma_latency += self.ewma_alpha * (latency - endpoint.ewma_latency)
+                return
+            endpoint.failures += 1
+            endpoint.consecutive_failures += 1
+            if endpoint.consecutive_failures >= self.failure_threshold:
+                endpoint.open_until = self._clock() + self.cooldown
+
+    def _exhausted(self, last_error: Optional[Exception]) -> Exception:
+        if last_error is not None:
+            return last_error
+        return RuntimeError("All endpoints of BalancedLLMClient are unavailable.")
+
+    def _annotate(self, response: LLMResponse, index: int, hedged: bool) -> LLMResponse:
+        raw = dict(response.raw or {})
+        raw["balancer"] = {"endpoint": index, "hedged": hedged}
+        return LLMResponse(text=response.text, raw=raw, usage=response.usage)
+
+    @staticmethod
+    def _count_failovers(response: LLMResponse, failovers: int) -> LLMResponse:
+        if failovers and response.usage is not None:
+            response.usage = replace(response.usage, retries=response.usage.retries + failovers)
+        return response
+
+    # ------------------------------------------------------------------ #
+    # Sync calls
+    # ------------------------------------------------------------------ #
+    def _with_failover(self, call: Callable[[int], LLMResponse]) -> LLMResponse:
+        tried: List[int] = []
+        last_error: Optional[Exception] = None
+        failovers = 0
+        for _ in self.endpoints:
+            index = self._acquire(exclude=tried)
+            if index is None:
+                break
+            tried.append(index)
+            try:
+                response = self._call_hedged(index, call, tried)
+            except Exception as error:
+                last_error = error
+                failovers += 1
+                continue
+            return self._count_failovers(response, failovers)
+        raise self._exhausted(last_error)
+
+    def _complete_on(self, index: int, prompt: str, kwargs: Dict[str, Any]) -> LLMResponse:
+        start = self._clock()
+        try:
+            response = self.endpoints[index].client.complete(prompt, **kwargs)
+        except Exception as error:
+            self._release(index, start, error)
+            raise
+        self._release(index, start, None)
+        return response
+
+    def _call_hedged(
+        self, index: int, call: Callable[[int], LLMResponse], tried: List[int]
+    ) -> LLMResponse:
+        delay = self.hedge_delay() if self.hedge and len(self.endpoints) > 1 else None
+        if delay is None:
+            return self._annotate(call(index), index, False)
+        executor = self._ensure_executor()
+        primary = executor.submit(call, index)
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return self._annotate(primary.result(), index, False)
+        backup_index = self._acquire(exclude=tried)
+        if backup_index is None:
+            return self._annotate(primary.result(), index, False)
+        tried.append(backup_index)
+        with self._lock:
+            self.endpoints[backup_index].hedges += 1
+        backup = executor.submit(call, backup_index)
+        owners: Dict[Future, int] = {primary: index, backup: backup_index}
+        pending = set(owners)
+        last_error: Optional[Exception] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    response = future.result()
+                except Exception as error:
+                    last_error = error
+                    continue
+                # The slower call keeps running; its result is discarded.
+                return self._annotate(response, owners[future], owners[future] != index)
+        raise last_error  # type: ignore[misc]
+
+    def _ensure_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=4 * len(self.endpoints), thread_name_prefix="llm-hedge"
+                )
+            return self._executor
+
+    # ------------------------------------------------------------------ #
+    # Async calls
+    # ------------------------------------------------------------------ #
+    async def _acomplete_on(self, index: int, prompt: str, kwargs: Dict[str, Any]) -> LLMResponse:
+        start = self._clock()
+        try:
+            response = await self.endpoints[index].client.acomplete(prompt, **kwargs)
+        except asyncio.CancelledError:
+            self._release(index, start, None, measured=False)
+            raise
+        except Exception as error:
+            self._release(index, start, error)
+            raise
+        self._release(index, start, None)
+        return response
+
+    async def _acall_hedged(
+        self, index: int, prompt: str, kwargs: Dict[str, Any], tried: List[int]
+    ) -> LLMResponse:
+        delay = self.hedge_delay() if self.hedge and len(self.endpoints) > 1 else None
+        if delay is None:
+            return self._annotate(await self._acomplete_on(index, prompt, kwargs), index, False)
+        primary = asyncio.ensure_future(self._acomplete_on(index, prompt, kwargs))
+        done, _ = await asyncio.wait({primary}, timeout=delay)
+        if done:
+            return self._annotate(primary.result(), index, False)
+        backup_index = self._acquire(exclude=tried)
+        if backup_index is None:
+            return self._annotate(await primary, index, False)
+        tried.append(backup_index)
+        with self._lock:
+            self.endpoints[backup_index].hedges += 1
+        backup = asyncio.ensure_future(self._acomplete_on(backup_index, prompt, kwargs))
+        owners = {primary: index, backup: backup_index}
+        pending = set(owners)
+        last_error: Optional[Exception] = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is not None:
+                    last_error = task.exception()
+                    continue
+                for loser in pending:
+                    loser.cancel()
+                return self._annotate(task.result(), owners[task], owners[task] != index)
+        raise last_error  # type: ignore[misc]
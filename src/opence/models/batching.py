@@ -0,0 +1,146 @@
+"""Dynamic micro-batching of concurrent completion requests."""
+
+from __future__ import annotations
+
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .clients import LLMResponse
+
+BatchHandler = Callable[[List[str], Dict[str, Any]], List[LLMResponse]]
+
+_STOP = object()
+
+
+@dataclass
+class BatchStats:
+    batches: int = 0
+    requests: int = 0
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.requests / self.batches if self.batches else 0.0
+
+
+class MicroBatcher:
+    """Groups concurrent requests into batches for one ``handler`` call.
+
+    A background thread waits for the first request, then collects further
+    requests for at most ``window`` seconds (or until ``max_batch_size`` are
+    pending). Requests are grouped by identical generation kwargs, each group
+    is passed to ``handler(prompts, kwargs)`` as one batch, and the results
+    are routed back to the callers' futures in order. After :meth:`close`,
+    ``submit`` raises ``RuntimeError``.
+    """
+
+    def __init__(
+        self,
+        handler: BatchHandler,
+        *,
+        max_batch_size: int = 8,
+        window: float = 0.01,
+        name: str = "llm-batcher",
+    ) -> None:
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1.")
+        self._handler = handler
+        self.max_batch_size = max_batch_size
+        self.window = window
+        self.stats = BatchStats()
+        self._name = name
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def submit(self, prompt: str, kwargs: Optional[Dict[str, Any]] = None) -> "Future[LLMResponse]":
+        future: "Future[LLMResponse]" = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("MicroBatcher is closed.")
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name=self._name, daemon=True)
+                self._thread.start()
+            # Enqueue under the lock so no request can land behind _STOP.
+            self._queue.put((prompt, dict(kwargs or {}), future))
+        return future
+
+    def close(self) -> None:
+        """Finish pending requests and stop the worker thread."""
+        with self._lock:
+            self._closed = True
+            thread, self._thread = self._thread, None
+            if thread is not None:
+                self._queue.put(_STOP)
+        if thread is not None:
+            thread.join()
+
+    def _loop(self) -> None:
+        try:
+            self._serve()
+        finally:
+            self._drain()
+
+    def _serve(self) -> None:
+        stopping = False
+        while not stopping:
+            first = self._queue.get()
+            if first is _STOP:
+                return
+            pending = [first]
+            deadline = time.monotonic() + self.window
+            while len(pending) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                pending.append(item)
+            self._dispatch(pending)
+
+    def _drain(self) -> None:
+        """Serve anything still queued once the loop exits, so no future is left pending."""
+        leftover = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                leftover.append(item)
+        for start in range(0, len(leftover), self.max_batch_size):
+            self._dispatch(leftover[start : start + self.max_batch_size])
+
+    def _dispatch(self, pending: List[Tuple[str, Dict[str, Any], "Future[LLMResponse]"]]) -> None:
+        groups: Dict[str, List[Tuple[str, Dict[str, Any], "Future[LLMResponse]"]]] = {}
+        for request in pending:
+            key = json.dumps(request[1], sort_keys=True, default=repr)
+            groups.setdefault(key, []).append(request)
+        for group in groups.values():
+            # Cancelled callers simply drop out of the batch.
+            group = [request for request in group if request[2].set_running_or_notify_cancel()]
+            if not group:
+                continue
+            futures = [future for _, _, future in group]
+            try:
+                responses = self._handler([prompt for prompt, _, _ in group], group[0][1])
+                if len(responses) != len(group):
+                    raise RuntimeError("Batch handler returned a wrong number of responses.")
+            except BaseException as exc:
+                for future in futures:
+                    future.set_exception(exc)
+                continue
+            self.stats.batches += 1
+            self.stats.requests += len(group)
+            for future, response in zip(futures, responses):
+                future.set_result(response)
@@ -0,0 +1,214 @@
+"""Disk-backed, content-addressed cache for LLM responses."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Union
+
+from .clients import LLMClient, LLMResponse, LLMUsage
+
+
+def cache_key(model: Optional[str], prompt: str, kwargs: Dict[str, Any]) -> str:
+    """Hash of everything that determines a completion: model, prompt and kwargs."""
+    payload = json.dumps(
+        {"model": model, "prompt": prompt, "kwargs": kwargs},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=repr,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class ResponseCache:
+    """SQLite store of LLM responses with size-bounded LRU eviction.
+
+    Entries are keyed by :func:`cache_key`. ``max_bytes`` bounds the summed
+    size of the stored texts and raw payloads; once exceeded, the least
+    recently used entries are evicted.
+    """
+
+    def __init__(self, path: Union[str, Path], *, max_bytes: Optional[int] = 1 << 30) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(
+            str(self.path), isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                text TEXT NOT NULL,
+                raw TEXT,
+                size INTEGER NOT NULL,
+                last_used INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses(last_used);
+            """
+        )
+        total, clock = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0), COALESCE(MAX(last_used), 0) FROM responses"
+        ).fetchone()
+        self._total_bytes = int(total)
+        # Logical clock rather than wall time so LRU order has no ties.
+        self._clock = int(clock)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return int(self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0])
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def get(self, key: str) -> Optional[LLMResponse]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text, raw FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE responses SET last_used = ? WHERE key = ?", (self._tick(), key)
+            )
+        text, raw = row
+        return LLMResponse(text=text, raw=json.loads(raw) if raw is not None else None)
+
+    def put(self, key: str, response: LLMResponse) -> int:
+        """Store ``response`` and return the number of evicted entries."""
+        raw = _encode_raw(response.raw)
+        size = len(response.text.encode("utf-8")) + (len(raw.encode("utf-8")) if raw else 0)
+        with self._lock:
+            previous = self._conn.execute(
+                "SELECT size FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT INTO responses (key, text, raw, size, last_used) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET text = excluded.text, raw = excluded.raw, "
+                "size = excluded.size, last_used = excluded.last_used",
+                (key, response.text, raw, size, self._tick()),
+            )
+            self._total_bytes += size - (previous[0] if previous else 0)
+            return self._evict()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._total_bytes = 0
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def _tick(self) -> int:
+        self._clock += 1
+        return self._clock
+
+    def _evict(self) -> int:
+        if self.max_bytes is None or self._total_bytes <= self.max_bytes:
+            return 0
+        evicted = 0
+        cursor = self._conn.execute("SELECT key, size FROM responses ORDER BY last_used")
+        victims = []
+        excess = self._total_bytes - self.max_bytes
+        for key, size in cursor:
+            if excess <= 0:
+                break
+            victims.append((key,))
+            excess -= size
+            self._total_bytes -= size
+            evicted += 1
+        self._conn.executemany("DELETE FROM responses WHERE key = ?", victims)
+        return evicted
+
+
+def _encode_raw(raw: Optional[Dict[str, Any]]) -> Optional[str]:
+    if raw is None:
+        return None
+    try:
+        return json.dumps(raw, ensure_ascii=False)
+    except (TypeError, ValueError):
+        # Provider objects (e.g. pipeline outputs) are kept only in readable form.
+        return json.dumps(raw, ensure_ascii=False, default=str)
+
+
+class CachingLLMClient(LLMClient):
+    """Wraps any :class:`LLMClient` and replays identical requests from disk.
+
+    ``client`` may be an instance or a zero-argument factory; with a factory
+    (and an explicit ``model`` name) the wrapped client, e.g. a local
+    ``TransformersLLMClient``, is only constructed on the first cache miss,
+    so fully cached runs never load model weights.
+
+    Sampled generations (``temperature > 0``) are cached like greedy ones:
+    a hit replays the first recorded completion.
+    """
+
+    def __init__(
+        self,
+        client: Union[LLMClient, Callable[[], LLMClient]],
+        cache: Union[ResponseCache, str, Path] = ".cache/llm_responses.sqlite",
+        *,
+        model: Optional[str] = None,
+        max_bytes: Optional[int] = 1 << 30,
+    ) -> None:
+        if isinstance(client, LLMClient):
+            self._client: Optional[LLMClient] = client
+            self._factory: Optional[Callable[[], LLMClient]] = None
+            model = model or client.model
+        else:
+            if model is None:
+                raise ValueError("A model name is required when wrapping a client factory.")
+            self._client = None
+            self._factory = client
+        super().__init__(model=model)
+        self.cache = cache if isinstance(cache, ResponseCache) else ResponseCache(
+            cache, max_bytes=max_bytes
+        )
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+
+    @property
+    def client(self) -> LLMClient:
+        with self._lock:
+            if self._client is None:
+                self._client = self._factory()
+            return self._client
+
+    def complete(self, prompt: str, **kwargs: Any) -> LLMResponse:
+        started = time.perf_counter()
+        key = cache_key(self.model, prompt, kwargs)
+        cached = self.cache.get(key)
+        if cached is not None:
+            with self._lock:
+                self.stats.hits += 1
+            # A replayed response costs no tokens.
+            cached.usage = LLMUsage(latency=time.perf_counter() - started)
+            return cached
+        response = self.client.complete(prompt, **kwargs)
+        evicted = self.cache.put(key, response)
+        with self._lock:
+            self.stats.misses += 1
+            self.stats.evictions += evicted
+        return response
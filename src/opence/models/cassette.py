@@ -0,0 +1,196 @@
+"""Record real LLM traffic to a cassette file and replay it without a model."""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from .cache import cache_key
+from .clients import LLMClient, LLMResponse, LLMUsage
+
+
+class CassetteMiss(LookupError):
+    """Raised by :class:`ReplayLLMClient` for a request that was never recorded."""
+
+
+def prompt_key(prompt: str) -> str:
+    return cache_key(None, prompt, {})
+
+
+class RecordingLLMClient(LLMClient):
+    """Wraps a real client and appends every call to a gzip JSONL cassette.
+
+    Each line holds the request hash (prompt and kwargs), the response text,
+    its usage record and the observed latency; prompts themselves are only
+    stored with ``store_prompts=True``. Appending to an existing cassette
+    adds new gzip members, which :class:`ReplayLLMClient` reads as one file.
+    """
+
+    def __init__(
+        self,
+        client: LLMClient,
+        path: Union[str, Path],
+        *,
+        store_prompts: bool = False,
+    ) -> None:
+        super().__init__(model=client.model)
+        self.client = client
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.store_prompts = store_prompts
+        self.recorded = 0
+        self._lock = threading.Lock()
+        self._file = gzip.open(self.path, "at", encoding="utf-8")
+
+    def complete(self, prompt: str, **kwargs: Any) -> LLMResponse:
+        started = time.perf_counter()
+        response = self.client.complete(prompt, **kwargs)
+        self._record(prompt, kwargs, response, time.perf_counter() - started)
+        return response
+
+    async def acomplete(self, prompt: str, **kwargs: Any) -> LLMResponse:
+        started = time.perf_counter()
+        response = await self.client.acomplete(prompt, **kwargs)
+        self._record(prompt, kwargs, response, time.perf_counter() - started)
+        return response
+
+    def stream(self, prompt: str, **kwargs: Any) -> Iterator[str]:
+        started = time.perf_counter()
+        chunks: List[str] = []
+        for chunk in self.client.stream(prompt, **kwargs):
+            chunks.append(chunk)
+            yield chunk
+        # Record what complete() would have returned so replays match either path.
+        text = self.client.postprocess_text("".join(chunks))
+        self._record(prompt, kwargs, LLMResponse(text=text), time.perf_counter() - started)
+
+    def postprocess_text(self, text: str) -> str:
+        return self.client.postprocess_text(text)
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def __enter__(self) -> "RecordingLLMClient":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def _record(
+        self, prompt: str, kwargs: Dict[str, Any], response: LLMResponse, latency: float
+    ) -> None:
+        entry: Dict[str, Any] = {
+            "key": cache_key(None, prompt, kwargs),
+            "prompt_key": prompt_key(prompt),
+            "kwargs": kwargs,
+            "text": response.text,
+            "latency": latency,
+            "usage": response.usage.to_dict() if response.usage is not None else None,
+        }
+        if self.store_prompts:
+            entry["prompt"] = prompt
+        line = json.dumps(entry, ensure_ascii=False, default=repr)
+        with self._lock:
+            self._file.write(line + "\n")
+            # Sync-flush so a crashed run still leaves a readable cassette.
+            self._file.flush()
+            self.recorded += 1
+
+
+class ReplayLLMClient(LLMClient):
+    """Serves responses from a cassette written by :class:`RecordingLLMClient`.
+
+    Requests are matched by the hash of prompt and kwargs, or of the prompt
+    alone with ``match_kwargs=False``. A request recorded several times
+    (e.g. sampled generations) replays its responses in recorded order and
+    then repeats the last one. Unknown requests raise :class:`CassetteMiss`
+    unless a ``fallback`` client is given.
+
+    With ``simulate_latency=True`` each call sleeps for its recorded latency
+    times ``latency_scale``, so concurrency and pipelining behave as against
+    the real model.
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        *,
+        model: Optional[str] = "replay",
+        match_kwargs: bool = True,
+        simulate_latency: bool = False,
+        latency_scale: float = 1.0,
+        fallback: Optional[LLMClient] = None,
+    ) -> None:
+        super().__init__(model=model)
+        self.path = Path(path)
+        self.match_kwargs = match_kwargs
+        self.simulate_latency = simulate_latency
+        self.latency_scale = latency_scale
+        self.fallback = fallback
+        self.hits = 0
+        self.misses = 0
+        self._entries: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._cursors: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        with gzip.open(self.path, "rt", encoding="utf-8") as handle:
+            for line in handle:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._entries[self._entry_key(entry)].append(entry)
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._entries.values())
+
+    def complete(self, prompt: str, **kwargs: Any) -> LLMResponse:
+        entry = self._lookup(prompt, kwargs)
+        if entry is None:
+            return self.fallback.complete(prompt, **kwargs)  # type: ignore[union-attr]
+        response, delay = self._to_response(entry)
+        if delay > 0:
+            time.sleep(delay)
+        return response
+
+    async def acomplete(self, prompt: str, **kwargs: Any) -> LLMResponse:
+        entry = self._lookup(prompt, kwargs)
+        if entry is None:
+            return await self.fallback.acomplete(prompt, **kwargs)  # type: ignore[union-attr]
+        response, delay = self._to_response(entry)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return response
+
+    def _entry_key(self, entry: Dict[str, Any]) -> str:
+        return entry["key"] if self.match_kwargs else entry["prompt_key"]
+
+    def _lookup(self, prompt: str, kwargs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        key = cache_key(None, prompt, kwargs) if self.match_kwargs else prompt_key(prompt)
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                self.misses += 1
+                if self.fallback is None:
+                    raise CassetteMiss(f"No recorded response for request {key[:12]} in {self.path}.")
+                return None
+            self.hits += 1
+            cursor = self._cursors[key]
+            self._cursors[key] = min(cursor + 1, len(entries) - 1)
+            return entries[cursor]
+
+    def _to_response(self, entry: Dict[str, Any]) -> Tuple[LLMResponse, float]:
+        """Build the response and its delay; usage times match the replayed timing."""
+        recorded = entry.get("usage")
+        usage = LLMUsage(**recorded) if recorded else LLMUsage(latency=entry["latency"])
+        scale = self.latency_scale if self.simulate_latency else 0.0
+        usage.latency = entry["latency"] * scale
+        usage.queue_time *= scale
+        if usage.time_to_first_token is not None:
+            usage.time_to_first_token *= scale
+        return LLMResponse(text=entry["text"], usage=usage, raw={"replayed": True}), usage.latency
@@ -2,15 +2,88 @@
 
 from __future__ import annotations
 
+import asyncio
+import copy
 import os
+import threading
+import time
 from abc import ABC, abstractmethod
 import json
 from collections import deque
-from dataclasses import dataclass
-from typing import Any, Deque, Dict, Optional, Union
+from dataclasses import asdict, dataclass
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 from dotenv import load_dotenv
 
+from .json_decoding import JSON_MODES
+from .prefix_cache import PrefixCache
+from .rate_limit import RateLimiter, backoff_delay, estimate_tokens, retry_after_seconds
+
+if TYPE_CHECKING:  # pragma: no cover - for type hints only
+    from .batching import MicroBatcher
+
+
+@dataclass
+class LLMUsage:
+    """Token counts and timings of one LLM call, or the sum of several.
+
+    Times are in seconds. ``queue_time`` is the part of ``latency`` spent
+    waiting before the request was served (rate limiter, concurrency limit,
+    micro-batch window); ``time_to_first_token`` is only known for streamed
+    or locally decoded output. Token counts come from the server when it
+    reports them and are estimated otherwise. Sums add every field,
+    including the times, except ``time_to_first_token``, which keeps the
+    slowest call's value.
+    """
+
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    queue_time: float = 0.0
+    time_to_first_token: Optional[float] = None
+    latency: float = 0.0
+    retries: int = 0
+    calls: int = 1
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def add(self, other: "LLMUsage") -> None:
+        self.prompt_tokens += other.prompt_tokens
+        self.completion_tokens += other.completion_tokens
+        self.queue_time += other.queue_time
+        if other.time_to_first_token is not None:
+            self.time_to_first_token = max(
+                self.time_to_first_token or 0.0, other.time_to_first_token
+            )
+        self.latency += other.latency
+        self.retries += other.retries
+        self.calls += other.calls
+
+    @classmethod
+    def total(cls, usages: "Iterable[Optional[LLMUsage]]") -> "LLMUsage":
+        combined = cls(calls=0)
+        for usage in usages:
+            if usage is not None:
+                combined.add(usage)
+        return combined
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
 
 @dataclass
 class LLMResponse:
@@ -18,6 +91,7 @@ class LLMResponse:
 
     text: str
     raw: Optional[Dict[str, Any]] = None
+    usage: Optional[LLMUsage] = None
 
 
 class LLMClient(ABC):
@@ -30,6 +104,33 @@ class LLMClient(ABC):
     def complete(self, prompt: str, **kwargs: Any) -> LLMResponse:
         """Return the model text for a given prompt."""
 
+    async def acomplete(self, prompt: str, **kwargs: Any) -> LLMResponse:
+        """Awaitable :meth:`complete`.
+
+        The default shim runs the blocking call in a worker thread so local
+        clients can be awaited next to natively async ones; clients with an
+        async transport override it.
+        """
+        return await asyncio.to_thread(self.complete, prompt, **kwargs)
+
+    def stream(self, prompt: str, **kwargs: Any) -> Iterator[str]:
+        """Yield the completion for ``prompt`` as text chunks while it is decoded.
+
+        The chunks concatenate to the raw model text; pass the joined text
+        through :meth:`postprocess_text` to get what :meth:`complete` would
+        have returned. The default yields the whole :meth:`complete` result
+        as a single chunk; streaming transports override it.
+        """
+        yield self.complete(prompt, **kwargs).text
+
+    def postprocess_text(self, text: str) -> str:
+        """Client-specific cleanup :meth:`complete` applies to raw model text.
+
+        Streaming callers apply it to the joined :meth:`stream` chunks. The
+        default returns ``text`` unchanged.
+        """
+        return text
+
 
 class DummyLLMClient(LLMClient):
     """Deterministic LLM stub for testing and dry runs."""
@@ -45,11 +146,36 @@ class DummyLLMClient(LLMClient):
     def complete(self, prompt: str, **kwargs: Any) -> LLMResponse:
         if not self._responses:
             raise RuntimeError("DummyLLMClient ran out of queued responses.")
-        return LLMResponse(text=self._responses.popleft())
+        text = self._responses.popleft()
+        return LLMResponse(
+            text=text,
+            usage=LLMUsage(
+                prompt_tokens=estimate_tokens(prompt), completion_tokens=estimate_tokens(text)
+            ),
+        )
 
 
 class TransformersLLMClient(LLMClient):
-    """LLM client powered by `transformers` pipelines for chat-style models."""
+    """LLM client powered by `transformers` pipelines for chat-style models.
+
+    :meth:`complete_many` runs several prompts as one padded pipeline batch.
+    With ``batch_window`` set, concurrent :meth:`complete` calls (from
+    threads or :meth:`acomplete`) are collected by a background
+    :class:`~opence.models.batching.MicroBatcher` for up to that many seconds
+    (at most ``max_batch_size`` prompts) and share forward passes.
+
+    With ``prefix_cache_size > 0`` unbatched calls bypass the pipeline and
+    call ``model.generate`` directly, reusing the KV cache of the longest
+    token prefix shared with a recent prompt (system prompt, playbook) so
+    only the new suffix is prefilled. Per-call and cumulative hit rates are
+    reported under ``raw["prefix_cache"]``.
+
+    ``json_mode="stop"`` ends each sequence as soon as its top-level JSON
+    object is closed instead of decoding up to ``max_new_tokens``;
+    ``json_mode="constrained"`` additionally masks tokens that would make the
+    output invalid JSON (see :mod:`opence.models.json_decoding`). Either can
+    be overridden per call with a ``json_mode`` kwarg.
+    """
 
     def __init__(
             self,
@@ -63,8 +189,16 @@ class TransformersLLMClient(LLMClient):
             trust_remote_code: bool = True,
             system_prompt: Optional[str] = None,
             generation_kwargs: Optional[Dict[str, Any]] = None,
+            batch_window: Optional[float] = None,
+            max_batch_size: int = 8,
+            prefix_cache_size: int = 0,
+            prefix_cache_min_tokens: int = 16,
+            json_mode: Optional[str] = None,
+            json_top_k: int = 32,
     ) -> None:
         super().__init__(model=model_path)
+        if json_mode is not None and json_mode not in JSON_MODES:
+            raise ValueError(f"json_mode must be one of {JSON_MODES} or None.")
 
         # Import transformers lazily to avoid mandatory dependency for all users.
         from transformers import AutoTokenizer, pipeline  # type: ignore[import-untyped]
@@ -72,6 +206,10 @@ class TransformersLLMClient(LLMClient):
         self._tokenizer = AutoTokenizer.from_pretrained(
             model_path, trust_remote_code=trust_remote_code
         )
+        # Batched decoder-only generation needs a pad token and left padding.
+        if self._tokenizer.pad_token is None:
+            self._tokenizer.pad_token = self._tokenizer.eos_token
+        self._tokenizer.padding_side = "left"
         self._pipeline = pipeline(
             "text-generation",
             model=model_path,
@@ -94,22 +232,225 @@ class TransformersLLMClient(LLMClient):
         }
         if generation_kwargs:
             self._defaults.update(generation_kwargs)
+        self.max_batch_size = max_batch_size
+        self.json_mode = json_mode
+        self.json_top_k = json_top_k
+        self.prefix_cache: Optional[PrefixCache] = None
+        if prefix_cache_size > 0:
+            self.prefix_cache = PrefixCache(
+                prefix_cache_size, min_tokens=prefix_cache_min_tokens
+            )
+        self._batcher: Optional["MicroBatcher"] = None
+        if batch_window is not None:
+            from .batching import MicroBatcher
+
+            self._batcher = MicroBatcher(
+                self._run_batch, max_batch_size=max_batch_size, window=batch_window
+            )
 
     def complete(self, prompt: str, **kwargs: Any) -> LLMResponse:
-        call_kwargs = dict(self._defaults)
         kwargs = dict(kwargs)
         kwargs.pop("refinement_round", None)
+        if self._batcher is None:
+            return self._run_batch([prompt], kwargs)[0]
+        started = time.perf_counter()
+        response = self._batcher.submit(prompt, kwargs).result()
+        if response.usage is not None:
+            # Time not spent in the batch itself was spent waiting for it.
+            elapsed = time.perf_counter() - started
+            response.usage.queue_time = max(0.0, elapsed - response.usage.latency)
+            response.usage.latency = elapsed
+        return response
+
+    def complete_many(self, prompts: Sequence[str], **kwargs: Any) -> List[LLMResponse]:
+        """Complete ``prompts`` in pipeline batches of up to ``max_batch_size``."""
+        kwargs = dict(kwargs)
+        kwargs.pop("refinement_round", None)
+        responses: List[LLMResponse] = []
+        for start in range(0, len(prompts), self.max_batch_size):
+            responses.extend(
+                self._run_batch(list(prompts[start : start + self.max_batch_size]), kwargs)
+            )
+        return responses
+
+    def stream(self, prompt: str, **kwargs: Any) -> Iterator[str]:
+        """Stream decoded text via ``TextIteratorStreamer``.
+
+        Runs unbatched and without the prefix cache; generation happens in a
+        worker thread while this generator yields its chunks. If the consumer
+        stops early, generation is cancelled at the next decoding step.
+        """
+        from transformers import (  # type: ignore[import-untyped]
+            StoppingCriteriaList,
+            TextIteratorStreamer,
+        )
+
+        call_kwargs = dict(self._defaults)
+        call_kwargs.update(kwargs)
+        call_kwargs.pop("refinement_round", None)
+        call_kwargs.update(self._json_decoding_kwargs(call_kwargs.pop("json_mode", self.json_mode)))
+        cancelled = threading.Event()
+        stopping = StoppingCriteriaList(call_kwargs.pop("stopping_criteria", None) or [])
+        stopping.append(_CancelledCriteria(cancelled))
+        call_kwargs["stopping_criteria"] = stopping
+        streamer = TextIteratorStreamer(
+            self._tokenizer, skip_prompt=True, skip_special_tokens=True
+        )
+        conversation = [
+            {"role": "system", "content": self._system_prompt},
+            {"role": "user", "content": prompt},
+        ]
+        errors: List[Exception] = []
+
+        def produce() -> None:
+            try:
+                self._pipeline(conversation, streamer=streamer, **call_kwargs)
+            except Exception as exc:  # re-raised in the consuming thread
+                errors.append(exc)
+                streamer.end()
+
+        worker = threading.Thread(target=produce, name="transformers-stream", daemon=True)
+        worker.start()
+        try:
+            for chunk in streamer:
+                if chunk:
+                    yield chunk
+        finally:
+            cancelled.set()
+            worker.join()
+        if errors:
+            raise errors[0]
+
+    def close(self) -> None:
+        """Stop the background micro-batcher, if any."""
+        if self._batcher is not None:
+            self._batcher.close()
+
+    def _run_batch(self, prompts: List[str], kwargs: Dict[str, Any]) -> List[LLMResponse]:
+        started = time.perf_counter()
+        call_kwargs = dict(self._defaults)
         call_kwargs.update(kwargs)
+        call_kwargs.update(self._json_decoding_kwargs(call_kwargs.pop("json_mode", self.json_mode)))
+
+        if len(prompts) == 1 and self.prefix_cache is not None:
+            return [self._complete_with_prefix_cache(prompts[0], call_kwargs)]
 
         # Build chat-formatted messages to leverage harmony template.
+        conversations = [
+            [
+                {"role": "system", "content": self._system_prompt},
+                {"role": "user", "content": prompt},
+            ]
+            for prompt in prompts
+        ]
+
+        if len(conversations) == 1:
+            batch_outputs = [self._pipeline(conversations[0], **call_kwargs)]
+        else:
+            batch_outputs = self._pipeline(
+                conversations, batch_size=len(conversations), **call_kwargs
+            )
+        latency = time.perf_counter() - started
+        responses = []
+        for prompt, outputs in zip(prompts, batch_outputs):
+            text = self._extract_text(outputs)
+            responses.append(
+                LLMResponse(
+                    text=self.postprocess_text(text),
+                    raw={"outputs": outputs},
+                    usage=LLMUsage(
+                        prompt_tokens=len(self._encode_chat(prompt)),
+                        completion_tokens=len(
+                            self._tokenizer(text, add_special_tokens=False)["input_ids"]
+                        ),
+                        latency=latency,
+                    ),
+                )
+            )
+        return responses
+
+    def _json_decoding_kwargs(self, json_mode: Optional[str]) -> Dict[str, Any]:
+        """Fresh per-call stopping criteria / logits processors for ``json_mode``."""
+        if json_mode is None:
+            return {}
+        if json_mode not in JSON_MODES:
+            raise ValueError(f"json_mode must be one of {JSON_MODES} or None.")
+        from transformers import LogitsProcessorList, StoppingCriteriaList  # type: ignore[import-untyped]
+
+        from .json_decoding import JsonLogitsProcessor, JsonStoppingCriteria
+
+        extra: Dict[str, Any] = {
+            "stopping_criteria": StoppingCriteriaList([JsonStoppingCriteria(self._tokenizer)])
+        }
+        if json_mode == "constrained":
+            extra["logits_processor"] = LogitsProcessorList(
+                [JsonLogitsProcessor(self._tokenizer, top_k=self.json_top_k)]
+            )
+        return extra
+
+    def _encode_chat(self, prompt: str) -> List[int]:
         messages = [
             {"role": "system", "content": self._system_prompt},
             {"role": "user", "content": prompt},
         ]
-
-        outputs = self._pipeline(messages, **call_kwargs)
-        text = self._postprocess_text(self._extract_text(outputs))
-        return LLMResponse(text=text, raw={"outputs": outputs})
+        if getattr(self._tokenizer, "chat_template", None):
+            encoded = self._tokenizer.apply_chat_template(
+                messages, add_generation_prompt=True, tokenize=True
+            )
+            if isinstance(encoded, dict) or hasattr(encoded, "input_ids"):
+                encoded = encoded["input_ids"]
+            return list(encoded)
+        # Models without a chat template (e.g. tiny test models) get plain text.
+        return self._tokenizer(f"{self._system_prompt}\n\n{prompt}\n")["input_ids"]
+
+    def _complete_with_prefix_cache(
+        self, prompt: str, call_kwargs: Dict[str, Any]
+    ) -> LLMResponse:
+        import torch  # type: ignore[import-untyped]
+
+        started = time.perf_counter()
+        model = self._pipeline.model
+        token_ids = self._encode_chat(prompt)
+        reused, cached = self.prefix_cache.lookup(token_ids)
+        past_key_values = None
+        if cached is not None:
+            # generate() extends the cache in place, so work on a cropped copy.
+            past_key_values = copy.deepcopy(cached)
+            past_key_values.crop(reused)
+
+        generate_kwargs = dict(call_kwargs)
+        generate_kwargs.pop("return_full_text", None)
+        if not generate_kwargs.get("do_sample"):
+            generate_kwargs.pop("temperature", None)
+            generate_kwargs.pop("top_p", None)
+        input_ids = torch.tensor([token_ids], device=model.device)
+        with torch.no_grad():
+            output = model.generate(
+                input_ids=input_ids,
+                attention_mask=torch.ones_like(input_ids),
+                past_key_values=past_key_values,
+                pad_token_id=self._tokenizer.pad_token_id,
+                use_cache=True,
+                return_dict_in_generate=True,
+                **generate_kwargs,
+            )
+
+        cache = getattr(output, "past_key_values", None)
+        if cache is not None and hasattr(cache, "crop"):
+            # Keep only the prompt's KV so later prompts can extend it.
+            cache.crop(len(token_ids))
+            self.prefix_cache.insert(token_ids, cache)
+        generated = output.sequences[0, len(token_ids):]
+        text = self._tokenizer.decode(generated, skip_special_tokens=True)
+        return LLMResponse(
+            text=self.postprocess_text(text),
+            raw={"prefix_cache": self.prefix_cache.describe(reused, len(token_ids))},
+            usage=LLMUsage(
+                prompt_tokens=len(token_ids),
+                completion_tokens=int(generated.shape[-1]),
+                latency=time.perf_counter() - started,
+            ),
+        )
 
     def _extract_text(self, outputs: Any) -> str:
         """Normalize pipeline outputs into a single string response."""
@@ -143,7 +484,7 @@ class TransformersLLMClient(LLMClient):
         # Ultimate fallback: string representation.
         return str(candidate).strip()
 
-    def _postprocess_text(self, text: str) -> str:
+    def postprocess_text(self, text: str) -> str:
         """Trim analyzer prefixes and isolate JSON payloads when present."""
         trimmed = text.strip()
         if not trimmed:
@@ -171,17 +512,66 @@ class TransformersLLMClient(LLMClient):
 
         return trimmed.replace("\r", " ").replace("\n", " ")
 
+
+class _CancelledCriteria:
+    """Stops generation once ``event`` is set (the stream consumer went away)."""
+
+    def __init__(self, event: threading.Event) -> None:
+        self.event = event
+
+    def __call__(self, input_ids: Any, scores: Any, **kwargs: Any) -> Any:
+        import torch  # type: ignore[import-untyped]
+
+        return torch.full(
+            (input_ids.shape[0],), self.event.is_set(), dtype=torch.bool, device=input_ids.device
+        )
+
+
 # deepseek兼容openai接口client
 class DeepseekLLMClient(LLMClient):
+    """Client for OpenAI-compatible chat completion endpoints.
+
+    Generation kwargs (``temperature``, ``max_tokens``/``max_new_tokens``,
+    ``top_p``, ``stop``, ...) are forwarded to the API. Requests pass through
+    a shared :class:`RateLimiter` (``requests_per_minute`` /
+    ``tokens_per_minute``), and 429, 5xx and connection failures are retried
+    up to ``max_retries`` times with jittered exponential backoff that
+    honours ``Retry-After``; a 429 also pauses every other caller of this
+    client for the backoff window.
+
+    :meth:`acomplete` uses ``AsyncOpenAI`` over one pooled ``httpx``
+    connection pool per event loop, and at most ``max_in_flight`` requests
+    are outstanding at once. A loop's pool is closed when the loop shuts
+    down its async generators (as ``asyncio.run`` does) or on :meth:`aclose`.
+
+    With ``stream_usage`` (the default) :meth:`stream` asks for a final
+    usage chunk (``stream_options``); a server that rejects the option with
+    a 400 is retried once without it, and the option is not sent again.
+    """
+
+    # Adapter-internal or transformers-only kwargs that the API would reject.
+    _DROPPED_KWARGS = frozenset({"refinement_round", "do_sample", "return_full_text"})
+    _KWARG_ALIASES = {"max_new_tokens": "max_tokens"}
+
     def __init__(self,
                  model: str = "deepseek-chat",
                  api_key: Optional[str] = None,
                  base_url="https://api.deepseek.com",
                  system_prompt: str = None,
+                 *,
+                 max_in_flight: int = 16,
+                 timeout: float = 600.0,
+                 requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None,
+                 max_retries: int = 6,
+                 backoff_base: float = 1.0,
+                 backoff_max: float = 60.0,
+                 generation_kwargs: Optional[Dict[str, Any]] = None,
+                 stream_usage: bool = True,
                  ) -> None:
         super().__init__(model=model)
         try:
-            from openai import OpenAI
+            from openai import APIConnectionError, OpenAI
         except ImportError as e:
             raise ImportError(
                 "请先安装OpenAI库:\n"
@@ -197,15 +587,243 @@ class DeepseekLLMClient(LLMClient):
         )
         if not api_key:
             api_key = os.getenv("DEEPSEEK_API_KEY")
-        self.client = OpenAI(base_url=base_url, api_key=api_key)
-
-    def complete(self, prompt: str, **kwargs: Any) -> LLMResponse:
-        response = self.client.chat.completions.create(
-            model="deepseek-chat",
+        self._api_key = api_key
+        self._base_url = base_url
+        self.max_in_flight = max_in_flight
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.limiter = RateLimiter(
+            requests_per_minute=requests_per_minute, tokens_per_minute=tokens_per_minute
+        )
+        self._defaults: Dict[str, Any] = dict(generation_kwargs or {})
+        self.stream_usage = stream_usage
+        self._connection_errors = (APIConnectionError,)
+        # Retries are handled here so they can share the rate limiter.
+        self.client = OpenAI(base_url=base_url, api_key=api_key, timeout=timeout, max_retries=0)
+        # AsyncOpenAI, its httpx pool and the semaphore are bound to one event
+        # loop: (client, semaphore, closer) per loop, dropped when it shuts down.
+        self._async_lock = threading.Lock()
+        self._transports: Dict[asyncio.AbstractEventLoop, Tuple[Any, asyncio.Semaphore, Any]] = {}
+
+    def _chat_params(
+        self, prompt: str, kwargs: Dict[str, Any], *, stream: bool = False
+    ) -> Dict[str, Any]:
+        params: Dict[str, Any] = dict(self._defaults)
+        for key, value in kwargs.items():
+            if key not in self._DROPPED_KWARGS:
+                params[self._KWARG_ALIASES.get(key, key)] = value
+        params.update(
+            model=self.model,
             messages=[
                 {"role": "system", "content": self._system_prompt},
                 {"role": "user", "content": prompt},
             ],
-            stream=False
+            stream=stream,
         )
-        return LLMResponse(text=response.choices[0].message.content)
\ No newline at end of file
+        return params
+
+    @staticmethod
+    def _estimate_prompt_tokens(params: Dict[str, Any]) -> int:
+        return sum(estimate_tokens(message["content"]) for message in params["messages"])
+
+    def _estimate_tokens(self, params: Dict[str, Any]) -> int:
+        return self._estimate_prompt_tokens(params) + int(params.get("max_tokens") or 0)
+
+    def _retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying ``error``, or ``None`` if it is not retryable."""
+        if attempt >= self.max_retries:
+            return None
+        status = getattr(error, "status_code", None)
+        if status is None:
+            if not isinstance(error, self._connection_errors):
+                return None
+        elif status not in (408, 429) and status < 500:
+            return None
+        response = getattr(error, "response", None)
+        delay = backoff_delay(
+            attempt,
+            base=self.backoff_base,
+            maximum=self.backoff_max,
+            retry_after=retry_after_seconds(getattr(response, "headers", None)),
+        )
+        if status == 429:
+            self.limiter.pause(delay)
+        return delay
+
+    def _to_response(
+        self,
+        response: Any,
+        params: Dict[str, Any],
+        estimated: int,
+        *,
+        started: float,
+        queue_time: float,
+        retries: int,
+    ) -> LLMResponse:
+        usage = getattr(response, "usage", None)
+        self.limiter.settle(estimated, getattr(usage, "total_tokens", None))
+        text = response.choices[0].message.content
+        prompt_tokens = getattr(usage, "prompt_tokens", None)
+        completion_tokens = getattr(usage, "completion_tokens", None)
+        return LLMResponse(
+            text=text,
+            usage=LLMUsage(
+                prompt_tokens=(
+                    prompt_tokens
+                    if prompt_tokens is not None
+                    else self._estimate_prompt_tokens(params)
+                ),
+                completion_tokens=(
+                    completion_tokens if completion_tokens is not None else estimate_tokens(text or "")
+                ),
+                queue_time=queue_time,
+                latency=time.perf_counter() - started,
+                retries=retries,
+            ),
+        )
+
+    def complete(self, prompt: str, **kwargs: Any) -> LLMResponse:
+        params = self._chat_params(prompt, kwargs)
+        estimated = self._estimate_tokens(params)
+        started = time.perf_counter()
+        queue_time = 0.0
+        attempt = 0
+        while True:
+            waited = time.perf_counter()
+            self.limiter.acquire(estimated)
+            queue_time += time.perf_counter() - waited
+            try:
+                response = self.client.chat.completions.create(**params)
+            except Exception as error:
+                delay = self._retry_delay(error, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                time.sleep(delay)
+                continue
+            return self._to_response(
+                response, params, estimated,
+                started=started, queue_time=queue_time, retries=attempt,
+            )
+
+    def stream(self, prompt: str, **kwargs: Any) -> Iterator[str]:
+        """Stream ``delta.content`` chunks of a ``stream=True`` chat completion.
+
+        Opening the stream is rate limited and retried like :meth:`complete`;
+        a failure after the first chunk has been yielded is raised as is. With
+        :attr:`stream_usage` the server is asked for a final usage chunk so
+        the limiter can settle the actual token count. The HTTP response is
+        closed when the consumer stops early.
+        """
+        params = self._chat_params(prompt, kwargs, stream=True)
+        if self.stream_usage:
+            params["stream_options"] = {"include_usage": True}
+        estimated = self._estimate_tokens(params)
+        attempt = 0
+        while True:
+            self.limiter.acquire(estimated)
+            try:
+                response = self.client.chat.completions.create(**params)
+            except Exception as error:
+                if getattr(error, "status_code", None) == 400 and "stream_options" in params:
+                    # Not every OpenAI-compatible server knows stream_options.
+                    del params["stream_options"]
+                    self.stream_usage = False
+                    continue
+                delay = self._retry_delay(error, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                time.sleep(delay)
+                continue
+            break
+        usage = None
+        try:
+            for chunk in response:
+                usage = getattr(chunk, "usage", None) or usage
+                if not chunk.choices:
+                    continue
+                content = chunk.choices[0].delta.content
+                if content:
+                    yield content
+        finally:
+            close = getattr(response, "close", None)
+            if close is not None:
+                close()
+            self.limiter.settle(estimated, getattr(usage, "total_tokens", None))
+
+    async def acomplete(self, prompt: str, **kwargs: Any) -> LLMResponse:
+        params = self._chat_params(prompt, kwargs)
+        estimated = self._estimate_tokens(params)
+        client, semaphore = await self._async_transport()
+        started = time.perf_counter()
+        queue_time = 0.0
+        attempt = 0
+        while True:
+            waited = time.perf_counter()
+            await self.limiter.aacquire(estimated)
+            try:
+                async with semaphore:
+                    queue_time += time.perf_counter() - waited
+                    response = await client.chat.completions.create(**params)
+            except Exception as error:
+                delay = self._retry_delay(error, attempt)
+                if delay is None:
+                    raise
+                attempt += 1
+                await asyncio.sleep(delay)
+                continue
+            return self._to_response(
+                response, params, estimated,
+                started=started, queue_time=queue_time, retries=attempt,
+            )
+
+    async def aclose(self) -> None:
+        """Close the pooled async connections of the current event loop."""
+        with self._async_lock:
+            transport = self._transports.get(asyncio.get_running_loop())
+        if transport is not None:
+            await transport[2].aclose()
+
+    async def _async_transport(self) -> Tuple[Any, asyncio.Semaphore]:
+        loop = asyncio.get_running_loop()
+        with self._async_lock:
+            transport = self._transports.get(loop)
+            created = transport is None
+            if created:
+                import httpx
+                from openai import AsyncOpenAI
+
+                http_client = httpx.AsyncClient(
+                    limits=httpx.Limits(
+                        max_connections=self.max_in_flight,
+                        max_keepalive_connections=self.max_in_flight,
+                    ),
+                    timeout=self.timeout,
+                )
+                client = AsyncOpenAI(
+                    base_url=self._base_url,
+                    api_key=self._api_key,
+                    http_client=http_client,
+                    max_retries=0,
+                )
+                closer = self._close_on_shutdown(loop, client)
+                transport = (client, asyncio.Semaphore(self.max_in_flight), closer)
+                self._transports[loop] = transport
+        if created:
+            # Starting the generator registers it with the loop, whose
+            # shutdown_asyncgens() then runs its cleanup.
+            await transport[2].__anext__()
+        return transport[0], transport[1]
+
+    async def _close_on_shutdown(
+        self, loop: asyncio.AbstractEventLoop, client: Any
+    ) -> AsyncIterator[None]:
+        try:
+            yield
+        finally:
+            with self._async_lock:
+                self._transports.pop(loop, None)
+            await client.close()
@@ -0,0 +1,311 @@
+"""JSON-aware stopping and constrained decoding for local `transformers` models.
+
+:class:`JsonStoppingCriteria` and :class:`JsonLogitsProcessor` follow the
+``transformers`` callable protocols, so they can be placed in a
+``StoppingCriteriaList`` / ``LogitsProcessorList`` without this module
+importing ``torch`` until they are first called.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional
+
+JSON_MODES = ("stop", "constrained")
+
+_WHITESPACE = " \t\n\r"
+_HEX = "0123456789abcdefABCDEF"
+_NUMBER = "0123456789+-.eE"
+
+# Parser states.
+_START, _VALUE, _ARRAY_FIRST, _OBJECT_FIRST, _KEY, _COLON, _AFTER_VALUE = range(7)
+_STRING, _ESCAPE, _UNICODE, _NUMBER_STATE, _LITERAL, _DONE = range(7, 13)
+
+
+class JsonTracker:
+    """Incremental character-level tracker for a single top-level JSON object.
+
+    Two views are maintained while text is fed in:
+
+    * a lenient brace/string counter that ignores text before the first
+      ``{`` and sets :attr:`done` once that object is closed, used to stop
+      decoding early;
+    * a strict pushdown automaton over the JSON grammar, exposed as
+      :attr:`valid` and :meth:`accepts`, used to constrain decoding.
+    """
+
+    __slots__ = (
+        "done",
+        "valid",
+        "_depth",
+        "_in_string",
+        "_escaped",
+        "_stack",
+        "_state",
+        "_is_key",
+        "_pending",
+    )
+
+    def __init__(self) -> None:
+        self.done = False
+        self.valid = True
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._stack: List[str] = []
+        self._state = _START
+        self._is_key = False
+        # Remaining characters of a literal or \\u escape.
+        self._pending: Any = ""
+
+    def copy(self) -> "JsonTracker":
+        clone = JsonTracker.__new__(JsonTracker)
+        for name in self.__slots__:
+            setattr(clone, name, getattr(self, name))
+        clone._stack = list(self._stack)
+        return clone
+
+    def feed(self, text: str) -> bool:
+        """Consume ``text``; returns :attr:`valid`."""
+        for char in text:
+            if not self.done:
+                self._track(char)
+            if self.valid and not self._step(char):
+                self.valid = False
+        return self.valid
+
+    def accepts(self, text: str) -> bool:
+        """Whether appending ``text`` keeps the output a valid JSON prefix."""
+        if not self.valid:
+            return False
+        clone = self.copy()
+        for char in text:
+            if not clone._step(char):
+                return False
+        return True
+
+    @property
+    def complete(self) -> bool:
+        """The strict parser has seen a full top-level object."""
+        return self.valid and self._state == _DONE
+
+    # ------------------------------------------------------------------ #
+    def _track(self, char: str) -> None:
+        if self._in_string:
+            if self._escaped:
+                self._escaped = False
+            elif char == "\\":
+                self._escaped = True
+            elif char == '"':
+                self._in_string = False
+        elif char == '"':
+            if self._depth:
+                self._in_string = True
+        elif char in "{[":
+            if self._depth or char == "{":
+                self._depth += 1
+        elif char in "}]" and self._depth:
+            self._depth -= 1
+            if not self._depth:
+                self.done = True
+
+    def _step(self, char: str) -> bool:
+        state = self._state
+        if state == _STRING:
+            if char == "\\":
+                self._state = _ESCAPE
+            elif char == '"':
+                if self._is_key:
+                    self._state = _COLON
+                else:
+                    self._value_done()
+            elif ord(char) < 0x20:
+                return False
+            return True
+        if state == _ESCAPE:
+            if char == "u":
+                self._state, self._pending = _UNICODE, 4
+            elif char in '"\\/bfnrt':
+                self._state = _STRING
+            else:
+                return False
+            return True
+        if state == _UNICODE:
+            if char not in _HEX:
+                return False
+            self._pending -= 1
+            if not self._pending:
+                self._state = _STRING
+            return True
+        if state == _NUMBER_STATE:
+            if char in _NUMBER:
+                return True
+            self._value_done()
+            return self._step(char)
+        if state == _LITERAL:
+            if not self._pending or char != self._pending[0]:
+                return False
+            self._pending = self._pending[1:]
+            if not self._pending:
+                self._value_done()
+            return True
+        if char in _WHITESPACE:
+            return True
+        if state == _START:
+            if char != "{":
+                return False
+            self._stack.append("}")
+            self._state = _OBJECT_FIRST
+            return True
+        if state == _DONE:
+            return False
+        if state == _OBJECT_FIRST and char == "}":
+            self._stack.pop()
+            self._value_done()
+            return True
+        if state in (_OBJECT_FIRST, _KEY):
+            if char != '"':
+                return False
+            self._state, self._is_key = _STRING, True
+            return True
+        if state == _COLON:
+            if char != ":":
+                return False
+            self._state = _VALUE
+            return True
+        if state == _AFTER_VALUE:
+            closer = self._stack[-1]
+            if char == ",":
+                self._state = _KEY if closer == "}" else _VALUE
+                return True
+            if char == closer:
+                self._stack.pop()
+                self._value_done()
+                return True
+            return False
+        # _VALUE or _ARRAY_FIRST
+        if state == _ARRAY_FIRST and char == "]":
+            self._stack.pop()
+            self._value_done()
+            return True
+        return self._start_value(char)
+
+    def _start_value(self, char: str) -> bool:
+        if char == "{":
+            self._stack.append("}")
+            self._state = _OBJECT_FIRST
+        elif char == "[":
+            self._stack.append("]")
+            self._state = _ARRAY_FIRST
+        elif char == '"':
+            self._state, self._is_key = _STRING, False
+        elif char == "-" or char.isdigit():
+            self._state = _NUMBER_STATE
+        elif char in "tfn":
+            self._state = _LITERAL
+            self._pending = {"t": "rue", "f": "alse", "n": "ull"}[char]
+        else:
+            return False
+        return True
+
+    def _value_done(self) -> None:
+        self._state = _AFTER_VALUE if self._stack else _DONE
+
+
+class _IncrementalDecoder:
+    """Feeds newly generated text of each batch row into a :class:`JsonTracker`.
+
+    Only the tokens since the last step are decoded, together with the few
+    before them (``prefix``) so tokenizers that merge or strip spaces across
+    token boundaries still produce the right text. A step whose text ends in
+    an incomplete multi-byte character is held back until it completes.
+    """
+
+    def __init__(self, tokenizer: Any) -> None:
+        self._tokenizer = tokenizer
+        self._prompt_length: Optional[int] = None
+        self._trackers: List[JsonTracker] = []
+        self._prefix: List[int] = []
+        self._read: List[int] = []
+
+    def update(self, input_ids: Any, generated_offset: int) -> List[JsonTracker]:
+        if self._prompt_length is None:
+            self._prompt_length = input_ids.shape[1] - generated_offset
+            self._trackers = [JsonTracker() for _ in range(input_ids.shape[0])]
+            self._prefix = [0] * input_ids.shape[0]
+            self._read = [0] * input_ids.shape[0]
+        for row, ids in enumerate(input_ids[:, self._prompt_length :].tolist()):
+            if len(ids) == self._read[row]:
+                continue
+            prefix, read = self._prefix[row], self._read[row]
+            seen = self._decode(ids[prefix:read])
+            text = self._decode(ids[prefix:])
+            if text.endswith("\ufffd"):
+                continue
+            if len(text) > len(seen):
+                self._trackers[row].feed(text[len(seen) :])
+            self._prefix[row], self._read[row] = read, len(ids)
+        return self._trackers
+
+    def _decode(self, ids: List[int]) -> str:
+        return self._tokenizer.decode(ids, skip_special_tokens=True) if ids else ""
+
+
+class JsonStoppingCriteria:
+    """Stops each sequence as soon as its top-level JSON object is closed."""
+
+    def __init__(self, tokenizer: Any) -> None:
+        self._decoder = _IncrementalDecoder(tokenizer)
+
+    def __call__(self, input_ids: Any, scores: Any, **kwargs: Any) -> Any:
+        import torch  # type: ignore[import-untyped]
+
+        # Called after each new token, so one token of input_ids is generated.
+        trackers = self._decoder.update(input_ids, generated_offset=1)
+        return torch.tensor(
+            [tracker.done for tracker in trackers], device=input_ids.device, dtype=torch.bool
+        )
+
+
+class JsonLogitsProcessor:
+    """Restricts sampling to tokens that keep the output a valid JSON prefix.
+
+    Only the ``top_k`` highest-scoring tokens are checked against the
+    :class:`JsonTracker` grammar each step, which keeps the cost independent
+    of vocabulary size. If none of them is valid the scores are left
+    unchanged rather than forcing an unlikely token.
+    """
+
+    def __init__(self, tokenizer: Any, *, top_k: int = 32) -> None:
+        self._tokenizer = tokenizer
+        self._decoder = _IncrementalDecoder(tokenizer)
+        self.top_k = top_k
+        self._pieces: Dict[int, str] = {}
+        self._eos = tokenizer.eos_token_id
+
+    def __call__(self, input_ids: Any, scores: Any) -> Any:
+        import torch  # type: ignore[import-untyped]
+
+        # Called before sampling, so no token of input_ids is generated yet.
+        trackers = self._decoder.update(input_ids, generated_offset=0)
+        top = torch.topk(scores, k=min(self.top_k, scores.shape[-1]), dim=-1).indices.tolist()
+        masked = torch.full_like(scores, float("-inf"))
+        for row, (tracker, candidates) in enumerate(zip(trackers, top)):
+            if tracker.complete and self._eos is not None:
+                allowed = [self._eos]
+            elif not tracker.valid:
+                masked[row] = scores[row]
+                continue
+            else:
+                allowed = [token for token in candidates if tracker.accepts(self._piece(token))]
+            if not allowed:
+                masked[row] = scores[row]
+                continue
+            masked[row, allowed] = scores[row, allowed]
+        return masked
+
+    def _piece(self, token_id: int) -> str:
+        piece = self._pieces.get(token_id)
+        if piece is None:
+            piece = self._tokenizer.decode([token_id], skip_special_tokens=True)
+            self._pieces[token_id] = piece
+        return piece
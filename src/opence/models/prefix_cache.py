@@ -0,0 +1,115 @@
+"""Bounded LRU of model states keyed by token-id prefixes."""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Generic, Optional, Sequence, Tuple, TypeVar
+
+State = TypeVar("State")
+
+
+def common_prefix_length(left: Sequence[int], right: Sequence[int]) -> int:
+    """Length of the longest common prefix of two token sequences."""
+    limit = min(len(left), len(right))
+    # Compare fixed-size slices first so most of the scan runs in C.
+    length = 0
+    step = 256
+    while length < limit:
+        end = min(limit, length + step)
+        if left[length:end] == right[length:end]:
+            length = end
+            continue
+        for index in range(length, end):
+            if left[index] != right[index]:
+                return index
+        return end
+    return length
+
+
+@dataclass
+class PrefixCacheStats:
+    lookups: int = 0
+    hits: int = 0
+    prompt_tokens: int = 0
+    reused_tokens: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    @property
+    def token_hit_rate(self) -> float:
+        """Fraction of prompt tokens whose prefill was skipped."""
+        return self.reused_tokens / self.prompt_tokens if self.prompt_tokens else 0.0
+
+
+class PrefixCache(Generic[State]):
+    """Stores states (e.g. KV caches) for token prefixes seen in earlier prompts.
+
+    :meth:`lookup` returns the stored state sharing the longest common
+    prefix with a new prompt together with the usable length; callers crop
+    the state to that length and prefill only the remaining suffix. At least
+    ``min_tokens`` must match for a hit, and the final prompt token is never
+    reused so the model still produces logits for it.
+    """
+
+    def __init__(self, max_entries: int = 8, *, min_tokens: int = 16) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1.")
+        self.max_entries = max_entries
+        self.min_tokens = min_tokens
+        self.stats = PrefixCacheStats()
+        self._entries: "OrderedDict[Tuple[int, ...], State]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def lookup(self, token_ids: Sequence[int]) -> Tuple[int, Optional[State]]:
+        """Return ``(reusable_length, state)``; ``(0, None)`` on a miss."""
+        tokens = tuple(token_ids)
+        limit = len(tokens) - 1
+        with self._lock:
+            best_key: Optional[Tuple[int, ...]] = None
+            best_length = 0
+            # Most recently used first, so ties favour the freshest state.
+            for key in reversed(self._entries):
+                length = min(common_prefix_length(key, tokens), limit)
+                if length > best_length:
+                    best_key, best_length = key, length
+            self.stats.lookups += 1
+            self.stats.prompt_tokens += len(tokens)
+            if best_key is None or best_length < self.min_tokens:
+                return 0, None
+            self._entries.move_to_end(best_key)
+            self.stats.hits += 1
+            self.stats.reused_tokens += best_length
+            return best_length, self._entries[best_key]
+
+    def insert(self, token_ids: Sequence[int], state: State) -> None:
+        """Remember ``state`` as the model state after consuming ``token_ids``."""
+        tokens = tuple(token_ids)
+        with self._lock:
+            # A stored prefix of the new key is now redundant: the new state covers it.
+            for key in [key for key in self._entries if tokens[: len(key)] == key]:
+                del self._entries[key]
+            self._entries[tokens] = state
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def describe(self, reused: int, prompt_tokens: int) -> Dict[str, Any]:
+        """Per-call summary suitable for ``LLMResponse.raw``."""
+        return {
+            "hit": reused > 0,
+            "reused_tokens": reused,
+            "prompt_tokens": prompt_tokens,
+            "hit_rate": self.stats.hit_rate,
+            "token_hit_rate": self.stats.token_hit_rate,
+        }
+
@@ -34,7 +34,12 @@ class BaseModelProvider(ABC):
 
 
 class OpenAIModelProvider(BaseModelProvider):
-    """Wraps OpenAI-compatible chat completions endpoints."""
+    """Wraps OpenAI-compatible chat completions endpoints.
+
+    With ``base_urls`` one client is created per replica and calls are
+    spread over them by a :class:`~opence.models.balancer.BalancedLLMClient`
+    (``balancing_policy``, ``hedge``).
+    """
 
     def __init__(
         self,
@@ -43,19 +48,48 @@ class OpenAIModelProvider(BaseModelProvider):
         api_key: Optional[str] = None,
         base_url: str = "https://api.openai.com/v1",
         system_prompt: Optional[str] = None,
+        max_in_flight: int = 16,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        generation_kwargs: Optional[Dict[str, Any]] = None,
+        base_urls: Optional[Sequence[str]] = None,
+        balancing_policy: str = "least_outstanding",
+        hedge: bool = False,
     ) -> None:
         super().__init__()
         self.model = model
         self.api_key = api_key
         self.base_url = base_url
         self.system_prompt = system_prompt
+        self.max_in_flight = max_in_flight
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.generation_kwargs = generation_kwargs
+        self.base_urls = list(base_urls) if base_urls else None
+        self.balancing_policy = balancing_policy
+        self.hedge = hedge
 
     def create_client(self) -> LLMClient:
+        if not self.base_urls:
+            return self._endpoint_client(self.base_url)
+        from .balancer import BalancedLLMClient
+
+        return BalancedLLMClient(
+            [self._endpoint_client(url) for url in self.base_urls],
+            policy=self.balancing_policy,
+            hedge=self.hedge,
+        )
+
+    def _endpoint_client(self, base_url: str) -> LLMClient:
         return DeepseekLLMClient(
             model=self.model,
             api_key=self.api_key,
-            base_url=self.base_url,
+            base_url=base_url,
             system_prompt=self.system_prompt,
+            max_in_flight=self.max_in_flight,
+            requests_per_minute=self.requests_per_minute,
+            tokens_per_minute=self.tokens_per_minute,
+            generation_kwargs=self.generation_kwargs,
         )
 
 
@@ -70,6 +104,10 @@ class TransformersModelProvider(BaseModelProvider):
         temperature: float = 0.0,
         device_map: str | Dict[str, int] = "auto",
         torch_dtype: str | "torch.dtype" = "auto",
+        batch_window: Optional[float] = None,
+        max_batch_size: int = 8,
+        prefix_cache_size: int = 0,
+        json_mode: Optional[str] = None,
     ) -> None:
         super().__init__()
         self.model_path = model_path
@@ -77,6 +115,10 @@ class TransformersModelProvider(BaseModelProvider):
         self.temperature = temperature
         self.device_map = device_map
         self.torch_dtype = torch_dtype
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.prefix_cache_size = prefix_cache_size
+        self.json_mode = json_mode
 
     def create_client(self) -> LLMClient:
         return TransformersLLMClient(
@@ -85,6 +127,10 @@ class TransformersModelProvider(BaseModelProvider):
             temperature=self.temperature,
             device_map=self.device_map,
             torch_dtype=self.torch_dtype,
+            batch_window=self.batch_window,
+            max_batch_size=self.max_batch_size,
+            prefix_cache_size=self.prefix_cache_size,
+            json_mode=self.json_mode,
         )
 
 
@@ -100,6 +146,7 @@ class RWKVModelProvider(BaseModelProvider):
         default_max_new_tokens: int = 256,
         temperature: float = 0.7,
         top_p: float = 0.5,
+        state_cache_size: int = 32,
     ) -> None:
         super().__init__()
         self.model_path = model_path
@@ -108,6 +155,7 @@ class RWKVModelProvider(BaseModelProvider):
         self.default_max_new_tokens = default_max_new_tokens
         self.temperature = temperature
         self.top_p = top_p
+        self.state_cache_size = state_cache_size
 
     def create_client(self) -> LLMClient:
         from .rwkv_client import RWKVLLMClient
@@ -119,6 +167,7 @@ class RWKVModelProvider(BaseModelProvider):
             max_new_tokens=self.default_max_new_tokens,
             temperature=self.temperature,
             top_p=self.top_p,
+            state_cache_size=self.state_cache_size,
         )
 
 
@@ -0,0 +1,147 @@
+"""Client-side rate limiting and retry backoff for hosted LLM APIs."""
+
+from __future__ import annotations
+
+import asyncio
+import math
+import random
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Optional
+
+
+_CJK = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uf900-\ufaff]")
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap tokenizer-free token count: one per CJK character, ~4 chars otherwise.
+
+    Used to reserve quota before the provider reports usage and to budget
+    prompt sections; never below 1.
+    """
+    cjk = len(_CJK.findall(text))
+    return max(1, cjk + math.ceil((len(text) - cjk) / 4))
+
+
+class TokenBucket:
+    """Continuously refilling bucket holding at most ``capacity`` units.
+
+    ``reserve`` always succeeds and may drive the level negative; the
+    returned delay is how long the caller must wait for its reservation to be
+    covered. Reservations are therefore served in arrival order and bursts
+    are smoothed to the refill rate instead of being rejected.
+    """
+
+    def __init__(self, per_minute: float, *, clock: Callable[[], float] = time.monotonic) -> None:
+        if per_minute <= 0:
+            raise ValueError("per_minute must be positive.")
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self._clock = clock
+        self._level = self.capacity
+        self._updated = clock()
+
+    def reserve(self, amount: float) -> float:
+        now = self._clock()
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+        # A single request larger than the bucket waits for a full bucket.
+        self._level -= min(amount, self.capacity)
+        return max(0.0, -self._level / self.rate)
+
+    def refund(self, amount: float) -> None:
+        """Return (or, if negative, additionally charge) ``amount`` units."""
+        self._level = min(self.capacity, self._level + amount)
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limits shared by all callers.
+
+    Callers :meth:`acquire` (or ``await`` :meth:`aacquire`) with their
+    estimated token cost before each request and :meth:`settle` with the
+    provider-reported usage afterwards. :meth:`pause` blocks every caller,
+    e.g. while a 429 ``Retry-After`` window is open.
+    """
+
+    def __init__(
+        self,
+        *,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._requests = TokenBucket(requests_per_minute, clock=clock) if requests_per_minute else None
+        self._tokens = TokenBucket(tokens_per_minute, clock=clock) if tokens_per_minute else None
+        self._paused_until = 0.0
+
+    def reserve(self, tokens: int) -> float:
+        """Reserve quota for one request and return the seconds to wait before sending it."""
+        with self._lock:
+            delay = max(0.0, self._paused_until - self._clock())
+            if self._requests is not None:
+                delay = max(delay, self._requests.reserve(1))
+            if self._tokens is not None:
+                delay = max(delay, self._tokens.reserve(tokens))
+            return delay
+
+    def acquire(self, tokens: int) -> None:
+        delay = self.reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def aacquire(self, tokens: int) -> None:
+        delay = self.reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def settle(self, estimated: int, actual: Optional[int]) -> None:
+        """Correct a reservation once the real token usage is known."""
+        if self._tokens is None or actual is None:
+            return
+        with self._lock:
+            self._tokens.refund(estimated - actual)
+
+    def pause(self, seconds: float) -> None:
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+
+
+def retry_after_seconds(headers: Any) -> Optional[float]:
+    """Parse ``retry-after-ms`` / ``Retry-After`` (seconds or HTTP date) headers."""
+    if headers is None:
+        return None
+    value = headers.get("retry-after-ms")
+    if value is not None:
+        try:
+            return max(0.0, float(value) / 1000.0)
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(
+    attempt: int,
+    *,
+    base: float = 1.0,
+    maximum: float = 60.0,
+    retry_after: Optional[float] = None,
+) -> float:
+    """Full-jitter exponential backoff, never shorter than the server's ``Retry-After``."""
+    jittered = random.uniform(0.0, min(maximum, base * (2 ** attempt)))
+    if retry_after is not None:
+        return retry_after + jittered * 0.1
+    return jittered
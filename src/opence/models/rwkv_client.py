@@ -2,13 +2,76 @@
 
 from __future__ import annotations
 
-from typing import Any
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
 
-from .clients import LLMClient, LLMResponse
+from .clients import LLMClient, LLMResponse, LLMUsage
+from .prefix_cache import PrefixCacheStats
+
+
+def prompt_segments(prompt: str, separator: str = "\n\n") -> List[str]:
+    """Split ``prompt`` after each ``separator``; the segments concatenate back to it.
+
+    Prompt templates put the system text, playbook block, reflection and
+    question in separate paragraphs, so paragraph ends are stable places to
+    snapshot the recurrent state.
+    """
+    parts = prompt.split(separator)
+    segments = [part + separator for part in parts[:-1]]
+    segments.append(parts[-1])
+    return [segment for segment in segments if segment]
+
+
+class RWKVStateCache:
+    """LRU of ``(state, logits)`` snapshots keyed by a hash of the consumed prefix."""
+
+    def __init__(self, max_states: int = 32) -> None:
+        self.max_states = max_states
+        self.stats = PrefixCacheStats()
+        self._states: "OrderedDict[str, Tuple[Any, Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._states)
+
+    def get(self, key: str) -> Optional[Tuple[Any, Any, int]]:
+        with self._lock:
+            entry = self._states.get(key)
+            if entry is not None:
+                self._states.move_to_end(key)
+            return entry
+
+    def put(self, key: str, state: Any, logits: Any, token_count: int) -> None:
+        if self.max_states <= 0:
+            return
+        with self._lock:
+            self._states[key] = (state, logits, token_count)
+            self._states.move_to_end(key)
+            while len(self._states) > self.max_states:
+                self._states.popitem(last=False)
 
 
 class RWKVLLMClient(LLMClient):
-    """Thin wrapper around the official RWKV pipeline."""
+    """Thin wrapper around the official RWKV pipeline.
+
+    Generation runs a manual forward/sample loop instead of
+    ``PIPELINE.generate`` so the recurrent state can be reused. The prompt is
+    tokenised once; at every token offset that ends a paragraph (see
+    :func:`prompt_segments`) the state is snapshotted under a hash of the
+    token ids consumed so far, and later prompts resume from the longest
+    cached prefix. Prefill cost is then proportional to the changed suffix
+    only. Hit rates are reported under ``raw["state_cache"]``;
+    ``state_cache_size=0`` disables caching.
+
+    Sampling keeps ``PIPELINE.generate``'s defaults: presence/frequency
+    repetition penalties (``alpha_presence``, ``alpha_frequency``, decayed
+    by ``alpha_decay`` per token), banned tokens and stop tokens (end of
+    text by default).
+    """
 
     def __init__(
         self,
@@ -19,8 +82,14 @@ class RWKVLLMClient(LLMClient):
         max_new_tokens: int = 256,
         temperature: float = 0.7,
         top_p: float = 0.5,
+        state_cache_size: int = 32,
+        chunk_size: int = 256,
+        alpha_frequency: float = 0.2,
+        alpha_presence: float = 0.2,
+        alpha_decay: float = 0.996,
+        token_ban: Sequence[int] = (),
+        token_stop: Sequence[int] = (0,),
     ) -> None:
-        super().__init__(model=model_path)
         try:
             from rwkv.model import RWKV  # type: ignore
             from rwkv.utils import PIPELINE  # type: ignore
@@ -30,22 +99,230 @@ class RWKVLLMClient(LLMClient):
                 "Install it via `pip install rwkv` and provide valid weights."
             ) from exc
 
-        self._pipeline = PIPELINE(
-            RWKV(model=model_path, strategy=strategy), tokenizer_path
+        model = RWKV(model=model_path, strategy=strategy)
+        self._setup(
+            model,
+            PIPELINE(model, tokenizer_path),
+            model_name=model_path,
+            max_new_tokens=max_new_tokens,
+            temperature=temperature,
+            top_p=top_p,
+            state_cache_size=state_cache_size,
+            chunk_size=chunk_size,
+            alpha_frequency=alpha_frequency,
+            alpha_presence=alpha_presence,
+            alpha_decay=alpha_decay,
+            token_ban=token_ban,
+            token_stop=token_stop,
+        )
+
+    @classmethod
+    def from_model(
+        cls,
+        model: Any,
+        pipeline: Any,
+        *,
+        model_name: str = "rwkv",
+        max_new_tokens: int = 256,
+        temperature: float = 0.7,
+        top_p: float = 0.5,
+        state_cache_size: int = 32,
+        chunk_size: int = 256,
+        alpha_frequency: float = 0.2,
+        alpha_presence: float = 0.2,
+        alpha_decay: float = 0.996,
+        token_ban: Sequence[int] = (),
+        token_stop: Sequence[int] = (0,),
+    ) -> "RWKVLLMClient":
+        """Wrap an already loaded model/pipeline, e.g. to share weights between clients."""
+        client = cls.__new__(cls)
+        client._setup(
+            model,
+            pipeline,
+            model_name=model_name,
+            max_new_tokens=max_new_tokens,
+            temperature=temperature,
+            top_p=top_p,
+            state_cache_size=state_cache_size,
+            chunk_size=chunk_size,
+            alpha_frequency=alpha_frequency,
+            alpha_presence=alpha_presence,
+            alpha_decay=alpha_decay,
+            token_ban=token_ban,
+            token_stop=token_stop,
         )
+        return client
+
+    def _setup(
+        self,
+        model: Any,
+        pipeline: Any,
+        *,
+        model_name: str,
+        max_new_tokens: int,
+        temperature: float,
+        top_p: float,
+        state_cache_size: int,
+        chunk_size: int,
+        alpha_frequency: float,
+        alpha_presence: float,
+        alpha_decay: float,
+        token_ban: Sequence[int],
+        token_stop: Sequence[int],
+    ) -> None:
+        super().__init__(model=model_name)
+        self._model = model
+        self._pipeline = pipeline
         self._max_new_tokens = max_new_tokens
         self._temperature = temperature
         self._top_p = top_p
+        self._chunk_size = chunk_size
+        self._alpha_frequency = alpha_frequency
+        self._alpha_presence = alpha_presence
+        self._alpha_decay = alpha_decay
+        self._token_ban = list(token_ban)
+        self._token_stop = set(token_stop)
+        self.state_cache = RWKVStateCache(state_cache_size)
 
     def complete(self, prompt: str, **kwargs: Any) -> LLMResponse:
+        started = time.perf_counter()
+        first_token: Optional[float] = None
+        report: Dict[str, Any] = {}
+        output: List[int] = []
+        for token in self._decode(prompt, kwargs, report):
+            if first_token is None:
+                first_token = time.perf_counter() - started
+            output.append(token)
+        return LLMResponse(
+            text=str(self._pipeline.decode(output)).strip(),
+            raw={"state_cache": report},
+            usage=LLMUsage(
+                prompt_tokens=report["prompt_tokens"],
+                completion_tokens=len(output),
+                time_to_first_token=first_token,
+                latency=time.perf_counter() - started,
+            ),
+        )
+
+    def stream(self, prompt: str, **kwargs: Any) -> Iterator[str]:
+        output: List[int] = []
+        # Decode only the tokens since the last chunk, with the previous
+        # chunk's tokens as context for tokenizers that merge across them.
+        prefix = read = 0
+        for token in self._decode(prompt, kwargs, {}):
+            output.append(token)
+            seen = self._text(output[prefix:read])
+            text = self._text(output[prefix:])
+            # Hold back chunks ending inside a multi-byte character.
+            if len(text) > len(seen) and not text.endswith("\ufffd"):
+                yield text[len(seen) :]
+                prefix, read = read, len(output)
+
+    def _text(self, tokens: List[int]) -> str:
+        if not tokens:
+            return ""
+        try:
+            return str(self._pipeline.decode(tokens))
+        except UnicodeDecodeError:  # byte-level tokenizers raise on a split character
+            return "\ufffd"
+
+    def _decode(self, prompt: str, kwargs: Dict[str, Any], report: Dict[str, Any]) -> Iterator[int]:
+        """Yield sampled token ids; fills ``report`` with state-cache statistics."""
         token_count = int(kwargs.get("max_new_tokens", self._max_new_tokens))
         temperature = float(kwargs.get("temperature", self._temperature))
         top_p = float(kwargs.get("top_p", self._top_p))
+        alpha_frequency = float(kwargs.get("alpha_frequency", self._alpha_frequency))
+        alpha_presence = float(kwargs.get("alpha_presence", self._alpha_presence))
 
-        text = self._pipeline.generate(
-            prompt,
-            token_count=token_count,
-            temperature=temperature,
-            top_p=top_p,
+        logits, state, reused, prompt_tokens = self._prefill(prompt)
+        stats = self.state_cache.stats
+        report.update(
+            hit=reused > 0,
+            reused_tokens=reused,
+            prompt_tokens=prompt_tokens,
+            hit_rate=stats.hit_rate,
+            token_hit_rate=stats.token_hit_rate,
         )
-        return LLMResponse(text=str(text).strip())
+        # Same penalties as PIPELINE.generate with its default PIPELINE_ARGS.
+        occurrence: Dict[int, float] = {}
+        for _ in range(token_count):
+            for token in self._token_ban:
+                logits[token] = -float("inf")
+            for token, count in occurrence.items():
+                logits[token] -= alpha_presence + count * alpha_frequency
+            token = self._pipeline.sample_logits(logits, temperature=temperature, top_p=top_p)
+            if token in self._token_stop:
+                break
+            yield token
+            for seen in occurrence:
+                occurrence[seen] *= self._alpha_decay
+            # Whitespace and digits are not penalised.
+            weight = 0.0 if self._text([token]) in " \t0123456789" else 1.0
+            occurrence[token] = occurrence.get(token, 0.0) + weight
+            logits, state = self._model.forward([token], state)
+
+    def _prefill(self, prompt: str) -> Tuple[Any, Any, int, int]:
+        """Consume ``prompt`` and return ``(logits, state, reused_tokens, prompt_tokens)``."""
+        tokens = list(self._pipeline.encode(prompt))
+        offsets = self._paragraph_offsets(prompt, tokens)
+        hasher = hashlib.sha256()
+        keys = []
+        consumed = 0
+        for offset in offsets:
+            hasher.update(",".join(map(str, tokens[consumed:offset])).encode("ascii") + b",")
+            keys.append(hasher.copy().hexdigest())
+            consumed = offset
+
+        start, state, logits, consumed = 0, None, None, 0
+        for index in range(len(keys) - 1, -1, -1):
+            entry = self.state_cache.get(keys[index])
+            if entry is not None:
+                cached_state, cached_logits, consumed = entry
+                # forward() updates the state list in place; never touch the cached copy.
+                state, logits = copy.deepcopy(cached_state), copy.deepcopy(cached_logits)
+                start = index + 1
+                break
+        reused = consumed
+
+        for offset, key in zip(offsets[start:], keys[start:]):
+            for chunk in range(consumed, offset, self._chunk_size):
+                logits, state = self._model.forward(
+                    tokens[chunk : min(chunk + self._chunk_size, offset)], state
+                )
+            consumed = offset
+            self.state_cache.put(key, copy.deepcopy(state), copy.deepcopy(logits), consumed)
+
+        stats = self.state_cache.stats
+        stats.lookups += 1
+        stats.prompt_tokens += consumed
+        if reused:
+            stats.hits += 1
+            stats.reused_tokens += reused
+        return logits, state, reused, consumed
+
+    def _paragraph_offsets(self, prompt: str, tokens: List[int]) -> List[int]:
+        """Token offsets whose decoded prefix ends a paragraph, plus the prompt end.
+
+        A token spanning a paragraph end (e.g. one token for three newlines) yields
+        no offset there, so cached states always match the whole-prompt
+        tokenisation.
+        """
+        ends = set()
+        position = 0
+        for segment in prompt_segments(prompt):
+            position += len(segment)
+            ends.add(position)
+        offsets: List[int] = []
+        length = prefix = read = 0
+        for index in range(1, len(tokens)):
+            seen = self._text(tokens[prefix:read])
+            text = self._text(tokens[prefix:index])
+            if text.endswith("\ufffd"):
+                continue
+            length += len(text) - len(seen)
+            prefix, read = read, index
+            if length in ends:
+                offsets.append(index)
+        if tokens:
+            offsets.append(len(tokens))
+        return offsets
@@ -1,7 +1,18 @@
+import asyncio
 import json
+import time
 
-from opence.methods.ace import Curator, Playbook, Reflector
+from opence.methods.ace import (
+    Curator,
+    Generator,
+    JsonFieldParser,
+    Playbook,
+    Reflector,
+    ReflectorOutput,
+)
 from opence import DummyLLMClient
+from opence.models.clients import TransformersLLMClient
+from opence.models.rate_limit import estimate_tokens
 from opence.components.evaluators.ace_reflector import ACEReflectorEvaluator
 from opence.components.evolvers.ace_curator import ACECuratorEvolver
 from opence.interfaces import ContextBundle, LLMRequest, ModelResponse
@@ -65,3 +76,170 @@ def test_ace_wrappers_update_playbook() -> None:
     decision = evolver.evolve(context, signal)
     assert "applied" in decision.summary
     assert playbook.bullets()
+
+
+class ConcurrentClient(DummyLLMClient):
+    """Async client recording how many requests overlap."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.in_flight = 0
+        self.peak = 0
+
+    async def acomplete(self, prompt, **kwargs):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return self.complete(prompt, **kwargs)
+
+
+def test_roles_can_be_awaited_concurrently() -> None:
+    client = ConcurrentClient()
+    for idx in range(3):
+        client.queue(json.dumps({"reasoning": "", "bullet_ids": [], "final_answer": str(idx)}))
+    generator = Generator(client)
+    playbook = Playbook()
+
+    async def main():
+        return await asyncio.gather(
+            *(
+                generator.agenerate(question=f"q{idx}", context=None, playbook=playbook)
+                for idx in range(3)
+            )
+        )
+
+    outputs = asyncio.run(main())
+    assert sorted(output.final_answer for output in outputs) == ["0", "1", "2"]
+    assert client.peak == 3
+
+    # Local clients fall back to the thread shim; retries behave as in sync mode.
+    shim = DummyLLMClient()
+    shim.queue("not json")
+    shim.queue(json.dumps({"reasoning": "", "operations": []}))
+    curator = Curator(shim)
+    output = asyncio.run(
+        curator.acurate(
+            reflection=ReflectorOutput("", "", "", "", "", [], {}),
+            playbook=playbook,
+            question_context="",
+            progress="",
+        )
+    )
+    assert output.delta.operations == []
+
+
+def test_malformed_json_is_repaired_before_retrying() -> None:
+    client = DummyLLMClient()
+    # Fenced, trailing comma, unescaped quotes and a truncated closer.
+    client.queue(
+        '```json\n{"reasoning": "she said "use 42"", "bullet_ids": ["a",], '
+        '"final_answer": "42"\n```'
+    )
+    generator = Generator(client)
+    output = generator.generate(question="q", context=None, playbook=Playbook())
+    assert output.final_answer == "42"
+    assert output.reasoning == 'she said "use 42"'
+    assert generator.json_stats.local_repairs == 1
+
+    # Unrepairable output is retried with a short fix prompt, not the full prompt.
+    prompts = []
+
+    class RecordingClient(DummyLLMClient):
+        def complete(self, prompt, **kwargs):
+            prompts.append(prompt)
+            return super().complete(prompt, **kwargs)
+
+    client = RecordingClient()
+    client.queue('{"reasoning": "x" "final_answer": }')
+    client.queue(json.dumps({"reasoning": "x", "bullet_ids": [], "final_answer": "7"}))
+    generator = Generator(client)
+    output = generator.generate(question="q", context=None, playbook=Playbook())
+    assert output.final_answer == "7"
+    assert generator.json_stats.fix_prompts == 1
+    assert "Playbook" not in prompts[1] and '"final_answer": }' in prompts[1]
+
+
+class ChunkedClient(DummyLLMClient):
+    """Streams queued responses a few characters at a time."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.events = []
+
+    def stream(self, prompt, **kwargs):
+        text = self.complete(prompt, **kwargs).text
+        for start in range(0, len(text), 3):
+            self.events.append("chunk")
+            yield text[start : start + 3]
+
+
+def test_generator_surfaces_fields_while_streaming() -> None:
+    client = ChunkedClient()
+    client.queue(
+        'Here: {"bullet_ids": ["a-1", "b-2"], "final_answer": "4\\"2", '
+        '"reasoning": "' + "long " * 20 + '", "nested": {"x": [1, "}"]}}'
+    )
+    seen = []
+
+    def on_field(name, value):
+        seen.append((name, value))
+        client.events.append(name)
+
+    output = Generator(client).generate(
+        question="q", context=None, playbook=Playbook(), on_field=on_field
+    )
+    assert output.final_answer == '4"2'
+    assert seen == [("bullet_ids", ["a-1", "b-2"]), ("final_answer", '4"2')]
+    # Both fields were reported long before the stream finished.
+    assert client.events.index("final_answer") < len(client.events) // 2
+
+    parser = JsonFieldParser()
+    found = {}
+    for char in '{"n": -1.5e2, "ok": true, "obj": {"a": null}}':
+        found.update(parser.feed(char))
+    assert found == {"n": -150.0, "ok": True, "obj": {"a": None}}
+    assert parser.done
+
+
+class HarmonyChunkedClient(ChunkedClient):
+    """Streams raw harmony-style output that only post-processing turns into JSON."""
+
+    postprocess_text = TransformersLLMClient.postprocess_text
+
+
+def test_streaming_applies_client_postprocessing() -> None:
+    client = HarmonyChunkedClient()
+    client.queue(
+        'analysis {"final_answer": "draft"} assistantfinal'
+        '{"reasoning": "", "bullet_ids": [], "final_answer": "42"}'
+    )
+    output = Generator(client).generate(
+        question="q", context=None, playbook=Playbook(), on_field=lambda name, value: None
+    )
+    assert output.final_answer == "42"
+    assert output.raw["final_answer"] == "42"
+
+
+class SlowFirstChunkClient(ChunkedClient):
+    def stream(self, prompt, **kwargs):
+        time.sleep(0.05)
+        yield from super().stream(prompt, **kwargs)
+
+
+def test_streamed_usage_sums_calls_across_json_retry() -> None:
+    client = SlowFirstChunkClient()
+    client.queue('{"final_answer": }')
+    client.queue('{"reasoning": "", "bullet_ids": [], "final_answer": "7"}')
+    output = Generator(client).generate(
+        question="q", context=None, playbook=Playbook(), on_field=lambda name, value: None
+    )
+    assert output.final_answer == "7"
+    usage = output.usage
+    assert usage.calls == 2
+    assert usage.completion_tokens == estimate_tokens('{"final_answer": }') + estimate_tokens(
+        '{"reasoning": "", "bullet_ids": [], "final_answer": "7"}'
+    )
+    # Latencies add up; time to first token is the slowest call's, not the sum.
+    assert usage.latency >= 0.1
+    assert 0.05 <= usage.time_to_first_token < 0.1
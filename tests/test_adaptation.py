@@ -1,17 +1,38 @@
+import csv
 import json
+import re
+import tempfile
+import threading
+import time
 import unittest
+from unittest import mock
 
 from opence.methods.ace import (
+    AdapterCheckpoint,
+    AdapterStepResult,
+    CallbackResultSink,
     DummyLLMClient,
     EnvironmentResult,
+    JsonlResultSink,
     OfflineAdapter,
+    OnlineAdapter,
     Playbook,
+    PlaybookJournal,
+    PlaybookRetriever,
+    SQLiteStorage,
     Sample,
     TaskEnvironment,
     Generator,
     Reflector,
     Curator,
+    aggregate_usage,
+    apply_snapshot_diff,
+    read_results,
+    snapshot_diff,
 )
+from opence.methods.ace.deduplication import Deduplicator
+from opence.core import TracedLLMClient, Tracer
+from opence.models.clients import LLMResponse, LLMUsage
 
 
 class SimpleQAEnvironment(TaskEnvironment):
@@ -27,6 +48,70 @@ class SimpleQAEnvironment(TaskEnvironment):
         )
 
 
+class ScriptedClient(DummyLLMClient):
+    """Answers each ACE role from its prompt, so results are order independent."""
+
+    def __init__(self, delay: float = 0.0) -> None:
+        super().__init__()
+        self.delay = delay
+        self.calls = 0
+        self.curator_calls = 0
+        self._lock = threading.Lock()
+
+    def complete(self, prompt, **kwargs):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.delay)
+        if prompt.startswith("You are the curator"):
+            with self._lock:
+                self.curator_calls += 1
+            payload = {
+                "reasoning": "record",
+                "operations": [
+                    {"type": "ADD", "section": "lessons", "content": f"Lesson for {question}"}
+                    for question in re.findall(r"question: (.*)", prompt)
+                ],
+            }
+        elif prompt.startswith("You are a senior reviewer"):
+            payload = {
+                "reasoning": "ok",
+                "error_identification": "",
+                "root_cause_analysis": "",
+                "correct_approach": "",
+                "key_insight": "keep going",
+                "bullet_tags": [],
+            }
+        else:
+            question = re.search(r"Question:\n(.*)", prompt).group(1)
+            payload = {"reasoning": "", "bullet_ids": [], "final_answer": question}
+        text = json.dumps(payload)
+        return LLMResponse(
+            text=text,
+            usage=LLMUsage(prompt_tokens=len(prompt), completion_tokens=len(text), latency=0.5),
+        )
+
+
+class CrashingClient(ScriptedClient):
+    def __init__(self, fail_at: int) -> None:
+        super().__init__()
+        self.fail_at = fail_at
+
+    def complete(self, prompt, **kwargs):
+        if self.calls + 1 == self.fail_at:
+            raise RuntimeError("CUDA out of memory")
+        return super().complete(prompt, **kwargs)
+
+
+def build_adapter(client: DummyLLMClient, playbook=None, **kwargs) -> OfflineAdapter:
+    return OfflineAdapter(
+        playbook=Playbook() if playbook is None else playbook,
+        generator=Generator(client),
+        reflector=Reflector(client),
+        curator=Curator(client),
+        **kwargs,
+    )
+
+
 class OfflineAdapterTest(unittest.TestCase):
     def test_single_step_updates_playbook(self) -> None:
         client = DummyLLMClient()
@@ -95,6 +180,337 @@ class OfflineAdapterTest(unittest.TestCase):
             any("life" in bullet.content for bullet in playbook.bullets())
         )
 
+    def test_concurrent_run_is_reproducible(self) -> None:
+        samples = [Sample(question=f"q{idx}", ground_truth=f"q{idx}") for idx in range(7)]
+        runs = []
+        for _ in range(2):
+            adapter = build_adapter(ScriptedClient(delay=0.005), max_workers=3)
+            results = adapter.run(samples, SimpleQAEnvironment(), epochs=2)
+            runs.append((adapter.playbook.as_prompt(), [r.playbook_snapshot for r in results]))
+
+        self.assertEqual(runs[0], runs[1])
+        contents = [bullet.content for bullet in adapter.playbook.bullets()]
+        expected = [f"Lesson for q{idx}" for idx in range(7)]
+        self.assertEqual(contents, expected + expected)
+        answers = [result.generator_output.final_answer for result in results[:7]]
+        self.assertEqual(answers, [sample.question for sample in samples])
+
+    def test_concurrent_run_keeps_retriever_on_live_playbook(self) -> None:
+        client = ScriptedClient()
+        retriever = PlaybookRetriever(top_k=3)
+        adapter = OfflineAdapter(
+            playbook=Playbook(),
+            generator=Generator(client, retriever=retriever),
+            reflector=Reflector(client),
+            curator=Curator(client),
+            max_workers=3,
+        )
+        samples = [Sample(question=f"q{idx}", ground_truth=f"q{idx}") for idx in range(7)]
+        adapter.run(samples, SimpleQAEnvironment(), epochs=2)
+
+        # Waves generate against snapshots, yet the index is built only once
+        # and keeps following the deltas applied to the live playbook.
+        self.assertEqual(retriever.rebuilds, 1)
+        self.assertEqual(len(retriever._index), 14)
+        hits = retriever.retrieve(adapter.playbook, "Lesson for q3")
+        self.assertEqual(hits[0].content, "Lesson for q3")
+
+    def test_run_saves_embedding_cache_after_each_epoch(self) -> None:
+        deduplicator = Deduplicator(backend="substring")
+        adapter = build_adapter(ScriptedClient(), deduplicator=deduplicator)
+        samples = [Sample(question=f"q{idx}", ground_truth=f"q{idx}") for idx in range(3)]
+        with mock.patch.object(deduplicator, "save_embeddings") as save:
+            adapter.run(samples, SimpleQAEnvironment(), epochs=2)
+        self.assertEqual(save.call_count, 2)
+
+    def test_pipelined_run_matches_sequential(self) -> None:
+        samples = [Sample(question=f"q{idx}", ground_truth=f"q{idx}") for idx in range(5)]
+        sequential = build_adapter(ScriptedClient())
+        expected = sequential.run(samples, SimpleQAEnvironment(), epochs=2)
+
+        adapter = build_adapter(ScriptedClient(delay=0.002), pipeline_staleness=0)
+        results = adapter.run(samples, SimpleQAEnvironment(), epochs=2)
+        self.assertEqual(
+            [r.playbook_snapshot for r in results], [r.playbook_snapshot for r in expected]
+        )
+
+        stats = adapter.pipeline_stats
+        self.assertEqual(stats.samples, 10)
+        self.assertTrue({"generate", "reflect", "curate", "apply"} <= set(stats.occupancy()))
+        self.assertTrue(all(0.0 <= value <= 1.0 for value in stats.occupancy().values()))
+
+    def test_pipelined_run_bounds_staleness(self) -> None:
+        samples = [Sample(question=f"q{idx}", ground_truth=f"q{idx}") for idx in range(6)]
+        adapter = build_adapter(ScriptedClient(delay=0.002), pipeline_staleness=1)
+        results = adapter.run(samples, SimpleQAEnvironment())
+
+        self.assertEqual(
+            [r.generator_output.final_answer for r in results], [s.question for s in samples]
+        )
+        self.assertEqual(len(adapter.playbook.bullets()), 6)
+        with self.assertRaises(ValueError):
+            build_adapter(ScriptedClient(), max_workers=2, pipeline_staleness=1)
+
+    def test_batched_curation_merges_reflections(self) -> None:
+        samples = [Sample(question=f"q{idx}", ground_truth=f"q{idx}") for idx in range(5)]
+        client = ScriptedClient()
+        adapter = build_adapter(client)
+        results = adapter.run(samples, SimpleQAEnvironment(), curation_batch_size=2)
+
+        self.assertEqual(client.curator_calls, 3)
+        self.assertEqual([r.curation_batch_size for r in results], [2, 2, 2, 2, 1])
+        self.assertIs(results[0].curator_output, results[1].curator_output)
+        contents = [bullet.content for bullet in adapter.playbook.bullets()]
+        self.assertEqual(contents, [f"Lesson for q{idx}" for idx in range(5)])
+
+        # The shared batch curation call is counted once per batch.
+        usage = aggregate_usage(results)
+        self.assertEqual(
+            {role: totals.calls for role, totals in usage.items()},
+            {"generator": 5, "reflector": 5, "curator": 3},
+        )
+        self.assertEqual(usage["curator"].latency, 1.5)
+        self.assertGreater(results[0].usage["generator"].prompt_tokens, 0)
+
+    def test_checkpoint_resume_skips_completed_steps(self) -> None:
+        samples = [Sample(question=f"q{idx}", ground_truth=f"q{idx}") for idx in range(4)]
+        reference_client = ScriptedClient()
+        expected = build_adapter(reference_client).run(samples, SimpleQAEnvironment(), epochs=2)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = f"{tmp}/run.ckpt"
+            # Three calls per sample: the 17th call is the second epoch's sample q1.
+            crashing = build_adapter(CrashingClient(fail_at=17))
+            with self.assertRaises(RuntimeError):
+                crashing.run(
+                    samples,
+                    SimpleQAEnvironment(),
+                    epochs=2,
+                    checkpoint_path=path,
+                    checkpoint_every=1,
+                )
+            state, _ = AdapterCheckpoint.load(path)
+            self.assertEqual((state["epoch"], state["step"], state["results"]), (2, 1, 5))
+
+            client = ScriptedClient()
+            adapter = build_adapter(client)
+            results = adapter.run(samples, SimpleQAEnvironment(), epochs=2, resume_from=path)
+            self.assertEqual(client.calls, reference_client.calls - 5 * 3)
+            self.assertEqual(
+                [r.playbook_snapshot for r in results], [r.playbook_snapshot for r in expected]
+            )
+            self.assertEqual(adapter.playbook.as_prompt(), expected[-1].playbook_snapshot)
+            self.assertEqual(AdapterCheckpoint.load(path)[0]["epoch"], 3)
+
+            with self.assertRaises(ValueError):
+                build_adapter(ScriptedClient()).run(
+                    samples[:2], SimpleQAEnvironment(), resume_from=path
+                )
+
+    def test_checkpoint_resume_keeps_sqlite_storage(self) -> None:
+        samples = [Sample(question=f"q{idx}", ground_truth=f"q{idx}") for idx in range(4)]
+        expected = build_adapter(ScriptedClient()).run(samples, SimpleQAEnvironment(), epochs=2)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = f"{tmp}/run.ckpt"
+            storage = SQLiteStorage(f"{tmp}/playbook.db")
+            crashing = build_adapter(CrashingClient(fail_at=20), Playbook(storage=storage))
+            with self.assertRaises(RuntimeError):
+                crashing.run(
+                    samples,
+                    SimpleQAEnvironment(),
+                    epochs=2,
+                    checkpoint_path=path,
+                    checkpoint_every=3,
+                )
+            marker = storage.get_meta("adapter_checkpoint")
+            storage.close()
+            state, _ = AdapterCheckpoint.load(path, storage_marker=marker)
+            self.assertEqual((state["epoch"], state["step"]), (2, 0))
+            self.assertNotIn("playbook", state)
+
+            storage = SQLiteStorage(f"{tmp}/playbook.db")
+            playbook = Playbook(storage=storage)
+            # The steps after the last checkpoint were rolled back.
+            self.assertEqual(playbook.as_prompt(), expected[3].playbook_snapshot)
+            adapter = build_adapter(ScriptedClient(), playbook)
+            results = adapter.run(samples, SimpleQAEnvironment(), epochs=2, resume_from=path)
+            self.assertIs(adapter.playbook, playbook)
+            self.assertIs(adapter.playbook.storage, storage)
+            self.assertEqual(
+                [r.playbook_snapshot for r in results], [r.playbook_snapshot for r in expected]
+            )
+            storage.close()
+            reopened = Playbook(storage=SQLiteStorage(f"{tmp}/playbook.db"))
+            self.assertEqual(reopened.as_prompt(), expected[-1].playbook_snapshot)
+            reopened.storage.close()
+
+            with self.assertRaises(ValueError):
+                build_adapter(ScriptedClient()).run(
+                    samples, SimpleQAEnvironment(), epochs=2, resume_from=path
+                )
+
+    def test_checkpoint_load_recovers_state_committed_to_storage(self) -> None:
+        def crash() -> None:
+            raise RuntimeError("killed after the storage commit")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            checkpoint = AdapterCheckpoint(f"{tmp}/run.ckpt")
+            checkpoint.start([])
+            checkpoint.save({"step": 1, "storage_marker": "run:1"})
+            with self.assertRaises(RuntimeError):
+                checkpoint.save({"step": 2, "storage_marker": "run:2"}, commit=crash)
+            checkpoint.close()
+            state, _ = AdapterCheckpoint.load(checkpoint.path, storage_marker="run:1")
+            self.assertEqual(state["step"], 1)
+            state, _ = AdapterCheckpoint.load(checkpoint.path, storage_marker="run:2")
+            self.assertEqual(state["step"], 2)
+            with self.assertRaises(ValueError):
+                AdapterCheckpoint.load(checkpoint.path, storage_marker="run:1")
+
+    def test_checkpoint_resume_rewinds_journal(self) -> None:
+        samples = [Sample(question=f"q{idx}", ground_truth=f"q{idx}") for idx in range(4)]
+        expected = build_adapter(ScriptedClient()).run(samples, SimpleQAEnvironment(), epochs=2)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = f"{tmp}/run.ckpt"
+            journal = PlaybookJournal(f"{tmp}/journal")
+            crashing = build_adapter(CrashingClient(fail_at=20), journal.open())
+            with self.assertRaises(RuntimeError):
+                crashing.run(
+                    samples,
+                    SimpleQAEnvironment(),
+                    epochs=2,
+                    checkpoint_path=path,
+                    checkpoint_every=3,
+                )
+            journal.close()
+            state, _ = AdapterCheckpoint.load(path)
+            self.assertNotIn("playbook", state)
+            # The second epoch's first two steps were journaled after the checkpoint.
+            self.assertEqual(state["journal_seq"] + 2, journal.seq)
+
+            journal = PlaybookJournal(f"{tmp}/journal")
+            playbook = journal.open()
+            adapter = build_adapter(ScriptedClient(), playbook)
+            results = adapter.run(samples, SimpleQAEnvironment(), epochs=2, resume_from=path)
+            self.assertIs(adapter.playbook.journal, journal)
+            self.assertEqual(
+                [r.playbook_snapshot for r in results], [r.playbook_snapshot for r in expected]
+            )
+            journal.close()
+            reloaded = PlaybookJournal(f"{tmp}/journal").load()
+            self.assertEqual(reloaded.as_prompt(), expected[-1].playbook_snapshot)
+
+    def test_tracer_records_stages_and_exports(self) -> None:
+        samples = [Sample(question=f"q{idx}", ground_truth=f"q{idx}") for idx in range(3)]
+        tracer = Tracer()
+        adapter = build_adapter(TracedLLMClient(ScriptedClient(), tracer), tracer=tracer)
+        adapter.run(samples, SimpleQAEnvironment())
+
+        summary = tracer.summary()
+        stages = ("sample", "generate", "evaluate", "reflect", "curate", "apply_delta", "snapshot")
+        for stage in stages:
+            self.assertEqual(summary[stage]["count"], 3, stage)
+        self.assertEqual(summary["llm"]["count"], 9)
+        llm_span = next(span for span in tracer.spans if span.name == "llm")
+        self.assertGreater(llm_span.args["completion_tokens"], 0)
+        sample_span = next(span for span in tracer.spans if span.name == "sample")
+        generate_span = next(span for span in tracer.spans if span.name == "generate")
+        self.assertLessEqual(sample_span.start, generate_span.start)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            trace = json.loads(tracer.export_chrome_trace(f"{tmp}/trace.json").read_text())
+            with tracer.export_csv(f"{tmp}/trace.csv").open() as handle:
+                rows = list(csv.DictReader(handle))
+        complete = [event for event in trace["traceEvents"] if event["ph"] == "X"]
+        self.assertEqual(len(complete), len(tracer.spans))
+        self.assertTrue(all(event["dur"] >= 0 for event in complete))
+        self.assertTrue(any(event["ph"] == "M" for event in trace["traceEvents"]))
+        self.assertEqual({row["name"] for row in rows}, set(summary))
+
+        # The default tracer records nothing and leaves results unchanged.
+        untraced = build_adapter(ScriptedClient())
+        self.assertFalse(untraced.tracer.enabled)
+        self.assertEqual(len(untraced.run(samples, SimpleQAEnvironment())), 3)
+
+
+class OnlineAdapterTest(unittest.TestCase):
+    def build(self, client: DummyLLMClient, **kwargs) -> OnlineAdapter:
+        return OnlineAdapter(
+            playbook=Playbook(),
+            generator=Generator(client),
+            reflector=Reflector(client),
+            curator=Curator(client),
+            **kwargs,
+        )
+
+    def test_iter_run_streams_with_diff_snapshots_and_sinks(self) -> None:
+        samples = [Sample(question=f"q{idx}", ground_truth=f"q{idx}") for idx in range(4)]
+        expected = self.build(ScriptedClient()).run(samples, SimpleQAEnvironment())
+
+        seen = []
+        adapter = self.build(ScriptedClient(), snapshot_policy="diff")
+        with tempfile.TemporaryDirectory() as tmp:
+            with JsonlResultSink(f"{tmp}/results.jsonl") as sink:
+                stream = adapter.iter_run(
+                    (sample for sample in samples),
+                    SimpleQAEnvironment(),
+                    sinks=[sink, CallbackResultSink(seen.append)],
+                )
+                first = next(stream)
+                self.assertEqual(len(seen), 1)
+                results = [first, *stream]
+            loaded = list(read_results(f"{tmp}/results.jsonl"))
+
+        self.assertEqual(seen, results)
+        rebuilt, snapshot = [], ""
+        for result in results:
+            snapshot = apply_snapshot_diff(snapshot, result.playbook_snapshot)
+            rebuilt.append(snapshot)
+        self.assertEqual(rebuilt, [r.playbook_snapshot for r in expected])
+        self.assertEqual([r.playbook_version for r in results], [1, 2, 3, 4])
+
+        self.assertEqual([r.to_dict() for r in loaded], [r.to_dict() for r in results])
+        self.assertEqual(loaded[0].usage["generator"].latency, 0.5)
+        self.assertEqual(loaded[0].curator_output.delta.operations[0].type, "ADD")
+
+    def test_snapshot_policies(self) -> None:
+        samples = [Sample(question=f"q{idx}", ground_truth=f"q{idx}") for idx in range(3)]
+        adapter = self.build(ScriptedClient())
+        versions = adapter.run(samples, SimpleQAEnvironment(), snapshot_policy="version")
+        self.assertEqual([r.playbook_snapshot for r in versions], ["", "", ""])
+        self.assertEqual([r.playbook_version for r in versions], [1, 2, 3])
+        dropped = adapter.run(samples, SimpleQAEnvironment(), snapshot_policy="none")
+        self.assertEqual([r.playbook_version for r in dropped], [None, None, None])
+        full = adapter.run(samples[:1], SimpleQAEnvironment())
+        self.assertEqual(full[0].playbook_snapshot, adapter.playbook.as_prompt())
+        with self.assertRaises(ValueError):
+            adapter.run(samples, SimpleQAEnvironment(), snapshot_policy="sometimes")
+
+    def test_snapshot_diff_round_trips(self) -> None:
+        states = ["", "a\nb\nc", "a\nc", "x\na\nc\ny", "x\ny", "", "only"]
+        for previous, current in zip(states, states[1:]):
+            diff = snapshot_diff(previous, current)
+            self.assertEqual(apply_snapshot_diff(previous, diff), current)
+        result = AdapterStepResult.from_dict(
+            {
+                "sample": {"question": "q"},
+                "generator_output": {
+                    "reasoning": "", "final_answer": "a", "bullet_ids": [], "raw": {}
+                },
+                "environment_result": {"feedback": "", "ground_truth": None},
+                "reflection": {
+                    "reasoning": "", "error_identification": "", "root_cause_analysis": "",
+                    "correct_approach": "", "key_insight": "",
+                    "bullet_tags": [{"id": "b-1", "tag": "helpful"}], "raw": {},
+                },
+                "curator_output": {"delta": {"reasoning": "", "operations": []}, "raw": {}},
+                "playbook_snapshot": "",
+            }
+        )
+        self.assertEqual(result.reflection.bullet_tags[0].tag, "helpful")
+        self.assertEqual(result.usage, {})
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,5 +1,32 @@
+import tempfile
 import unittest
+from unittest import mock
+from pathlib import Path
+
+from opence.methods.ace import deduplication, minhash
 from opence.methods.ace.deduplication import Deduplicator
+from opence.methods.ace.minhash import MinHasher
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+
+class CountingEncoder:
+    """Bag-of-characters embeddings that record every text they encode."""
+
+    def __init__(self) -> None:
+        self.encoded = []
+
+    def __call__(self, texts):
+        self.encoded.extend(texts)
+        vectors = np.zeros((len(texts), 128), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for char in text.lower():
+                vectors[row, ord(char) % 128] += 1.0
+        return vectors
+
 
 class DeduplicationTest(unittest.TestCase):
     def test_find_duplicates(self):
@@ -16,5 +43,76 @@ class DeduplicationTest(unittest.TestCase):
         duplicate_ids = deduplicator.find_duplicates(new_bullets, existing_bullets)
         self.assertEqual(sorted(duplicate_ids), ["1"])
 
+    def test_auto_falls_back_to_substring_without_embeddings(self):
+        with mock.patch.object(deduplication, "SentenceTransformer", None):
+            deduplicator = Deduplicator(backend="auto")
+        self.assertEqual(deduplicator.backend, "substring")
+        duplicates = deduplicator.find_duplicates(
+            {"n1": "check the wiring", "n2": "Ventilate first."}, {"e": "Always check the wiring."}
+        )
+        self.assertEqual(duplicates, ["n1"])
+
+
+class MinHashBackendTest(unittest.TestCase):
+    def test_detects_near_duplicate_chinese_bullets(self):
+        deduplicator = Deduplicator(backend="minhash", jaccard_threshold=0.6)
+        existing = {
+            "e1": "勘查现场时应首先确认电气线路是否存在短路熔痕，并记录其位置。",
+            "e2": "询问目击者时要记录起火时间与烟雾颜色。",
+        }
+        new = {
+            "n1": "勘查现场时应首先确认电气线路是否存在短路熔痕，并记录位置。",
+            "n2": "对比保险记录核实财产损失情况。",
+        }
+        self.assertEqual(deduplicator.find_duplicates(new, existing), ["n1"])
+
+        existing.pop("e1")
+        self.assertEqual(deduplicator.find_duplicates(new, existing), [])
+
+    def test_pure_python_signatures_match_numpy(self):
+        hasher = MinHasher(num_perm=32)
+        text = "Verify the ignition source before concluding."
+        signature = hasher.signature(text)
+        saved = minhash.np
+        minhash.np = None
+        try:
+            self.assertEqual(hasher.signature(text), signature)
+        finally:
+            minhash.np = saved
+
+
+@unittest.skipIf(np is None, "numpy is not installed")
+class EmbeddingCacheTest(unittest.TestCase):
+    def test_each_content_is_embedded_once(self):
+        encoder = CountingEncoder()
+        deduplicator = Deduplicator(similarity_threshold=0.999, encoder=encoder, chunk_size=1)
+        existing = {"a": "Check the wiring.", "b": "Interview witnesses early."}
+
+        first = deduplicator.find_duplicates({"n1": "check the wiring."}, existing)
+        second = deduplicator.find_duplicates(
+            {"n2": "Photograph the scene."}, {**existing, "n1": "check the wiring."}
+        )
+
+        self.assertEqual(first, ["n1"])
+        self.assertEqual(second, [])
+        self.assertEqual(len(encoder.encoded), len(set(encoder.encoded)))
+        self.assertEqual(len(deduplicator.embedding_store), 4)
+
+    def test_cache_round_trips_to_disk(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "embeddings.npz"
+            encoder = CountingEncoder()
+            deduplicator = Deduplicator(encoder=encoder, cache_path=path)
+            deduplicator.find_duplicates({"n": "Check the wiring."}, {"e": "Ventilate first."})
+            deduplicator.save_embeddings()
+            with np.load(path, allow_pickle=False) as archive:
+                self.assertEqual(archive["keys"].dtype, np.dtype("U40"))
+
+            reloaded_encoder = CountingEncoder()
+            reloaded = Deduplicator(encoder=reloaded_encoder, cache_path=path)
+            reloaded.find_duplicates({"n": "Check the wiring."}, {"e": "Ventilate first."})
+            self.assertEqual(reloaded_encoder.encoded, [])
+
+
 if __name__ == "__main__":
     unittest.main()
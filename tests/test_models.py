@@ -0,0 +1,807 @@
+import asyncio
+import json
+import sys
+import threading
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from opence.models import (
+    BalancedLLMClient,
+    CachingLLMClient,
+    CassetteMiss,
+    DummyLLMClient,
+    RecordingLLMClient,
+    ReplayLLMClient,
+    ResponseCache,
+)
+from opence.models.batching import MicroBatcher
+from opence.models.cache import cache_key
+from opence.models.clients import (
+    DeepseekLLMClient,
+    LLMClient,
+    LLMResponse,
+    TransformersLLMClient,
+)
+from opence.models.json_decoding import (
+    JsonLogitsProcessor,
+    JsonStoppingCriteria,
+    JsonTracker,
+    _IncrementalDecoder,
+)
+from opence.models.prefix_cache import PrefixCache
+from opence.models.providers import OpenAIModelProvider
+from opence.models.rwkv_client import RWKVLLMClient
+from opence.models.rate_limit import (
+    RateLimiter,
+    backoff_delay,
+    estimate_tokens,
+    retry_after_seconds,
+)
+
+
+def test_caching_client_replays_identical_requests(tmp_path) -> None:
+    inner = DummyLLMClient()
+    inner.queue("first")
+    inner.queue("second")
+    client = CachingLLMClient(inner, tmp_path / "cache.sqlite")
+
+    assert client.complete("prompt", temperature=0).text == "first"
+    assert client.complete("prompt", temperature=0).text == "first"
+    assert client.complete("prompt", temperature=1).text == "second"
+    assert (client.stats.hits, client.stats.misses) == (1, 2)
+
+    # A fresh wrapper over the same file never constructs the wrapped client.
+    def unavailable() -> DummyLLMClient:
+        raise AssertionError("cache hit expected")
+
+    reopened = CachingLLMClient(unavailable, tmp_path / "cache.sqlite", model="dummy")
+    assert reopened.complete("prompt", temperature=1).text == "second"
+
+
+def test_cassette_replays_recorded_run(tmp_path) -> None:
+    inner = DummyLLMClient()
+    for text in ("a1", "a2", "b"):
+        inner.queue(text)
+    path = tmp_path / "run.jsonl.gz"
+    with RecordingLLMClient(inner, path) as recorder:
+        recorder.complete("prompt-a", temperature=0.7)
+        recorder.complete("prompt-a", temperature=0.7)
+        recorder.complete("prompt-b")
+
+    replay = ReplayLLMClient(path)
+    assert len(replay) == 3
+    # Repeated requests replay in recorded order, then repeat the last response.
+    assert [replay.complete("prompt-a", temperature=0.7).text for _ in range(3)] == ["a1", "a2", "a2"]
+    assert replay.complete("prompt-b").usage.completion_tokens == 1
+    with pytest.raises(CassetteMiss):
+        replay.complete("prompt-b", temperature=1.0)
+    assert ReplayLLMClient(path, match_kwargs=False).complete("prompt-b", temperature=1.0).text == "b"
+
+    slow = ReplayLLMClient(path, simulate_latency=True, latency_scale=100.0)
+    started = time.perf_counter()
+    response = slow.complete("prompt-b")
+    assert time.perf_counter() - started >= response.usage.latency > 0
+
+
+def test_response_cache_evicts_least_recently_used(tmp_path) -> None:
+    cache = ResponseCache(tmp_path / "cache.sqlite", max_bytes=10)
+    keys = [cache_key("m", prompt, {}) for prompt in ("a", "b", "c")]
+    cache.put(keys[0], LLMResponse(text="aaaa"))
+    cache.put(keys[1], LLMResponse(text="bbbb"))
+    assert cache.get(keys[0]).text == "aaaa"
+
+    assert cache.put(keys[2], LLMResponse(text="cccc")) == 1
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]).text == "aaaa"
+    assert cache.total_bytes == 8
+
+
+def test_estimate_tokens_counts_cjk_characters() -> None:
+    assert estimate_tokens("") == 1
+    assert estimate_tokens("abcdefgh") == 2
+    assert estimate_tokens("检查电气线路") == 6
+    assert estimate_tokens("检查 wiring") == 2 + 2
+
+
+def test_rate_limiter_spaces_bursts_to_the_quota() -> None:
+    now = [0.0]
+    limiter = RateLimiter(requests_per_minute=60, tokens_per_minute=600, clock=lambda: now[0])
+
+    # The bucket starts full, so a burst up to the quota is sent immediately.
+    delays = [limiter.reserve(10) for _ in range(60)]
+    assert max(delays) == 0.0
+    # Beyond it, callers queue at the refill rate (one request per second).
+    assert limiter.reserve(10) == pytest.approx(1.0)
+    assert limiter.reserve(10) == pytest.approx(2.0)
+
+    # Unused token reservations are refunded; a 429 pause blocks everyone.
+    now[0] = 120.0
+    limiter.settle(estimated=500, actual=100)
+    limiter.pause(5.0)
+    assert limiter.reserve(10) == pytest.approx(5.0)
+
+
+def test_retry_after_headers() -> None:
+    assert retry_after_seconds({"retry-after": "3"}) == 3.0
+    assert retry_after_seconds({"retry-after-ms": "250"}) == 0.25
+    assert retry_after_seconds({}) is None
+    assert backoff_delay(0, retry_after=2.0) >= 2.0
+    assert 0.0 <= backoff_delay(10, base=1.0, maximum=8.0) <= 8.0
+
+
+class StatusError(Exception):
+    def __init__(self, status_code: int) -> None:
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.response = types.SimpleNamespace(headers={})
+
+
+class ChunkStream:
+    """A streamed completion that records whether it was closed."""
+
+    def __init__(self, chunks) -> None:
+        self.chunks = chunks
+        self.closed = False
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+
+    def close(self) -> None:
+        self.closed = True
+
+
+def stream_chunk(content=None, usage=None):
+    choices = [] if content is None else [
+        types.SimpleNamespace(delta=types.SimpleNamespace(content=content))
+    ]
+    return types.SimpleNamespace(choices=choices, usage=usage)
+
+
+class ScriptedCompletions:
+    """Stands in for ``client.chat.completions``: raises or answers in order."""
+
+    def __init__(self, outcomes) -> None:
+        self.outcomes = list(outcomes)
+        self.calls = []
+
+    def _next(self, params):
+        self.calls.append(params)
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        if isinstance(outcome, list):
+            return ChunkStream(outcome)
+        if isinstance(outcome, ChunkStream):
+            return outcome
+        return types.SimpleNamespace(
+            choices=[types.SimpleNamespace(message=types.SimpleNamespace(content=outcome))],
+            usage=types.SimpleNamespace(prompt_tokens=7, completion_tokens=3, total_tokens=10),
+        )
+
+    def create(self, **params):
+        return self._next(params)
+
+
+class AsyncScriptedCompletions(ScriptedCompletions):
+    async def create(self, **params):
+        return self._next(params)
+
+
+@pytest.fixture
+def deepseek(monkeypatch):
+    """Build a DeepseekLLMClient over scripted completions without the openai package."""
+    openai = types.ModuleType("openai")
+    openai.APIConnectionError = type("APIConnectionError", (Exception,), {})
+    openai.OpenAI = lambda **kwargs: types.SimpleNamespace(**kwargs)
+    async_completions = AsyncScriptedCompletions([])
+    async_clients = []
+
+    class AsyncOpenAI:
+        def __init__(self, **kwargs) -> None:
+            self.chat = types.SimpleNamespace(completions=async_completions)
+            self.closed = False
+            async_clients.append(self)
+
+        async def close(self) -> None:
+            self.closed = True
+
+    openai.AsyncOpenAI = AsyncOpenAI
+    httpx = types.ModuleType("httpx")
+    httpx.AsyncClient = lambda **kwargs: types.SimpleNamespace(**kwargs)
+    httpx.Limits = lambda **kwargs: kwargs
+    monkeypatch.setitem(sys.modules, "openai", openai)
+    monkeypatch.setitem(sys.modules, "httpx", httpx)
+
+    def build(outcomes, **kwargs):
+        client = DeepseekLLMClient(
+            model="test-model", api_key="key", backoff_base=0.001, backoff_max=0.01, **kwargs
+        )
+        completions = ScriptedCompletions(outcomes)
+        client.client = types.SimpleNamespace(chat=types.SimpleNamespace(completions=completions))
+        pauses = []
+        pause = client.limiter.pause
+
+        def recording_pause(seconds: float) -> None:
+            pauses.append(seconds)
+            pause(seconds)
+
+        client.limiter.pause = recording_pause
+        return client, completions, pauses
+
+    # acomplete() goes through AsyncOpenAI instances sharing these completions.
+    build.async_completions = async_completions
+    build.async_clients = async_clients
+    return build
+
+
+def test_deepseek_client_forwards_generation_kwargs(deepseek) -> None:
+    client, completions, _ = deepseek(["{}"], generation_kwargs={"temperature": 0.2})
+    response = client.complete(
+        "prompt", max_new_tokens=64, top_p=0.5, refinement_round=2, do_sample=True,
+        return_full_text=False,
+    )
+    assert response.text == "{}"
+    params = completions.calls[0]
+    assert params["model"] == "test-model"
+    assert (params["temperature"], params["top_p"], params["max_tokens"]) == (0.2, 0.5, 64)
+    assert not DeepseekLLMClient._DROPPED_KWARGS & params.keys()
+    assert "max_new_tokens" not in params and params["stream"] is False
+    assert params["messages"][-1] == {"role": "user", "content": "prompt"}
+    assert (response.usage.prompt_tokens, response.usage.completion_tokens) == (7, 3)
+
+
+def test_deepseek_client_retries_rate_limits_and_server_errors(deepseek) -> None:
+    client, completions, pauses = deepseek([StatusError(429), StatusError(503), "{}"])
+    response = client.complete("prompt")
+    assert response.text == "{}"
+    assert len(completions.calls) == 3
+    assert response.usage.retries == 2
+    # Only the 429 pauses the other callers.
+    assert len(pauses) == 1 and pauses[0] > 0
+
+    client, completions, pauses = deepseek([StatusError(400), "{}"])
+    with pytest.raises(StatusError):
+        client.complete("prompt")
+    assert (len(completions.calls), pauses) == (1, [])
+
+    client, completions, _ = deepseek([StatusError(500)] * 3, max_retries=2)
+    with pytest.raises(StatusError):
+        client.complete("prompt")
+    assert len(completions.calls) == 3
+
+
+def test_deepseek_client_stream_settles_reported_usage(deepseek) -> None:
+    chunk = stream_chunk
+    usage = types.SimpleNamespace(prompt_tokens=7, completion_tokens=3, total_tokens=10)
+    client, completions, _ = deepseek(
+        [StatusError(502), [chunk('{"a"'), chunk(": 1}"), chunk(usage=usage)]]
+    )
+    settled = []
+    client.limiter.settle = lambda estimated, actual: settled.append(actual)
+    assert "".join(client.stream("prompt")) == '{"a": 1}'
+    assert len(completions.calls) == 2
+    assert completions.calls[-1]["stream"] is True
+    assert completions.calls[-1]["stream_options"] == {"include_usage": True}
+    assert settled == [10]
+
+
+def test_deepseek_client_stream_closes_abandoned_response(deepseek) -> None:
+    abandoned = ChunkStream([stream_chunk("a"), stream_chunk("b")])
+    failing = ChunkStream([stream_chunk("a"), ConnectionError("reset")])
+    client, _, _ = deepseek([abandoned, failing])
+    settled = []
+    client.limiter.settle = lambda estimated, actual: settled.append(actual)
+
+    chunks = client.stream("prompt")
+    assert next(chunks) == "a"
+    chunks.close()
+    assert abandoned.closed and settled == [None]
+
+    with pytest.raises(ConnectionError):
+        list(client.stream("prompt"))
+    assert failing.closed and settled == [None, None]
+
+
+def test_deepseek_client_stream_drops_rejected_stream_options(deepseek) -> None:
+    client, completions, _ = deepseek([StatusError(400), [stream_chunk("ok")], [stream_chunk("!")]])
+    assert "".join(client.stream("prompt")) == "ok"
+    assert "stream_options" in completions.calls[0]
+    assert "stream_options" not in completions.calls[1]
+    assert client.stream_usage is False
+    assert "".join(client.stream("prompt")) == "!"
+    assert "stream_options" not in completions.calls[2]
+
+
+def test_deepseek_client_acomplete_retries(deepseek) -> None:
+    client, _, pauses = deepseek([])
+    completions = deepseek.async_completions
+    completions.outcomes.extend([StatusError(429), StatusError(404), "{}"])
+
+    async def run():
+        return await client.acomplete("prompt", max_new_tokens=8)
+
+    with pytest.raises(StatusError) as raised:
+        asyncio.run(run())
+    assert raised.value.status_code == 404
+    assert len(completions.calls) == 2 and len(pauses) == 1
+    assert completions.calls[0]["max_tokens"] == 8
+
+    response = asyncio.run(run())
+    assert response.text == "{}" and response.usage.retries == 0
+
+
+def test_deepseek_client_closes_async_pool_with_each_loop(deepseek) -> None:
+    client, _, _ = deepseek([])
+    deepseek.async_completions.outcomes.extend(["{}", "{}", "{}"])
+
+    async def twice():
+        await client.acomplete("prompt")
+        await client.acomplete("prompt")
+
+    asyncio.run(twice())
+    asyncio.run(client.acomplete("prompt"))
+    # One pool per asyncio.run, each closed when its loop shut down.
+    assert len(deepseek.async_clients) == 2
+    assert all(pool.closed for pool in deepseek.async_clients)
+    assert client._transports == {}
+
+    deepseek.async_completions.outcomes.append("{}")
+
+    async def explicit_close():
+        await client.acomplete("prompt")
+        await client.aclose()
+        return deepseek.async_clients[-1].closed
+
+    assert asyncio.run(explicit_close())
+
+
+def test_micro_batcher_groups_concurrent_requests_by_kwargs() -> None:
+    batches = []
+
+    def handler(prompts, kwargs):
+        batches.append((list(prompts), kwargs))
+        return [LLMResponse(text=f"{prompt}@{kwargs['temperature']}") for prompt in prompts]
+
+    batcher = MicroBatcher(handler, max_batch_size=8, window=0.05)
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        futures = [
+            pool.submit(
+                lambda idx=idx: batcher.submit(f"p{idx}", {"temperature": idx % 2}).result()
+            )
+            for idx in range(6)
+        ]
+        texts = [future.result().text for future in futures]
+    batcher.close()
+
+    assert texts == [f"p{idx}@{idx % 2}" for idx in range(6)]
+    assert all(
+        int(prompt[1:]) % 2 == kwargs["temperature"] for prompts, kwargs in batches for prompt in prompts
+    )
+    assert batcher.stats.requests == 6
+    assert batcher.stats.batches < 6
+
+
+def test_micro_batcher_close_resolves_or_rejects_every_request() -> None:
+    def handler(prompts, kwargs):
+        return [LLMResponse(text=prompt) for prompt in prompts]
+
+    for _ in range(20):
+        batcher = MicroBatcher(handler, max_batch_size=4, window=0.001)
+        start = threading.Barrier(5)
+
+        def submit(idx):
+            start.wait()
+            try:
+                return batcher.submit(f"p{idx}")
+            except RuntimeError:
+                return None
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futures = [pool.submit(submit, idx) for idx in range(4)]
+            start.wait()
+            batcher.close()
+            submitted = [future.result() for future in futures]
+        for future in submitted:
+            if future is not None:
+                assert future.result(timeout=1).text.startswith("p")
+
+    with pytest.raises(RuntimeError):
+        batcher.submit("late")
+
+
+def test_prefix_cache_returns_longest_shared_prefix() -> None:
+    cache = PrefixCache(max_entries=2, min_tokens=3)
+    system = list(range(100))
+    cache.insert(system + [1, 2, 3], "state-a")
+    cache.insert(system[:50] + [7, 7], "state-b")
+
+    assert cache.lookup(system + [1, 2, 9]) == (102, "state-a")
+    assert cache.lookup(system[:50] + [8]) == (50, "state-a")
+    assert cache.lookup([5, 5, 5]) == (0, None)
+    # Extending a stored prompt replaces it; the LRU keeps max_entries states.
+    cache.insert(system + [1, 2, 3, 4], "state-c")
+    cache.insert([9] * 20, "state-d")
+    assert len(cache) == 2
+    assert cache.lookup(system + [1, 2, 3, 4, 5]) == (104, "state-c")
+    assert cache.stats.hits == 3
+    assert cache.stats.hit_rate == pytest.approx(3 / 4)
+
+
+def test_transformers_prefix_cache_matches_uncached_generation() -> None:
+    pytest.importorskip("torch")
+    pytest.importorskip("transformers")
+    model_path = "hf-internal-testing/tiny-random-gpt2"
+    try:
+        cached = TransformersLLMClient(
+            model_path, max_new_tokens=8, device_map="cpu", torch_dtype="float32",
+            prefix_cache_size=4, prefix_cache_min_tokens=4,
+        )
+        fresh = TransformersLLMClient(
+            model_path, max_new_tokens=8, device_map="cpu", torch_dtype="float32",
+            prefix_cache_size=4, prefix_cache_min_tokens=4,
+        )
+    except OSError:
+        pytest.skip("tiny test model is not available offline")
+
+    playbook = "playbook bullet " * 40
+    first = cached.complete(playbook + "question one")
+    second = cached.complete(playbook + "question two")
+
+    assert first.raw["prefix_cache"]["hit"] is False
+    assert second.raw["prefix_cache"]["hit"] is True
+    assert second.raw["prefix_cache"]["reused_tokens"] > 40
+    assert second.text == fresh.complete(playbook + "question two").text
+
+
+def test_json_tracker_detects_end_of_object_and_invalid_prefixes() -> None:
+    tracker = JsonTracker()
+    tracker.feed('Sure: {"reasoning": "use {x} and \\"y\\"", "ids": [1, -2.5e3, true')
+    assert not tracker.done and not tracker.valid  # prose before "{" is not JSON
+
+    tracker = JsonTracker()
+    assert tracker.accepts(' {"a"') and not tracker.accepts("x")
+    tracker.feed('{"reasoning": "use {x} and \\"y\\"", "ids": [1, -2.5e3, true')
+    assert tracker.valid and not tracker.done
+    assert tracker.accepts("], ") and not tracker.accepts("}") and not tracker.accepts("tru")
+    tracker.feed('], "note": null}')
+    assert tracker.done and tracker.complete
+    assert tracker.accepts("\n") and not tracker.accepts("{")
+
+
+class ByteTokenizer:
+    """Token ``i < 256`` is byte ``i``, decoded like a byte-level BPE tokenizer."""
+
+    eos_token_id = 256
+
+    def __init__(self) -> None:
+        self.decoded_lengths = []
+
+    def decode(self, ids, skip_special_tokens=True):
+        self.decoded_lengths.append(len(ids))
+        return bytes(i for i in ids if i < 256).decode("utf-8", errors="replace")
+
+
+def test_incremental_decoder_reads_only_new_tokens() -> None:
+    np = pytest.importorskip("numpy")
+    tokenizer = ByteTokenizer()
+    decoder = _IncrementalDecoder(tokenizer)
+    prompt = list(b"Q: ")
+    generated = list('{"a": "\u00e9\u00e9", "b": [1, 2]} trailing'.encode("utf-8"))
+    done_at = None
+    for step in range(1, len(generated) + 1):
+        ids = np.array([prompt + generated[:step]])
+        tracker = decoder.update(ids, generated_offset=1)[0]
+        if tracker.done and done_at is None:
+            done_at = step
+            assert tracker.complete
+    assert bytes(generated[:done_at]).decode("utf-8").endswith("]}")
+    # Each step decodes a few tokens (more only while a multi-byte character
+    # is incomplete), not the whole generated suffix.
+    assert max(tokenizer.decoded_lengths) <= 4
+
+
+def test_json_stopping_criteria_and_logits_processor() -> None:
+    torch = pytest.importorskip("torch")
+    tokenizer = ByteTokenizer()
+    prompt = list(b"Q: ")
+
+    stopping = JsonStoppingCriteria(tokenizer)
+    rows = [list(b'{"a": 1}'), list(b'{"a": [')]
+    for step in range(1, len(rows[0]) + 1):
+        stopped = stopping(torch.tensor([prompt + row[:step] for row in rows]), None)
+    assert stopped.tolist() == [True, False]
+
+    processor = JsonLogitsProcessor(tokenizer, top_k=2)
+    scores = torch.zeros((1, 257))
+    scores[0, ord("}")] = 2.0  # most likely, but '{"a": }' is not valid JSON
+    scores[0, ord("1")] = 1.0
+    masked = processor(torch.tensor([prompt + list(b'{"a": ')]), scores.clone())
+    assert int(masked[0].argmax()) == ord("1")
+    assert torch.isinf(masked[0, ord("}")])
+
+    closed = JsonLogitsProcessor(tokenizer)
+    masked = closed(torch.tensor([prompt + list(b'{"a": 1}')]), scores.clone())
+    assert int(masked[0].argmax()) == tokenizer.eos_token_id
+
+
+class CountingRNN:
+    """Stand-in for an RWKV model: the state is the token ids consumed.
+
+    Logits favour ``"!"`` until one was emitted, then end of text (token 0).
+    """
+
+    def __init__(self, scores=None) -> None:
+        self.forwarded = 0
+        self.scores = scores
+
+    def forward(self, tokens, state):
+        self.forwarded += len(tokens)
+        state = list(state or []) + list(tokens)
+        if self.scores is not None:
+            return list(self.scores), state
+        logits = [0.0] * 128
+        logits[0 if state[-1] == ord("!") else ord("!")] = 1.0
+        return logits, state
+
+
+class EchoPipeline:
+    def encode(self, text):
+        return [ord(char) for char in text]
+
+    def decode(self, tokens):
+        return "".join(chr(token) for token in tokens)
+
+    def sample_logits(self, logits, temperature, top_p):
+        return max(range(len(logits)), key=logits.__getitem__)
+
+
+class MergingPipeline(EchoPipeline):
+    """Tokenizes three newlines as one token, like BPE vocabularies do."""
+
+    NEWLINES = 127
+
+    def encode(self, text):
+        tokens = []
+        for index, part in enumerate(text.split("\n\n\n")):
+            if index:
+                tokens.append(self.NEWLINES)
+            tokens.extend(super().encode(part))
+        return tokens
+
+    def decode(self, tokens):
+        return "".join("\n\n\n" if token == self.NEWLINES else chr(token) for token in tokens)
+
+
+def test_rwkv_client_resumes_from_cached_paragraph_state() -> None:
+    model = CountingRNN()
+    client = RWKVLLMClient.from_model(model, EchoPipeline(), max_new_tokens=4)
+    system = "You are a helpful assistant.\n\n"
+    playbook = "Playbook:\n" + "- bullet\n" * 20 + "\n"
+
+    first = client.complete(system + playbook + "Question one")
+    assert first.text == "!"
+    assert first.raw["state_cache"]["hit"] is False
+
+    model.forwarded = 0
+    second = client.complete(system + playbook + "Question two")
+    assert second.raw["state_cache"]["reused_tokens"] == len(system + playbook)
+    # Only the changed suffix (plus the generated token) is run through the model.
+    assert model.forwarded == len("Question two") + 1
+
+
+def test_rwkv_client_caches_on_whole_prompt_token_boundaries() -> None:
+    model = CountingRNN()
+    pipeline = MergingPipeline()
+    client = RWKVLLMClient.from_model(model, pipeline, max_new_tokens=1)
+    # The third newline merges into the paragraph break, so no state may be
+    # cached after "Rules\n\n": its token ids differ from the whole prompt's.
+    prompt = "Rules\n\n\nPlaybook\n\nQuestion"
+
+    client.complete(prompt)
+    client.complete(prompt.replace("Question", "Other"))
+    report = client.complete(prompt).raw["state_cache"]
+
+    assert report["reused_tokens"] == report["prompt_tokens"] == len(pipeline.encode(prompt))
+    resumed = client.complete("Rules\n\n\nPlaybook\n\nAgain").raw["state_cache"]
+    assert resumed["reused_tokens"] == len(pipeline.encode("Rules\n\n\nPlaybook\n\n"))
+
+
+def test_rwkv_client_applies_repetition_penalties() -> None:
+    scores = [0.0] * 128
+    scores[ord("a")], scores[ord("b")] = 1.0, 0.9
+    client = RWKVLLMClient.from_model(CountingRNN(scores), EchoPipeline(), max_new_tokens=4)
+
+    assert client.complete("x").text == "abab"
+    assert client.complete("x", alpha_presence=0.0, alpha_frequency=0.0).text == "aaaa"
+    banned = RWKVLLMClient.from_model(
+        CountingRNN(scores), EchoPipeline(), max_new_tokens=4, token_ban=[ord("a")]
+    )
+    assert banned.complete("x").text == "bbbb"
+    stopped = RWKVLLMClient.from_model(
+        CountingRNN(scores), EchoPipeline(), max_new_tokens=4, token_stop=[ord("b")]
+    )
+    assert stopped.complete("x").text == "a"
+
+
+def test_rwkv_client_stream_matches_complete() -> None:
+    scores = [0.0] * 128
+    scores[ord("a")], scores[ord("b")] = 1.0, 0.9
+    client = RWKVLLMClient.from_model(CountingRNN(scores), EchoPipeline(), max_new_tokens=6)
+
+    chunks = list(client.stream("x"))
+    assert len(chunks) == 6
+    assert "".join(chunks) == client.complete("x").text
+
+
+class StubEndpoint(LLMClient):
+    """Local stand-in for one inference server."""
+
+    slow_calls = 0
+
+    def __init__(self, name: str, latency: float = 0.0) -> None:
+        super().__init__(model=name)
+        self.latency = latency
+        self.healthy = True
+        self.calls = 0
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def complete(self, prompt, **kwargs):
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            # The first "slow" request anywhere in the pool stalls.
+            slow = prompt == "slow" and StubEndpoint.slow_calls == 0
+            if prompt == "slow":
+                StubEndpoint.slow_calls += 1
+        try:
+            time.sleep(0.5 if slow else self.latency)
+            if not self.healthy:
+                raise ConnectionError(f"{self.model} is down")
+            return LLMResponse(text=self.model)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+
+def test_balanced_client_spreads_load_and_fails_over() -> None:
+    endpoints = [StubEndpoint(f"replica-{idx}", latency=0.02) for idx in range(3)]
+    client = BalancedLLMClient(endpoints)
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        list(pool.map(lambda _: client.complete("q"), range(24)))
+    assert all(endpoint.calls >= 4 for endpoint in endpoints)
+    assert max(endpoint.peak for endpoint in endpoints) <= 3
+
+    now = [0.0]
+    endpoints = [StubEndpoint("a"), StubEndpoint("b")]
+    endpoints[0].healthy = False
+    client = BalancedLLMClient(
+        endpoints, failure_threshold=2, cooldown=10.0, clock=lambda: now[0],
+        health_check=lambda child: child.healthy,
+    )
+    assert {client.complete("q").text for _ in range(6)} == {"b"}
+    assert endpoints[0].calls == 2  # circuit opened after two failures
+    assert client.describe()[0]["circuit_open"]
+
+    endpoints[0].healthy = True
+    now[0] = 11.0
+    responses = [client.complete("q") for _ in range(4)]
+    assert {response.text for response in responses} == {"a", "b"}
+    assert not client.describe()[0]["circuit_open"]
+
+
+def test_balanced_client_hedges_slow_requests() -> None:
+    StubEndpoint.slow_calls = 0
+    endpoints = [StubEndpoint("a", latency=0.01), StubEndpoint("b", latency=0.01)]
+    client = BalancedLLMClient(endpoints, hedge=True, hedge_min_samples=4)
+    for _ in range(4):
+        client.complete("warm-up")
+    assert client.hedge_delay() is not None
+
+    started = time.perf_counter()
+    response = client.complete("slow")
+    assert time.perf_counter() - started < 0.4
+    assert response.raw["balancer"]["hedged"] is True
+    assert sum(endpoint.hedges for endpoint in client.endpoints) == 1
+    client.close()
+
+
+class ChatReplica(ThreadingHTTPServer):
+    """Local OpenAI-compatible chat completions server; answers 503 while unhealthy."""
+
+    def __init__(self, name: str) -> None:
+        super().__init__(("127.0.0.1", 0), ChatReplicaHandler)
+        self.name = name
+        self.healthy = True
+        self.requests = 0
+        self.thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self.thread.start()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+class ChatReplicaHandler(BaseHTTPRequestHandler):
+    def do_POST(self) -> None:
+        server = self.server
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        server.requests += 1
+        if not server.healthy:
+            status, body = 503, {"error": {"message": "replica down"}}
+        else:
+            status, body = 200, {
+                "id": "chatcmpl-stub",
+                "object": "chat.completion",
+                "created": 0,
+                "model": "stub",
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": server.name},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+            }
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
+@pytest.fixture
+def chat_replicas():
+    replicas = []
+
+    def start(*names):
+        replicas.extend(ChatReplica(name) for name in names)
+        return replicas
+
+    yield start
+    for replica in replicas:
+        replica.stop()
+
+
+def test_provider_fails_over_between_http_replicas(chat_replicas) -> None:
+    pytest.importorskip("openai")
+    down, up = chat_replicas("down", "up")
+    down.healthy = False
+    client = OpenAIModelProvider(
+        model="stub", api_key="test", base_urls=[down.base_url, up.base_url]
+    ).create_client()
+    assert isinstance(client, BalancedLLMClient)
+    client.failure_threshold = 2
+    client.cooldown = 0.2
+    for endpoint in client.endpoints:
+        endpoint.client.max_retries = 0
+
+    assert {client.complete("q").text for _ in range(6)} == {"up"}
+    assert down.requests == 2  # circuit opened after two failed HTTP calls
+    assert client.describe()[0]["circuit_open"]
+    assert up.requests == 6
+
+    down.healthy = True
+    time.sleep(0.25)
+    texts = {client.complete("q").text for _ in range(4)}
+    assert texts == {"down", "up"}
+    assert not client.describe()[0]["circuit_open"]
+    client.close()
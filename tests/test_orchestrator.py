@@ -3,7 +3,7 @@ from dataclasses import dataclass
 from typing import List
 
 from opence import DummyLLMClient
-from opence.core import ClosedLoopOrchestrator
+from opence.core import ClosedLoopOrchestrator, Tracer
 from opence.models import DummyModelProvider
 from opence.interfaces import (
     ContextBundle,
@@ -75,6 +75,8 @@ def test_orchestrator_runs_closed_loop() -> None:
     assert result.evaluation.verdict == "ok"
     assert result.evolution.summary == "noop"
     assert result.context.references[0].content == "answer is 42"
+    assert set(result.usage) == {"llm"}
+    assert result.usage["llm"].completion_tokens > 0
 
 
 def test_orchestrator_accepts_model_provider() -> None:
@@ -96,3 +98,56 @@ def test_orchestrator_accepts_model_provider() -> None:
     result = orchestrator.run(request)
 
     assert result.evaluation.verdict == "ok"
+
+
+def test_orchestrator_streams_chunks() -> None:
+    class StreamingClient(DummyLLMClient):
+        def stream(self, prompt, **kwargs):
+            yield from ('{"answer"', ': "42"', "}")
+
+    chunks: List[str] = []
+    orchestrator = ClosedLoopOrchestrator(
+        llm=StreamingClient(),
+        acquirer=InMemoryAcquirer([Document(id="1", content="answer is 42")]),
+        processors=[],
+        constructor=StaticConstructor(),
+        evaluator=EchoEvaluator(),
+        evolver=RecordEvolver(),
+    )
+
+    result = orchestrator.run(LLMRequest(question="test"), on_chunk=chunks.append)
+
+    assert chunks == ['{"answer"', ': "42"', "}"]
+    assert json.loads(result.response.text) == {"answer": "42"}
+    assert result.evaluation.feedback == result.response.text
+
+
+def test_orchestrator_traces_each_pillar() -> None:
+    client = DummyLLMClient()
+    client.queue(json.dumps({"answer": "42"}))
+    tracer = Tracer()
+    orchestrator = ClosedLoopOrchestrator(
+        llm=client,
+        acquirer=InMemoryAcquirer([Document(id="1", content="answer is 42")]),
+        processors=[PassthroughProcessor()],
+        constructor=StaticConstructor(),
+        evaluator=EchoEvaluator(),
+        evolver=RecordEvolver(),
+        tracer=tracer,
+    )
+
+    orchestrator.run(LLMRequest(question="test"))
+
+    names = [span.name for span in tracer.spans]
+    assert names == [
+        "acquire",
+        "process.PassthroughProcessor",
+        "construct",
+        "llm",
+        "evaluate",
+        "evolve",
+        "loop",
+    ]
+    loop = tracer.spans[-1]
+    assert all(span.start >= loop.start for span in tracer.spans)
+    assert tracer.spans[3].args["completion_tokens"] > 0
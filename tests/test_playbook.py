@@ -0,0 +1,261 @@
+import json
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from opence.methods.ace import (
+    DeltaBatch,
+    DeltaOperation,
+    DummyLLMClient,
+    Generator,
+    Playbook,
+    PlaybookJournal,
+    PlaybookRetriever,
+    SQLiteStorage,
+)
+
+
+def render_uncached(playbook: Playbook) -> str:
+    return Playbook.loads(playbook.dumps()).as_prompt()
+
+
+class PlaybookRenderCacheTest(unittest.TestCase):
+    def test_cached_prompt_tracks_mutations(self) -> None:
+        playbook = Playbook()
+        first = playbook.add_bullet("defaults", "Answer 42 when unsure.")
+        second = playbook.add_bullet("checks", "Verify units before answering.")
+        self.assertEqual(playbook.as_prompt(), render_uncached(playbook))
+
+        playbook.tag_bullet(first.id, "helpful")
+        self.assertIn("helpful=1", playbook.as_prompt())
+        playbook.update_bullet(second.id, content="Verify units and sources.")
+        self.assertIn("units and sources", playbook.as_prompt())
+        self.assertEqual(playbook.as_prompt(), render_uncached(playbook))
+
+        playbook.apply_delta(
+            DeltaBatch(
+                reasoning="cleanup",
+                operations=[DeltaOperation(type="REMOVE", section="checks", bullet_id=second.id)],
+            )
+        )
+        self.assertNotIn("## checks", playbook.as_prompt())
+        self.assertEqual(playbook.as_prompt(), render_uncached(playbook))
+
+    def test_clean_render_reuses_prompt(self) -> None:
+        playbook = Playbook()
+        playbook.add_bullet("defaults", "Answer 42 when unsure.")
+        self.assertIs(playbook.as_prompt(), playbook.as_prompt())
+
+    def test_snapshot_is_isolated_from_later_mutations(self) -> None:
+        playbook = Playbook()
+        first = playbook.add_bullet("defaults", "Answer 42 when unsure.")
+        playbook.add_bullet("checks", "Verify units before answering.")
+        playbook.add_bullet("defaults", "Prefer SI units.")
+        snapshot = playbook.snapshot()
+        self.assertEqual(snapshot.as_prompt(), render_uncached(playbook))
+        self.assertEqual(snapshot.version, playbook.version)
+
+        playbook.tag_bullet(first.id, "helpful")
+        playbook.add_bullet("checks", "Cite sources.")
+        self.assertEqual(snapshot.get_bullet(first.id).helpful, 0)
+        self.assertEqual(len(snapshot.bullets()), 3)
+        self.assertEqual(snapshot.to_dict()["next_id"], 3)
+
+
+def add_delta(section: str, content: str) -> DeltaBatch:
+    return DeltaBatch(
+        reasoning="add",
+        operations=[DeltaOperation(type="ADD", section=section, content=content)],
+    )
+
+
+class PlaybookJournalTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.directory = Path(self._tmp.name)
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_replays_log_tail_after_compaction(self) -> None:
+        journal = PlaybookJournal(self.directory, compact_threshold=3)
+        playbook = journal.open()
+        for idx in range(5):
+            playbook.apply_delta(add_delta("defaults", f"Rule {idx}"))
+        first_id = playbook.bullets()[0].id
+        playbook.apply_delta(
+            DeltaBatch(
+                reasoning="tag",
+                operations=[
+                    DeltaOperation(
+                        type="TAG", section="defaults", bullet_id=first_id, metadata={"helpful": 2}
+                    )
+                ],
+            )
+        )
+        journal.close()
+        self.assertTrue((self.directory / "snapshot.json").exists())
+
+        restored = PlaybookJournal(self.directory).load()
+        self.assertEqual(restored.as_prompt(), playbook.as_prompt())
+        self.assertEqual(restored.get_bullet(first_id).helpful, 2)
+
+    def test_background_compaction_snapshots_state_at_compaction(self) -> None:
+        release = threading.Event()
+
+        class SlowJournal(PlaybookJournal):
+            def _write_snapshot(self, state, snapshot_seq):
+                release.wait(5)
+                super()._write_snapshot(state, snapshot_seq)
+
+        journal = SlowJournal(self.directory)
+        playbook = journal.open()
+        playbook.apply_delta(add_delta("defaults", "Rule"))
+        bullet_id = playbook.bullets()[0].id
+        journal.compact()
+        # Appends and in-place updates proceed while the snapshot is written.
+        playbook.apply_delta(
+            DeltaBatch(
+                reasoning="tag",
+                operations=[
+                    DeltaOperation(
+                        type="TAG", section="defaults", bullet_id=bullet_id, metadata={"helpful": 2}
+                    )
+                ],
+            )
+        )
+        release.set()
+        journal.close()
+        restored = PlaybookJournal(self.directory).load()
+        self.assertEqual(restored.get_bullet(bullet_id).helpful, 2)
+
+    def test_torn_tail_is_discarded(self) -> None:
+        journal = PlaybookJournal(self.directory)
+        playbook = journal.open()
+        playbook.apply_delta(add_delta("defaults", "Keep me"))
+        journal.close()
+        segment = next(self.directory.glob("journal-*.log"))
+        with segment.open("a", encoding="utf-8") as fh:
+            fh.write('{"seq": 2, "delta": {"reas')
+
+        journal = PlaybookJournal(self.directory)
+        playbook = journal.open()
+        self.assertEqual(len(playbook.bullets()), 1)
+        playbook.apply_delta(add_delta("defaults", "Appended after recovery"))
+        journal.close()
+        self.assertEqual(len(PlaybookJournal(self.directory).load().bullets()), 2)
+
+
+class SQLiteStorageTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmp.name) / "playbook.sqlite"
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_matches_in_memory_playbook(self) -> None:
+        memory = Playbook()
+        storage = SQLiteStorage(self.path)
+        on_disk = Playbook(storage)
+        for playbook in (memory, on_disk):
+            playbook.apply_delta(add_delta("defaults", "Answer 42 when unsure."))
+            playbook.apply_delta(add_delta("checks", "Verify units."))
+            playbook.apply_delta(add_delta("defaults", "Cite the playbook."))
+            first_id = playbook.bullets()[0].id
+            playbook.tag_bullet(first_id, "harmful")
+            playbook.update_bullet(first_id, content="Answer 42 only when unsure.")
+            playbook.remove_bullet(playbook.bullets()[1].id)
+
+        self.assertEqual(on_disk.as_prompt(), memory.as_prompt())
+        self.assertEqual(on_disk.stats(), memory.stats())
+        self.assertEqual(on_disk.to_dict()["sections"], memory.to_dict()["sections"])
+        storage.close()
+
+        reopened = Playbook(SQLiteStorage(self.path))
+        self.assertEqual(reopened.as_prompt(), memory.as_prompt())
+        added = reopened.add_bullet("checks", "New rule")
+        self.assertEqual(added.id, "checks-00004")
+        reopened.storage.close()
+
+    def test_iter_bullets_pages_through_rows(self) -> None:
+        storage = SQLiteStorage(self.path, batch_size=2)
+        playbook = Playbook(storage)
+        ids = [playbook.add_bullet("defaults", f"Rule {idx}").id for idx in range(5)]
+        self.assertEqual([bullet.id for bullet in storage.iter_bullets()], ids)
+
+        bullets = storage.iter_bullets()
+        self.assertEqual([next(bullets).id, next(bullets).id], ids[:2])
+        # The lock is not held between batches, so writers are not blocked.
+        playbook.remove_bullet(ids[2])
+        late = playbook.add_bullet("defaults", "Late rule").id
+        self.assertEqual([bullet.id for bullet in bullets], ids[3:] + [late])
+        storage.close()
+
+
+class RecordingClient(DummyLLMClient):
+    def __init__(self) -> None:
+        super().__init__()
+        self.prompts = []
+
+    def complete(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        return super().complete(prompt, **kwargs)
+
+
+class PlaybookRetrieverTest(unittest.TestCase):
+    def test_index_follows_deltas(self) -> None:
+        playbook = Playbook()
+        playbook.add_bullet("fire", "检查电气线路短路痕迹以判断起火原因。")
+        playbook.add_bullet("math", "Double-check arithmetic before answering.")
+        retriever = PlaybookRetriever(top_k=1)
+
+        hits = retriever.retrieve(playbook, "如何判断电气火灾的起火原因？")
+        self.assertEqual([bullet.section for bullet in hits], ["fire"])
+
+        playbook.apply_delta(add_delta("units", "Convert every quantity to SI units first."))
+        hits = retriever.retrieve(playbook, "Which units should quantities use?")
+        self.assertEqual([bullet.section for bullet in hits], ["units"])
+
+        playbook.remove_bullet(hits[0].id)
+        hits = retriever.retrieve(playbook, "Which units should quantities use?")
+        self.assertNotIn("units", [bullet.section for bullet in hits])
+
+    def test_snapshot_gets_top_k_hits_after_live_playbook_grows(self) -> None:
+        playbook = Playbook()
+        for idx in range(40):
+            playbook.add_bullet("filler", f"Unrelated filler strategy number {idx}.")
+        for idx in range(3):
+            playbook.add_bullet("fire", f"Check wiring for arc beads, case {idx}.")
+        retriever = PlaybookRetriever(top_k=3)
+        retriever.attach(playbook)
+        snapshot = playbook.snapshot()
+        for idx in range(5):
+            playbook.add_bullet("fire", f"Arc beads on wiring: newer lesson {idx}.")
+
+        hits = retriever.retrieve(snapshot, "arc beads on wiring")
+        self.assertEqual(len(hits), 3)
+        self.assertTrue(all(snapshot.get_bullet(bullet.id) for bullet in hits))
+        self.assertEqual(len(retriever.retrieve(playbook, "arc beads on wiring")), 3)
+
+    def test_generator_prompts_with_relevant_bullets(self) -> None:
+        playbook = Playbook()
+        for idx in range(50):
+            playbook.add_bullet("filler", f"Unrelated filler strategy number {idx}.")
+        relevant = playbook.add_bullet("fire", "Inspect arc beads on copper wiring.")
+        client = RecordingClient()
+        client.queue(json.dumps({"reasoning": "", "bullet_ids": [], "final_answer": "arc"}))
+        generator = Generator(client, retriever=PlaybookRetriever(top_k=3, token_budget=100))
+
+        generator.generate(
+            question="What do arc beads on copper wiring indicate?",
+            context=None,
+            playbook=playbook,
+        )
+        self.assertIn(relevant.id, client.prompts[0])
+        self.assertLess(len(client.prompts[0]), len(playbook.as_prompt()))
+
+
+if __name__ == "__main__":
+    unittest.main()